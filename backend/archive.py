@@ -0,0 +1,220 @@
+"""
+Shift and audit archive for WATCHTOWER
+
+Worked shifts and audit rows older than ARCHIVE_AFTER_DAYS are moved out
+of the live database into one SQLite file per calendar quarter, so the
+4, 8 and 12 week queries only touch recent pages and indexes. Reads go
+through history_session(start, end): when the range reaches an archived
+quarter, that quarter's file is ATTACHed and temporary `shifts` and
+`audit_logs` views union it with the live tables, so the usual queries
+run unchanged.
+
+Usage:
+    python archive.py                  # archive rows older than ARCHIVE_AFTER_DAYS
+    python archive.py --days 730 --vacuum
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from database import CONFIG, DATABASE_PATH, DATABASE_URL, AsyncSessionLocal, Base, data_path
+
+ARCHIVE_DIR = data_path(CONFIG.get('ARCHIVE_DIR', 'archive'))
+ARCHIVE_AFTER_DAYS = int(CONFIG.get('ARCHIVE_AFTER_DAYS', 365))
+# SQLite attaches at most 10 databases by default
+MAX_ATTACHED_QUARTERS = int(CONFIG.get('ARCHIVE_MAX_ATTACHED', 10))
+# Archived tables and the column that dates their rows
+ARCHIVED_TABLES = {"shifts": "date", "audit_logs": "timestamp"}
+QUARTER_FILE = re.compile(r'^watchtower-(\d{4})q([1-4])\.db$')
+
+# Archive sessions ATTACH files per range, so each gets a fresh connection
+archive_engine = create_async_engine(DATABASE_URL, echo=False, poolclass=NullPool)
+ArchiveSessionLocal = async_sessionmaker(archive_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def quarter_of(value):
+    return (value.year, (value.month - 1) // 3 + 1)
+
+
+def quarter_bounds(quarter):
+    """[start, end) of a (year, quarter)"""
+    year, number = quarter
+    start = datetime(year, 3 * (number - 1) + 1, 1)
+    end = datetime(year + 1, 1, 1) if number == 4 else datetime(year, 3 * number + 1, 1)
+    return start, end
+
+
+def quarter_path(quarter, archive_dir=ARCHIVE_DIR):
+    year, number = quarter
+    return os.path.join(archive_dir, f"watchtower-{year}q{number}.db")
+
+
+def archived_quarters(archive_dir=ARCHIVE_DIR):
+    if not os.path.isdir(archive_dir):
+        return []
+    quarters = []
+    for name in os.listdir(archive_dir):
+        match = QUARTER_FILE.match(name)
+        if match:
+            quarters.append((int(match.group(1)), int(match.group(2))))
+    return sorted(quarters)
+
+
+def quarters_for_range(start, end=None, archive_dir=ARCHIVE_DIR):
+    """Archived quarters overlapping [start, end]; none when `start` is None.
+
+    Raises ValueError when the range spans more quarters than can be attached.
+    """
+    if start is None:
+        return []
+    quarters = []
+    for quarter in archived_quarters(archive_dir):
+        quarter_start, quarter_end = quarter_bounds(quarter)
+        if quarter_end > start and (end is None or quarter_start <= end):
+            quarters.append(quarter)
+    if len(quarters) > MAX_ATTACHED_QUARTERS:
+        raise ValueError(
+            f"Range spans {len(quarters)} archived quarters; at most {MAX_ATTACHED_QUARTERS} can be read at once"
+        )
+    return quarters
+
+
+def _columns(connection, schema, table):
+    return [row[1] for row in connection.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _sqlite_datetime(value):
+    return value.isoformat(sep=' ')
+
+
+def _prepare_archive_table(connection, table, column):
+    """Create `table` in the attached archive, adding any columns it lacks"""
+    ddl = connection.execute(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    connection.execute(re.sub(
+        rf'^CREATE TABLE\s+"?{table}"?', f'CREATE TABLE IF NOT EXISTS archive.{table}', ddl, count=1
+    ))
+    archive_columns = set(_columns(connection, 'archive', table))
+    for name, column_type in connection.execute(f"SELECT name, type FROM pragma_table_info('{table}')"):
+        if name not in archive_columns:
+            connection.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {column_type}")
+    connection.execute(
+        f"CREATE INDEX IF NOT EXISTS archive.ix_{table}_{column}_id ON {table} ({column}, id)"
+    )
+
+
+def archive_rows(cutoff, database_path=DATABASE_PATH, archive_dir=ARCHIVE_DIR, vacuum=False):
+    """Move shifts and audit rows dated before `cutoff` into per-quarter files.
+
+    Each quarter moves in its own transaction, copying before deleting,
+    so an interrupted run is finished by running again. Returns the rows
+    moved per (quarter, table).
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    connection = sqlite3.connect(database_path, isolation_level=None)
+    moved = {}
+    try:
+        for table, column in ARCHIVED_TABLES.items():
+            oldest = connection.execute(
+                f"SELECT min({column}) FROM {table} WHERE {column} < ?", (_sqlite_datetime(cutoff),)
+            ).fetchone()[0]
+            if oldest is None:
+                continue
+            quarter = quarter_of(datetime.fromisoformat(oldest))
+            while quarter_bounds(quarter)[0] < cutoff:
+                quarter_start, quarter_end = quarter_bounds(quarter)
+                bounds = (_sqlite_datetime(quarter_start), _sqlite_datetime(min(quarter_end, cutoff)))
+                connection.execute("ATTACH DATABASE ? AS archive", (quarter_path(quarter, archive_dir),))
+                try:
+                    _prepare_archive_table(connection, table, column)
+                    columns = ', '.join(_columns(connection, 'main', table))
+                    connection.execute("BEGIN IMMEDIATE")
+                    try:
+                        connection.execute(
+                            f"INSERT OR IGNORE INTO archive.{table} ({columns}) "
+                            f"SELECT {columns} FROM main.{table} WHERE {column} >= ? AND {column} < ?", bounds
+                        )
+                        count = connection.execute(
+                            f"DELETE FROM main.{table} WHERE {column} >= ? AND {column} < ?", bounds
+                        ).rowcount
+                        connection.execute("COMMIT")
+                    except Exception:
+                        connection.execute("ROLLBACK")
+                        raise
+                finally:
+                    connection.execute("DETACH DATABASE archive")
+                if count:
+                    moved[(quarter, table)] = count
+                quarter = quarter_of(quarter_end)
+        if vacuum and moved:
+            connection.execute("VACUUM")
+    finally:
+        connection.close()
+    return moved
+
+
+@asynccontextmanager
+async def history_session(start=None, end=None):
+    """A read session whose shifts and audit_logs include archived rows in [start, end].
+
+    Ranges that stay within the live database get a plain session.
+    """
+    quarters = quarters_for_range(start, end)
+    if not quarters:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    async with ArchiveSessionLocal() as session:
+        schemas = []
+        for year, number in quarters:
+            schema = f"archive_{year}q{number}"
+            await session.execute(
+                text(f"ATTACH DATABASE :path AS {schema}"), {"path": quarter_path((year, number))}
+            )
+            schemas.append(schema)
+        for table in ARCHIVED_TABLES:
+            columns = [column.name for column in Base.metadata.tables[table].columns]
+            selects = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+            for schema in schemas:
+                result = await session.execute(text(f"PRAGMA {schema}.table_info({table})"))
+                present = {row[1] for row in result.all()}
+                if present:
+                    selects.append(
+                        f"SELECT {', '.join(name if name in present else f'NULL AS {name}' for name in columns)} "
+                        f"FROM {schema}.{table}"
+                    )
+            # Temporary views shadow the live tables for this connection only
+            await session.execute(text(f"CREATE TEMP VIEW {table} AS {' UNION ALL '.join(selects)}"))
+        yield session
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old shifts and audit rows into per-quarter files")
+    parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+                        help="Archive rows older than this many days")
+    parser.add_argument('--database', default=DATABASE_PATH)
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    parser.add_argument('--vacuum', action='store_true', help="Reclaim the freed space in the live database")
+    args = parser.parse_args(argv)
+
+    cutoff = datetime.utcnow() - timedelta(days=args.days)
+    moved = archive_rows(cutoff, args.database, args.archive_dir, args.vacuum)
+    for ((year, number), table), count in sorted(moved.items()):
+        print(f"{year}q{number} {table}: {count:,} rows archived")
+    if not moved:
+        print(f"Nothing older than {cutoff:%Y-%m-%d} to archive")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
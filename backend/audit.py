@@ -0,0 +1,133 @@
+"""
+Audit logging for WATCHTOWER
+
+Audited actions no longer pay for a commit of their own. Entries are
+queued in memory and a background task group-commits everything
+waiting in one transaction, flushing when AUDIT_BATCH_SIZE entries are
+waiting, AUDIT_FLUSH_SECONDS after the first of a batch arrived, and on
+shutdown. A change that must not commit without its audit row passes its
+session instead, and the row rides the same commit as the change.
+"""
+from datetime import datetime
+import asyncio
+import json
+import logging
+import uuid
+
+from sqlalchemy import insert
+
+from database import CONFIG, AsyncSessionLocal, AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BATCH_SIZE = int(CONFIG.get('AUDIT_BATCH_SIZE', 500))
+AUDIT_FLUSH_SECONDS = float(CONFIG.get('AUDIT_FLUSH_SECONDS', 1.0))
+
+
+def audit_row(user_id, action, target_type, target_id, changes=None):
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "action": action,
+        "target_type": target_type,
+        "target_id": target_id,
+        "changes_json": json.dumps(changes) if changes is not None else None,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+class AuditWriter:
+    """Buffers audit rows and writes them in batches from a background task"""
+
+    def __init__(self, batch_size=AUDIT_BATCH_SIZE, flush_seconds=AUDIT_FLUSH_SECONDS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.pending = []
+        # Held while a batch is written, so flush() waits for one already in flight
+        self.writing = asyncio.Lock()
+        self.has_pending = None
+        self.batch_full = None
+        self.stopping = False
+        self.task = None
+
+    def record(self, user_id, action, target_type, target_id, changes=None, session=None):
+        """Audit an action.
+
+        With `session`, the row is added to it and commits with the caller's
+        change; otherwise it is queued for the next batch.
+        """
+        row = audit_row(user_id, action, target_type, target_id, changes)
+        if session is not None:
+            session.add(AuditLog(**row))
+            return
+        self.pending.append(row)
+        if self.has_pending is not None:
+            self.has_pending.set()
+            if len(self.pending) >= self.batch_size:
+                self.batch_full.set()
+
+    async def write(self, rows):
+        """Insert rows batch_size at a time, all in one commit"""
+        async with AsyncSessionLocal() as session:
+            for start in range(0, len(rows), self.batch_size):
+                await session.execute(insert(AuditLog), rows[start:start + self.batch_size])
+            await session.commit()
+
+    async def flush(self):
+        """Write everything queued so far, including a batch the background task is writing"""
+        async with self.writing:
+            while self.pending:
+                batch, self.pending = self.pending, []
+                try:
+                    await self.write(batch)
+                except Exception:
+                    # Keep the rows for the next flush rather than dropping them
+                    self.pending[:0] = batch
+                    raise
+
+    def start(self):
+        # Fresh primitives bound to the running event loop
+        self.writing = asyncio.Lock()
+        self.has_pending = asyncio.Event()
+        self.batch_full = asyncio.Event()
+        self.stopping = False
+        if self.pending:
+            self.has_pending.set()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the background task once everything queued is written"""
+        if self.task is None:
+            return
+        self.stopping = True
+        self.has_pending.set()
+        self.batch_full.set()
+        await self.task
+        self.task = None
+        if self.pending:
+            logger.error(f"{len(self.pending)} audit rows could not be written")
+
+    async def run(self):
+        while True:
+            await self.has_pending.wait()
+            if not self.stopping:
+                try:
+                    await asyncio.wait_for(self.batch_full.wait(), self.flush_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            self.has_pending.clear()
+            self.batch_full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error writing audit rows: {e}")
+                if self.stopping:
+                    return
+                self.has_pending.set()
+                await asyncio.sleep(self.flush_seconds)
+            if self.stopping:
+                return
+
+
+# Shared writer, started with the app and flushed on shutdown
+audit_writer = AuditWriter()
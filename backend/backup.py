@@ -0,0 +1,171 @@
+"""
+Online backups for WATCHTOWER
+
+Snapshots are taken with SQLite's backup API on a worker thread, copying
+BACKUP_STEP_PAGES pages per step and sleeping between steps so request
+handlers keep getting the database in between. A write from another
+connection restarts an incremental backup; after BACKUP_MAX_RESTARTS
+restarts the copy is finished in a single step instead. Snapshots are
+taken every BACKUP_INTERVAL_HOURS (0 disables the schedule) and only the
+newest BACKUP_RETAIN are kept.
+"""
+from datetime import datetime
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import time
+
+from database import CONFIG, DATABASE_PATH, data_path
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = data_path(CONFIG.get('BACKUP_DIR', 'backups'))
+BACKUP_INTERVAL_HOURS = float(CONFIG.get('BACKUP_INTERVAL_HOURS', 24))
+BACKUP_RETAIN = int(CONFIG.get('BACKUP_RETAIN', 7))
+BACKUP_STEP_PAGES = int(CONFIG.get('BACKUP_STEP_PAGES', 256))
+BACKUP_STEP_SLEEP = float(CONFIG.get('BACKUP_STEP_SLEEP', 0.005))
+BACKUP_MAX_RESTARTS = int(CONFIG.get('BACKUP_MAX_RESTARTS', 3))
+BACKUP_FILE = re.compile(r'^watchtower-(\d{8}T\d{6})\.db$')
+
+
+class BackupInProgress(RuntimeError):
+    pass
+
+
+class _Restarted(Exception):
+    pass
+
+
+def backup_database(database_path=DATABASE_PATH, backup_dir=BACKUP_DIR, step_pages=BACKUP_STEP_PAGES,
+                    step_sleep=BACKUP_STEP_SLEEP, max_restarts=BACKUP_MAX_RESTARTS):
+    """Copy the live database to a new snapshot file; returns its details"""
+    os.makedirs(backup_dir, exist_ok=True)
+    started = datetime.utcnow()
+    name = f"watchtower-{started:%Y%m%dT%H%M%S}.db"
+    path = os.path.join(backup_dir, name)
+    partial = path + '.partial'
+    began = time.monotonic()
+    restarts = 0
+
+    source = sqlite3.connect(database_path)
+    target = sqlite3.connect(partial)
+    try:
+        while True:
+            remaining = []
+
+            def progress(status, left, total):
+                # Pages left only grows when the backup has started over
+                if remaining and left > remaining[-1]:
+                    raise _Restarted()
+                remaining.append(left)
+
+            try:
+                if restarts >= max_restarts:
+                    source.backup(target)
+                else:
+                    source.backup(target, pages=step_pages, progress=progress, sleep=step_sleep)
+                break
+            except _Restarted:
+                restarts += 1
+    except Exception:
+        target.close()
+        os.remove(partial)
+        raise
+    finally:
+        source.close()
+    # The copy inherits WAL mode; a rollback journal keeps each snapshot a single file
+    target.execute("PRAGMA journal_mode=DELETE")
+    target.close()
+    os.replace(partial, path)
+
+    return {
+        "file": name,
+        "bytes": os.path.getsize(path),
+        "created_at": started.isoformat(),
+        "seconds": round(time.monotonic() - began, 3),
+        "restarts": restarts,
+    }
+
+
+def list_backups(backup_dir=BACKUP_DIR):
+    """Snapshots in the backup directory, newest first"""
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        match = BACKUP_FILE.match(name)
+        if match:
+            backups.append({
+                "file": name,
+                "bytes": os.path.getsize(os.path.join(backup_dir, name)),
+                "created_at": datetime.strptime(match.group(1), '%Y%m%dT%H%M%S').isoformat(),
+            })
+    return sorted(backups, key=lambda backup: backup["created_at"], reverse=True)
+
+
+def prune_backups(retain=BACKUP_RETAIN, backup_dir=BACKUP_DIR):
+    """Delete all but the newest `retain` snapshots; returns the deleted names"""
+    removed = [backup["file"] for backup in list_backups(backup_dir)[retain:]]
+    for name in removed:
+        os.remove(os.path.join(backup_dir, name))
+    return removed
+
+
+class BackupService:
+    """Runs one backup at a time, on demand or on the schedule"""
+
+    def __init__(self, interval_hours=BACKUP_INTERVAL_HOURS, retain=BACKUP_RETAIN):
+        self.interval_hours = interval_hours
+        self.retain = retain
+        self.running = False
+        self.task = None
+
+    async def backup(self):
+        if self.running:
+            raise BackupInProgress("A backup is already running")
+        self.running = True
+        try:
+            result = await asyncio.to_thread(backup_database)
+            result["pruned"] = await asyncio.to_thread(prune_backups, self.retain)
+        finally:
+            self.running = False
+        logger.info(f"Backup {result['file']} written in {result['seconds']}s ({result['restarts']} restarts)")
+        return result
+
+    def seconds_until_due(self):
+        backups = list_backups()
+        if not backups:
+            return 0
+        elapsed = (datetime.utcnow() - datetime.fromisoformat(backups[0]["created_at"])).total_seconds()
+        return max(self.interval_hours * 3600 - elapsed, 0)
+
+    def start(self):
+        if self.interval_hours > 0:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.seconds_until_due())
+            try:
+                await self.backup()
+            except BackupInProgress:
+                # An on-demand backup is running; check again once it has had time to finish
+                await asyncio.sleep(60)
+            except Exception as e:
+                logger.error(f"Error writing scheduled backup: {e}")
+                await asyncio.sleep(self.interval_hours * 3600)
+
+
+# Shared backup service, started with the app
+backup_service = BackupService()
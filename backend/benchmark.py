@@ -0,0 +1,323 @@
+"""
+Benchmarks for WATCHTOWER
+
+Times the compliance, analytics and roster hot paths against seeded
+synthetic datasets of several sizes (see synthetic_data.py). Each target
+reports its median and best wall time over --repeat runs, the peak
+memory traced during one extra run and the SQL statements that run
+issued. Endpoints are called in-process through an ASGI client. Every
+size runs in its own process against its own temporary database.
+
+Results can be saved as a JSON baseline, written with sorted keys so
+changes show up as diffs, and later runs compared against it. Timings
+only compare meaningfully on the machine that recorded the baseline;
+query counts compare anywhere.
+
+Datasets end on a fixed day, the baseline's own end date when it records
+one, so every run measures the same rows. The endpoints look at windows
+ending today, so once the baseline is a few weeks old, record a new one
+with a later --end-date.
+
+Usage:
+    python benchmark.py --sizes 100,500 --repeat 5
+    python benchmark.py --save                  # rewrite benchmark_baselines/baseline.json
+    python benchmark.py --compare --tolerance 0.25
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines', 'baseline.json')
+DEFAULT_SIZES = (100, 500, 2000)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+# Slowdowns smaller than this are scheduling noise, whatever the ratio
+NOISE_FLOOR_MS = 5.0
+SEED = 1
+HISTORY_YEARS = 0.5
+DATASET_END_DATE = date(2026, 10, 19)
+# Older baselines give a warning, as today's windows no longer overlap the history
+STALE_AFTER_DAYS = 28
+BENCHMARK_STATION = "geelong"
+ANALYTICS_ENDPOINTS = {
+    "analytics_workload_summary": "/api/analytics/workload-summary",
+    "analytics_corro_distribution": "/api/analytics/corro-distribution",
+    "analytics_eba_violations_detail": "/api/analytics/eba-violations-detail",
+    "analytics_eba_warnings_detail": "/api/analytics/eba-warnings-detail",
+    "analytics_eba_compliant_members": "/api/analytics/eba-compliant-members",
+    "analytics_over_76_hours": "/api/analytics/over-76-hours",
+    "analytics_approaching_76_hours": "/api/analytics/approaching-76-hours",
+    "analytics_fairness": f"/api/analytics/fairness?station={BENCHMARK_STATION}",
+}
+TARGETS = (
+    "check_76_hour_fortnight", "check_eba_compliance", *ANALYTICS_ENDPOINTS,
+    "generate_roster", "get_roster_details", "publish_roster",
+)
+
+
+class BenchmarkContext:
+    """The in-process app, an authenticated client and prepared inputs for one dataset"""
+
+    def __init__(self, server, client, headers, queries):
+        self.server = server
+        self.client = client
+        self.headers = headers
+        self.queries = queries
+        self.member_shifts = {}
+        self.roster_id = None
+
+    async def request(self, method, url, expected=(200,), **kwargs):
+        response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        if response.status_code not in expected:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def generate(self):
+        response = await self.request("POST", "/api/roster/generate", json={"station": BENCHMARK_STATION})
+        return response.json()["roster_period_id"]
+
+    async def load_member_shifts(self):
+        """Each member's last four weeks of shifts, as check_eba_compliance prepares them"""
+        from sqlalchemy import select
+        from database import AsyncSessionLocal, Shift, model_to_dict
+        since = datetime.utcnow() - timedelta(weeks=4)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Shift).where(Shift.date >= since))
+            for shift in result.scalars().all():
+                self.member_shifts.setdefault(shift.member_id, []).append(model_to_dict(shift))
+        for shifts in self.member_shifts.values():
+            for shift in shifts:
+                if isinstance(shift['date'], str):
+                    shift['date'] = datetime.fromisoformat(shift['date'].replace('Z', '+00:00'))
+
+
+def targets_for(context):
+    """name -> (setup, run) coroutine functions; setup is not timed"""
+    server = context.server
+
+    async def check_76():
+        for member_id, shifts in context.member_shifts.items():
+            server.check_76_hour_fortnight(member_id, shifts)
+
+    async def check_eba():
+        from database import AsyncSessionLocal
+        async with AsyncSessionLocal() as session:
+            for member_id in context.member_shifts:
+                await server.check_eba_compliance(member_id, session)
+
+    def endpoint(url):
+        async def run():
+            await context.request("GET", url)
+        return run
+
+    async def generate():
+        context.roster_id = await context.generate()
+
+    async def cold_roster_views():
+        if context.roster_id is None:
+            context.roster_id = await context.generate()
+        server.roster_view_cache.clear()
+
+    async def roster_details():
+        await context.request("GET", f"/api/roster/{context.roster_id}")
+
+    async def publish():
+        # A roster breaching EBA rules is refused with 400 after the same validation
+        await context.request("PUT", f"/api/roster/{context.roster_id}/publish", expected=(200, 400))
+
+    targets = {
+        "check_76_hour_fortnight": (None, check_76),
+        "check_eba_compliance": (None, check_eba),
+        "generate_roster": (None, generate),
+        "get_roster_details": (cold_roster_views, roster_details),
+        "publish_roster": (generate, publish),
+    }
+    for name, url in ANALYTICS_ENDPOINTS.items():
+        targets[name] = (None, endpoint(url))
+    return targets
+
+
+async def measure(setup, run, repeat, queries):
+    """Wall times over `repeat` runs after a warm-up, then peak memory and queries of one more"""
+    times = []
+    for _ in range(repeat + 1):
+        if setup:
+            await setup()
+        started = time.perf_counter()
+        await run()
+        times.append(time.perf_counter() - started)
+    times = times[1:]
+
+    if setup:
+        await setup()
+    issued = queries[0]
+    tracemalloc.start()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 2),
+        "min_ms": round(min(times) * 1000, 2),
+        "peak_kib": round(peak / 1024),
+        "queries": queries[0] - issued,
+    }
+
+
+async def run_worker(size, repeat, selected, end_date):
+    """Build a dataset of `size` members in WATCHTOWER_DB_PATH and benchmark it"""
+    import logging
+    import httpx
+    from sqlalchemy import event
+    import server
+    from database import engine
+    from synthetic_data import generate_dataset
+
+    logging.disable(logging.INFO)
+    generate_dataset(seed=SEED, members=size, years=HISTORY_YEARS, end_date=end_date, progress=io.StringIO())
+    # No scheduled backups competing with the measurements
+    server.backup_service.interval_hours = 0
+    await server.startup_event()
+
+    queries = [0]
+
+    def count_query(*args):
+        queries[0] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        response = await client.post("/api/auth/login", json={"vp_number": "VP12345", "password": "password123"})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        context = BenchmarkContext(server, client, headers, queries)
+        await context.load_member_shifts()
+        targets = targets_for(context)
+        for name in selected:
+            setup, run = targets[name]
+            results[name] = await measure(setup, run, repeat, queries)
+    await server.shutdown_event()
+    return results
+
+
+def run_size(size, repeat, selected, end_date):
+    with tempfile.TemporaryDirectory() as directory:
+        env = {**os.environ, 'WATCHTOWER_DB_PATH': os.path.join(directory, 'benchmark.db')}
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', str(size),
+             '--repeat', str(repeat), '--targets', ','.join(selected), '--end-date', end_date.isoformat()],
+            env=env, cwd=directory, capture_output=True, text=True
+        )
+        if completed.returncode:
+            raise RuntimeError(f"Benchmark of {size} members failed:\n{completed.stderr[-2000:]}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Rows of (size, target, result, baseline result, regressed)"""
+    rows = []
+    for size, targets in results.items():
+        for name, result in targets.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            regressed = bool(base) and (
+                (result['median_ms'] > base['median_ms'] * (1 + tolerance)
+                 and result['median_ms'] - base['median_ms'] > NOISE_FLOOR_MS)
+                or result['queries'] > base['queries']
+            )
+            rows.append((size, name, result, base, regressed))
+    return rows
+
+
+def print_report(rows, out=sys.stdout):
+    print(f"{'members':>7}  {'target':<34}{'median ms':>11}{'min ms':>10}{'peak KiB':>10}{'queries':>9}  vs baseline",
+          file=out)
+    for size, name, result, base, regressed in rows:
+        change = ""
+        if base:
+            ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else 1.0
+            change = f"{ratio:5.2f}x time, {result['queries'] - base['queries']:+d} queries"
+            if regressed:
+                change += "  REGRESSED"
+        print(f"{size:>7}  {name:<34}{result['median_ms']:>11.2f}{result['min_ms']:>10.2f}"
+              f"{result['peak_kib']:>10}{result['queries']:>9}  {change}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark WATCHTOWER hot paths against synthetic data")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="Comma-separated member counts")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--targets', default=','.join(TARGETS), help="Comma-separated targets to run")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--compare', action='store_true', help="Exit 1 if any target regressed")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed median slowdown before a target counts as regressed")
+    parser.add_argument('--end-date', type=date.fromisoformat,
+                        help="Last day of dataset history (default the baseline's, else DATASET_END_DATE)")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    selected = [name for name in args.targets.split(',') if name]
+    unknown = set(selected) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    if args.worker is not None:
+        print(json.dumps(asyncio.run(run_worker(args.worker, args.repeat, selected, args.end_date))))
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    recorded_end = baseline.get('meta', {}).get('end_date')
+    end_date = args.end_date or (date.fromisoformat(recorded_end) if recorded_end else DATASET_END_DATE)
+    if (date.today() - end_date).days > STALE_AFTER_DAYS:
+        print(f"Dataset history ends {end_date}; consider a later --end-date and a new baseline",
+              file=sys.stderr)
+
+    results = {}
+    for size in [int(size) for size in args.sizes.split(',')]:
+        print(f"Benchmarking {size} members...", file=sys.stderr, flush=True)
+        results[str(size)] = run_size(size, args.repeat, selected, end_date)
+
+    rows = compare(results, baseline, args.tolerance)
+    print_report(rows)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                "meta": {
+                    "recorded_at": datetime.utcnow().isoformat(timespec='seconds'),
+                    "python": platform.python_version(),
+                    "sqlite": sqlite3.sqlite_version,
+                    "machine": platform.machine(),
+                    "seed": SEED,
+                    "history_years": HISTORY_YEARS,
+                    "end_date": end_date.isoformat(),
+                    "repeat": args.repeat,
+                },
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+
+    if args.compare and any(regressed for *_, regressed in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Bulk import for WATCHTOWER
+
+Streams members or worked shifts from CSV or NDJSON files (optionally
+gzipped) into the database in fixed-size chunks, so memory use stays flat
+however large the file is. Each chunk's dates are parsed in one NumPy
+call, vp_numbers resolve through a single prefetched map, and rows are
+written with executemany inside large transactions.
+
+Usage:
+    python bulk_import.py members members.csv
+    python bulk_import.py shifts shifts.ndjson.gz --chunk-size 50000
+
+The server warms its fairness ledger and leave index at startup, so
+restart it after importing.
+"""
+from datetime import datetime
+from functools import lru_cache
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import re
+import sqlite3
+import sys
+import time
+import uuid
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from database import DATABASE_PATH, Base, create_missing_indexes
+from migrations import run_migrations
+from roster_engine import SHIFT_TIMES
+
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_COMMIT_ROWS = 200000
+SQLITE_DATETIME = '%Y-%m-%d %H:%M:%S.%f'
+TIME_PATTERN = re.compile(r'^(\d{1,2}):?(\d{2})(?::\d{2})?$')
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+
+SHIFT_COLUMNS = (
+    'id', 'member_id', 'shift_type', 'date', 'start_time', 'end_time',
+    'overtime_hours', 'was_recalled', 'notes', 'created_at',
+)
+MEMBER_COLUMNS = (
+    'id', 'vp_number', 'name', 'email', 'station', 'rank', 'seniority_years',
+    'special_qualifications', 'ostt_qualification_date', 'ada_driver_authority',
+    'preferences_json', 'active', 'created_at', 'updated_at',
+)
+DEFAULT_PREFERENCES = json.dumps({
+    "night_shift_tolerance": 2, "recall_willingness": True, "avoid_consecutive_doubles": True,
+    "avoid_four_earlies": True, "medical_limitations": None, "welfare_notes": None,
+    "preferred_rest_days": [], "emergency_contact": None,
+})
+
+
+def open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='')
+    return open(path, 'r', newline='')
+
+
+def read_records(path, file_format=None):
+    """Yield one dict per CSV row or NDJSON line"""
+    file_format = file_format or ('ndjson' if '.ndjson' in path or '.jsonl' in path else 'csv')
+    with open_text(path) as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_datetimes(values):
+    """Parse ISO date strings in one NumPy call, as SQLite datetime strings.
+
+    Returns the strings and a validity mask; blank or malformed values are
+    invalid.
+    """
+    values = [str(value).strip() if value not in (None, '') else 'NaT' for value in values]
+    try:
+        parsed = np.array(values, dtype='datetime64[us]')
+    except ValueError:
+        # Fall back to per-value parsing to isolate the bad entries
+        parsed = np.array([_parse_one(value) for value in values], dtype='datetime64[us]')
+    valid = ~np.isnat(parsed)
+    strings = np.char.replace(np.datetime_as_string(parsed, unit='us'), 'T', ' ')
+    return strings, valid
+
+
+def _parse_one(value):
+    try:
+        return np.datetime64(value, 'us')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+@lru_cache(maxsize=1024)
+def normalise_time(value):
+    """HH:MM from '6:00', '0600' or '06:00:00'; None when unparseable"""
+    match = TIME_PATTERN.match((value or '').strip())
+    if not match:
+        return None
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours > 23 or minutes > 59:
+        return None
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def as_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+def as_float(value, default=0.0):
+    try:
+        return float(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return None
+
+
+class Importer:
+    """Writes chunks of records to SQLite and reports progress"""
+
+    def __init__(self, connection, commit_rows=DEFAULT_COMMIT_ROWS, progress=sys.stderr):
+        self.connection = connection
+        self.commit_rows = commit_rows
+        self.progress = progress
+        self.members = dict(connection.execute("SELECT vp_number, id FROM members"))
+        self.member_ids = set(self.members.values())
+        self.inserted = 0
+        self.rejected = 0
+        self.errors = []
+        self.uncommitted = 0
+        self.started = time.monotonic()
+
+    def reject(self, line, reason):
+        self.rejected += 1
+        if len(self.errors) < 20:
+            self.errors.append(f"record {line}: {reason}")
+
+    def write(self, sql, rows):
+        if not rows:
+            return
+        self.connection.executemany(sql, rows)
+        self.inserted += len(rows)
+        self.uncommitted += len(rows)
+        if self.uncommitted >= self.commit_rows:
+            self.connection.commit()
+            self.uncommitted = 0
+
+    def report(self, final=False):
+        elapsed = time.monotonic() - self.started
+        rate = self.inserted / elapsed if elapsed else 0
+        prefix = "Done:" if final else "..."
+        print(
+            f"{prefix} {self.inserted:,} imported, {self.rejected:,} rejected "
+            f"({rate:,.0f} rows/s, {elapsed:.1f}s)",
+            file=self.progress, flush=True
+        )
+
+    def finish(self):
+        self.connection.commit()
+        self.report(final=True)
+        for error in self.errors:
+            print(f"  {error}", file=self.progress)
+
+    def resolve_member(self, record):
+        member_id = (record.get('member_id') or '').strip()
+        if member_id:
+            return member_id if member_id in self.member_ids else None
+        return self.members.get((record.get('vp_number') or '').strip().upper())
+
+    def import_shifts(self, chunk, first_line):
+        dates, valid_dates = parse_datetimes([record.get('date') for record in chunk])
+        now = datetime.utcnow().strftime(SQLITE_DATETIME)
+        rows = []
+        for offset, record in enumerate(chunk):
+            line = first_line + offset
+            member_id = self.resolve_member(record)
+            shift_type = (record.get('shift_type') or '').strip().lower()
+            start_time = normalise_time(record.get('start_time'))
+            end_time = normalise_time(record.get('end_time'))
+            overtime_hours = as_float(record.get('overtime_hours'))
+
+            if member_id is None:
+                self.reject(line, "unknown member")
+            elif shift_type not in SHIFT_TIMES:
+                self.reject(line, f"unknown shift type {shift_type!r}")
+            elif not valid_dates[offset]:
+                self.reject(line, f"invalid date {record.get('date')!r}")
+            elif start_time is None or end_time is None:
+                self.reject(line, "times must be HH:MM")
+            elif overtime_hours is None:
+                self.reject(line, "invalid overtime_hours")
+            else:
+                rows.append((
+                    record.get('id') or str(uuid.uuid4()), member_id, shift_type, str(dates[offset]),
+                    start_time, end_time, overtime_hours, as_bool(record.get('was_recalled')),
+                    record.get('notes') or None, now
+                ))
+        self.write(
+            f"INSERT INTO shifts ({', '.join(SHIFT_COLUMNS)}) VALUES ({', '.join('?' * len(SHIFT_COLUMNS))})",
+            rows
+        )
+
+    def import_members(self, chunk, first_line):
+        ostt_dates, valid_ostt = parse_datetimes([record.get('ostt_qualification_date') for record in chunk])
+        now = datetime.utcnow().strftime(SQLITE_DATETIME)
+        rows = []
+        for offset, record in enumerate(chunk):
+            vp_number = (record.get('vp_number') or '').strip().upper()
+            if not vp_number or not record.get('name') or not record.get('station'):
+                self.reject(first_line + offset, "vp_number, name and station are required")
+                continue
+            qualifications = record.get('special_qualifications') or []
+            if isinstance(qualifications, str):
+                qualifications = [q.strip() for q in qualifications.split(';') if q.strip()]
+            seniority = as_float(record.get('seniority_years'))
+
+            member_id = self.members.get(vp_number) or str(uuid.uuid4())
+            self.members[vp_number] = member_id
+            self.member_ids.add(member_id)
+            rows.append((
+                member_id, vp_number, record['name'].strip(), (record.get('email') or '').strip(),
+                record['station'].strip().lower(), (record.get('rank') or 'Constable').strip(),
+                int(seniority or 0), json.dumps(qualifications),
+                str(ostt_dates[offset]) if valid_ostt[offset] else None,
+                as_bool(record.get('ada_driver_authority')),
+                DEFAULT_PREFERENCES, as_bool(record.get('active', True)), now, now
+            ))
+        # Re-importing a member updates their record and keeps their preferences
+        self.write(
+            f"INSERT INTO members ({', '.join(MEMBER_COLUMNS)}) VALUES ({', '.join('?' * len(MEMBER_COLUMNS))}) "
+            "ON CONFLICT(vp_number) DO UPDATE SET name=excluded.name, email=excluded.email, "
+            "station=excluded.station, rank=excluded.rank, seniority_years=excluded.seniority_years, "
+            "special_qualifications=excluded.special_qualifications, "
+            "ostt_qualification_date=excluded.ostt_qualification_date, "
+            "ada_driver_authority=excluded.ada_driver_authority, active=excluded.active, "
+            "updated_at=excluded.updated_at",
+            rows
+        )
+
+
+def ensure_schema(database_path):
+    """Create any missing tables, apply migrations and add missing indexes before writing"""
+    sync_engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as connection:
+        run_migrations(connection)
+        create_missing_indexes(connection)
+    sync_engine.dispose()
+
+
+def run_import(kind, path, database_path=DATABASE_PATH, file_format=None,
+               chunk_size=DEFAULT_CHUNK_SIZE, commit_rows=DEFAULT_COMMIT_ROWS, progress=sys.stderr):
+    """Import a members or shifts file; returns the Importer with its counts"""
+    ensure_schema(database_path)
+    connection = sqlite3.connect(database_path)
+    try:
+        importer = Importer(connection, commit_rows, progress)
+        import_chunk = importer.import_shifts if kind == 'shifts' else importer.import_members
+        line = 1
+        for chunk in chunked(read_records(path, file_format), chunk_size):
+            import_chunk(chunk, line)
+            line += len(chunk)
+            importer.report()
+        importer.finish()
+        return importer
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import members or worked shifts into WATCHTOWER")
+    parser.add_argument('kind', choices=['members', 'shifts'])
+    parser.add_argument('path', help="CSV or NDJSON file, optionally .gz")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help="Override detection from the file name")
+    parser.add_argument('--database', default=DATABASE_PATH)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--commit-rows', type=int, default=DEFAULT_COMMIT_ROWS,
+                        help="Rows written per transaction")
+    args = parser.parse_args(argv)
+
+    importer = run_import(
+        args.kind, args.path, args.database, args.format, args.chunk_size, args.commit_rows
+    )
+    return 1 if importer.rejected and not importer.inserted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
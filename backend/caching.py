@@ -0,0 +1,50 @@
+"""
+In-process caches for WATCHTOWER
+"""
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Least-recently-used mapping with a fixed number of entries"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key matches `predicate`"""
+        for key in [key for key in self.entries if predicate(key)]:
+            del self.entries[key]
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {"size": len(self.entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
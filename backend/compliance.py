@@ -0,0 +1,225 @@
+"""
+Vectorised EBA validation for WATCHTOWER
+
+Checks every member's combined worked shifts and rostered assignments in
+one pass over sorted NumPy arrays: the 76h fortnight limit, the 10h break
+between shifts, recovery after consecutive nights and the maximum run of
+consecutive working days. Only breaches that involve at least one
+rostered assignment are reported, so existing history alone cannot block
+a roster.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+
+FORTNIGHT_HOURS = 14 * 24
+# Offset separating members on the combined sort key; far larger than any shift timestamp
+MEMBER_STRIDE = 1e8
+
+DEFAULT_RULES = {
+    "max_fortnight_hours": 76.0,
+    "min_break_hours": 10.0,
+    "max_consecutive_nights": 7,
+    "night_recovery_hours": 24.0,
+    "max_consecutive_days": 5,
+}
+
+
+class ShiftTable:
+    """Columnar shifts for many members, sorted by (member, start).
+
+    Built from (member_id, start, end, hours, shift_type, from_roster)
+    records; times are stored as float hours since midnight of `epoch`.
+    """
+
+    def __init__(self, records, epoch=None):
+        records = list(records)
+        # Midnight epoch so whole days are floor(hours / 24)
+        epoch = epoch or (min(r[1] for r in records) if records else datetime.utcnow())
+        self.epoch = datetime.combine(epoch.date(), datetime.min.time())
+        self.member_ids = sorted({r[0] for r in records})
+        index = {member_id: i for i, member_id in enumerate(self.member_ids)}
+
+        member = np.array([index[r[0]] for r in records], dtype=np.int64)
+        start = np.array([(r[1] - self.epoch).total_seconds() / 3600 for r in records], dtype=float)
+        order = np.lexsort((start, member))
+
+        self.member = member[order]
+        self.start = start[order]
+        self.end = np.array([(r[2] - self.epoch).total_seconds() / 3600 for r in records], dtype=float)[order]
+        self.hours = np.array([r[3] for r in records], dtype=float)[order]
+        self.is_night = np.array([r[4] == 'night' for r in records], dtype=bool)[order]
+        self.from_roster = np.array([bool(r[5]) for r in records], dtype=bool)[order]
+
+    def __len__(self):
+        return len(self.start)
+
+    def moment(self, hours):
+        return self.epoch + timedelta(hours=float(hours))
+
+
+def _violation(table, i, rule, message, **extra):
+    return dict(
+        member_id=table.member_ids[table.member[i]],
+        rule=rule,
+        date=table.moment(table.start[i]).date().isoformat(),
+        message=message,
+        **extra
+    )
+
+
+def fortnight_totals(key, hours):
+    """Hours in the fortnight window that opens at each shift.
+
+    This is the one definition of the 76h rule's window: it runs
+    FORTNIGHT_HOURS from a shift's start and counts every shift of the
+    same member starting inside it. `key` holds ascending start hours,
+    offset by MEMBER_STRIDE per member. Returns the totals and, per
+    shift, the index just past its window.
+    """
+    window_end = np.searchsorted(key, key + FORTNIGHT_HOURS, side='left')
+    cumulative = np.concatenate([[0.0], np.cumsum(hours)])
+    return cumulative[window_end] - cumulative[np.arange(len(key))], window_end
+
+
+def candidate_fortnight_hours(member, start, hours, size, candidate_start, candidate_hours):
+    """Worst fortnight total each member would reach by adding one more shift.
+
+    `member`, `start` and `hours` describe existing shifts (member index,
+    start in hours, hours); every one of the `size` members gets a
+    candidate shift at `candidate_start`. The result per member is the
+    largest fortnight_totals window that contains their candidate, which
+    is what check_fortnight_hours would measure once the shift is added.
+    """
+    member = np.concatenate([np.asarray(member, dtype=np.int64), np.arange(size)])
+    start = np.concatenate([np.asarray(start, dtype=float), np.full(size, float(candidate_start))])
+    hours = np.concatenate([np.asarray(hours, dtype=float), np.full(size, float(candidate_hours))])
+    order = np.lexsort((start, member))
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    candidate_position = position[len(order) - size:]
+
+    totals, window_end = fortnight_totals(member[order] * MEMBER_STRIDE + start[order], hours[order])
+    member = member[order]
+    own_candidate = candidate_position[member]
+    contains = (np.arange(len(order)) <= own_candidate) & (window_end > own_candidate)
+    worst = np.zeros(size)
+    np.maximum.at(worst, member[contains], totals[contains])
+    return worst
+
+
+def check_fortnight_hours(table, max_hours):
+    """Worst fortnight window per member that exceeds the limit and contains a roster shift"""
+    totals, window_end = fortnight_totals(table.member * MEMBER_STRIDE + table.start, table.hours)
+
+    roster_count = np.concatenate([[0], np.cumsum(table.from_roster)])
+    has_roster = roster_count[window_end] - roster_count[np.arange(len(table))] > 0
+    breaching = np.flatnonzero((totals > max_hours) & has_roster)
+
+    violations = []
+    for member in np.unique(table.member[breaching]):
+        windows = breaching[table.member[breaching] == member]
+        worst = windows[np.argmax(totals[windows])]
+        violations.append(_violation(
+            table, worst, "fortnight_hours",
+            f"Exceeds {max_hours:.0f}h limit: {totals[worst]:.1f}h in fortnight starting "
+            f"{table.moment(table.start[worst]).strftime('%Y-%m-%d')}",
+            hours=round(float(totals[worst]), 1), windows=int(len(windows))
+        ))
+    return violations
+
+
+def check_breaks(table, min_break_hours):
+    """Gaps shorter than the minimum break between a member's consecutive shifts"""
+    same_member = table.member[1:] == table.member[:-1]
+    gaps = table.start[1:] - table.end[:-1]
+    involves_roster = table.from_roster[1:] | table.from_roster[:-1]
+    short = np.flatnonzero(same_member & involves_roster & (gaps < min_break_hours)) + 1
+    return [
+        _violation(
+            table, i, "min_break",
+            f"Only {gaps[i - 1]:.1f}h break before shift on {table.moment(table.start[i]).strftime('%Y-%m-%d')}",
+            break_hours=round(float(gaps[i - 1]), 1)
+        )
+        for i in short
+    ]
+
+
+def _run_lengths(continues):
+    """Length of the run each element ends, where `continues[i]` links i to i-1"""
+    n = len(continues)
+    positions = np.arange(n)
+    run_start = np.maximum.accumulate(np.where(continues, 0, positions))
+    return positions - run_start + 1
+
+
+def check_night_recovery(table, max_consecutive_nights, recovery_hours):
+    """Runs of consecutive nights at the limit not followed by the recovery period"""
+    n = len(table)
+    if n < 2:
+        return []
+    same_member = np.concatenate([[False], table.member[1:] == table.member[:-1]])
+    continues = same_member & table.is_night & np.roll(table.is_night, 1)
+    night_run = np.where(table.is_night, _run_lengths(continues), 0)
+    run_id = np.cumsum(~continues)
+
+    recovery = table.start[1:] - table.end[:-1]
+    involves_roster = table.from_roster[1:] | table.from_roster[:-1]
+    breaching = np.flatnonzero(
+        (night_run[:-1] >= max_consecutive_nights) & same_member[1:] & involves_roster & (recovery < recovery_hours)
+    )
+    # One report per run of nights
+    _, first_in_run = np.unique(run_id[breaching], return_index=True)
+
+    return [
+        _violation(
+            table, i, "night_recovery",
+            f"{int(night_run[i])} consecutive night shifts without {recovery_hours:.0f}h recovery - "
+            f"ended {table.moment(table.start[i]).strftime('%Y-%m-%d')}",
+            consecutive_nights=int(night_run[i])
+        )
+        for i in breaching[first_in_run]
+    ]
+
+
+def check_consecutive_days(table, max_consecutive_days):
+    """Runs of more than the allowed number of consecutive working days"""
+    if not len(table):
+        return []
+    day = np.floor(table.start / 24).astype(np.int64)
+    key = table.member * int(MEMBER_STRIDE) + day
+    unique_key, first = np.unique(key, return_index=True)
+    roster_days = np.zeros(len(unique_key), dtype=bool)
+    np.logical_or.at(roster_days, np.searchsorted(unique_key, key), table.from_roster)
+
+    continues = np.concatenate([[False], np.diff(unique_key) == 1])
+    runs = _run_lengths(continues)
+    run_id = np.cumsum(~continues)
+    run_total = np.bincount(run_id)[run_id]
+    roster_in_run = np.zeros(run_id[-1] + 1, dtype=bool)
+    np.logical_or.at(roster_in_run, run_id, roster_days)
+
+    # Report each over-long run once, at the day it first exceeds the limit
+    breaching = np.flatnonzero((runs == max_consecutive_days + 1) & roster_in_run[run_id])
+    return [
+        _violation(
+            table, first[i], "consecutive_days",
+            f"{int(run_total[i])} consecutive working days from "
+            f"{table.moment(table.start[first[i - max_consecutive_days]]).strftime('%Y-%m-%d')}",
+            consecutive_days=int(run_total[i])
+        )
+        for i in breaching
+    ]
+
+
+def validate(table, rules=None):
+    """Run every EBA rule over a ShiftTable and return structured violations"""
+    rules = dict(DEFAULT_RULES, **(rules or {}))
+    if not len(table):
+        return []
+    violations = (
+        check_fortnight_hours(table, rules["max_fortnight_hours"])
+        + check_breaks(table, rules["min_break_hours"])
+        + check_night_recovery(table, rules["max_consecutive_nights"], rules["night_recovery_hours"])
+        + check_consecutive_days(table, rules["max_consecutive_days"])
+    )
+    return sorted(violations, key=lambda v: (v["member_id"], v["date"], v["rule"]))
@@ -0,0 +1,132 @@
+"""
+Roster coverage index for WATCHTOWER
+
+Keeps a roster period's staffing as a day x shift-type count matrix plus a
+day bitmap per member, so "how many on van this day", "is this member
+already working that day" and "which slots are short" are answered
+without scanning ShiftAssignments. The index is kept current by applying
+each assignment added or removed, or a whole roster version diff.
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta
+import numpy as np
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class CoverageIndex:
+    """Staffing counts and member occupancy for one roster period"""
+
+    def __init__(self, start_date, total_days, shift_types, version=0):
+        self.start_date = _as_date(start_date)
+        self.total_days = total_days
+        self.shift_types = tuple(shift_types)
+        self.version = version
+        self.type_index = {shift_type: i for i, shift_type in enumerate(self.shift_types)}
+        self.counts = np.zeros((total_days, len(self.shift_types)), dtype=np.int32)
+        self.occupancy = {}
+        self.member_days = {}
+        self.assignments = {}
+
+    @classmethod
+    def from_snapshot(cls, start_date, total_days, shift_types, snapshot, version=0):
+        """Build from a roster version snapshot (assignment id -> row)"""
+        index = cls(start_date, total_days, shift_types, version)
+        for assignment_id, row in snapshot.items():
+            index.add_row(assignment_id, row)
+        return index
+
+    def _day(self, value):
+        day = (_as_date(value) - self.start_date).days
+        return day if 0 <= day < self.total_days else None
+
+    def add(self, assignment_id, member_id, assignment_date, shift_type):
+        if assignment_id in self.assignments:
+            self.remove(assignment_id)
+        day = self._day(assignment_date)
+        column = self.type_index.get(shift_type)
+        self.assignments[assignment_id] = (member_id, day, column)
+        if day is None:
+            return
+        if column is not None:
+            self.counts[day, column] += 1
+        days = self.member_days.setdefault(member_id, Counter())
+        days[day] += 1
+        if days[day] == 1:
+            self.occupancy[member_id] = self.occupancy.get(member_id, 0) | (1 << day)
+
+    def add_row(self, assignment_id, row):
+        """Add a snapshot row: [member_id, date, shift_type, ...]"""
+        self.add(assignment_id, row[0], row[1], row[2])
+
+    def remove(self, assignment_id):
+        entry = self.assignments.pop(assignment_id, None)
+        if entry is None:
+            return
+        member_id, day, column = entry
+        if day is None:
+            return
+        if column is not None:
+            self.counts[day, column] -= 1
+        days = self.member_days[member_id]
+        days[day] -= 1
+        if not days[day]:
+            del days[day]
+            self.occupancy[member_id] &= ~(1 << day)
+
+    def apply_diff(self, diff, version=None):
+        """Apply a roster version diff of added, removed and changed rows"""
+        for assignment_id in diff.get("removed", []):
+            self.remove(assignment_id)
+        for assignment_id, row in diff.get("added", {}).items():
+            self.add_row(assignment_id, row)
+        for assignment_id, row in diff.get("changed", {}).items():
+            self.add_row(assignment_id, row)
+        if version is not None:
+            self.version = version
+
+    def count(self, assignment_date, shift_type):
+        day = self._day(assignment_date)
+        column = self.type_index.get(shift_type)
+        if day is None or column is None:
+            return 0
+        return int(self.counts[day, column])
+
+    def is_occupied(self, member_id, assignment_date):
+        day = self._day(assignment_date)
+        return day is not None and bool(self.occupancy.get(member_id, 0) >> day & 1)
+
+    def required_counts(self, requirements):
+        """Per-shift-type minimum staffing as a row aligned with the count matrix"""
+        required = np.zeros(len(self.shift_types), dtype=np.int32)
+        for shift_type, minimum in requirements.items():
+            required[self.type_index[shift_type]] = minimum
+        return required
+
+    def understaffed(self, requirements):
+        """Every (day, shift type) below its minimum, with the shortfall"""
+        shortfall = self.required_counts(requirements) - self.counts
+        days, columns = np.nonzero(shortfall > 0)
+        return [
+            {
+                "date": (self.start_date + timedelta(days=int(day))).isoformat(),
+                "shift_type": self.shift_types[column],
+                "required": int(shortfall[day, column] + self.counts[day, column]),
+                "assigned": int(self.counts[day, column]),
+                "shortfall": int(shortfall[day, column]),
+            }
+            for day, column in zip(days, columns)
+        ]
+
+    def summary(self):
+        """Assigned counts per shift type, one entry per day"""
+        return {
+            "dates": [(self.start_date + timedelta(days=day)).isoformat() for day in range(self.total_days)],
+            **{shift_type: self.counts[:, i].tolist() for i, shift_type in enumerate(self.shift_types)},
+        }
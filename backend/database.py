@@ -3,7 +3,7 @@ SQLite Database Configuration and Models for WATCHTOWER
 """
 import sqlite3
 import aiosqlite
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, UniqueConstraint, Index, Computed
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
@@ -13,6 +13,8 @@ import json
 import os
 from pathlib import Path
 
+from migrations import run_migrations, RECALL_WILLINGNESS_SQL, NIGHT_SHIFT_TOLERANCE_SQL
+
 # Configuration loader
 def load_config():
     """Load configuration from config.txt file"""
@@ -36,8 +38,18 @@ def load_config():
 CONFIG = load_config()
 
 # Database setup
-DATABASE_PATH = CONFIG.get('DB_PATH', 'watchtower.db')
+# WATCHTOWER_DB_PATH overrides the configured path, e.g. for benchmarks and load tests.
+# A relative DB_PATH is kept next to this module wherever the server is started from
+DATABASE_PATH = os.environ.get('WATCHTOWER_DB_PATH') or str(
+    Path(__file__).parent / CONFIG.get('DB_PATH', 'watchtower.db')
+)
 DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+SQLITE_JOURNAL_MODE = CONFIG.get('SQLITE_JOURNAL_MODE', 'wal')
+
+
+def data_path(path):
+    """Resolve a configured path relative to the database file's directory"""
+    return os.path.join(os.path.dirname(os.path.abspath(DATABASE_PATH)), path)
 
 # Create async engine
 engine = create_async_engine(DATABASE_URL, echo=False)
@@ -75,12 +87,46 @@ class Member(Base):
     ostt_qualification_date = Column(DateTime)  # OSTT qualification date
     ada_driver_authority = Column(Boolean, default=False)  # ADA driver authority
     preferences_json = Column(Text)  # JSON string of preferences
+    recall_willingness = Column(Integer, Computed(RECALL_WILLINGNESS_SQL, persisted=False))  # From preferences_json
+    night_shift_tolerance = Column(Integer, Computed(NIGHT_SHIFT_TOLERANCE_SQL, persisted=False))  # From preferences_json
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     shifts = relationship("Shift", back_populates="member")
+    
+    __table_args__ = (
+        Index("ix_members_name_id", "name", "id"),
+        Index("ix_members_station_recall", "station", "recall_willingness"),
+        Index("ix_members_station_night_tolerance", "station", "night_shift_tolerance"),
+    )
+
+class MemberRestDay(Base):
+    __tablename__ = "member_rest_days"
+    
+    # Maintained from members.preferences_json by triggers (see migrations.py)
+    member_id = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)  # Lower-case day name, e.g. saturday
+    
+    __table_args__ = (Index("ix_member_rest_days_day_member", "day", "member_id"),)
+
+class MemberQualification(Base):
+    __tablename__ = "member_qualifications"
+    
+    # Kept in step with members.special_qualifications by triggers (see migrations.py)
+    member_id = Column(String, primary_key=True)
+    qualification = Column(String, primary_key=True)
+    expires_at = Column(DateTime)  # None when the qualification does not expire
+    
+    __table_args__ = (Index("ix_member_qualifications_qualification_member", "qualification", "member_id"),)
+
+class MemberReliefStation(Base):
+    __tablename__ = "member_relief_stations"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    member_id = Column(String, ForeignKey("members.id"), index=True)
+    station = Column(String, index=True)  # Station the member relieves at besides their own
 
 class Shift(Base):
     __tablename__ = "shifts"
@@ -98,6 +144,11 @@ class Shift(Base):
     
     # Relationships
     member = relationship("Member", back_populates="shifts")
+    
+    __table_args__ = (
+        Index("ix_shifts_member_date", "member_id", "date"),
+        Index("ix_shifts_date_id", "date", "id"),
+    )
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
@@ -109,6 +160,14 @@ class AuditLog(Base):
     target_id = Column(String)
     changes_json = Column(Text)  # JSON string
     timestamp = Column(DateTime, default=datetime.utcnow)
+    
+    # Each filter of GET /audit seeks its own index in (timestamp, id) order
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_user_timestamp", "user_id", "timestamp", "id"),
+        Index("ix_audit_logs_target_timestamp", "target_type", "target_id", "timestamp", "id"),
+        Index("ix_audit_logs_action_timestamp", "action", "timestamp", "id"),
+    )
 
 class RosterPeriod(Base):
     __tablename__ = "roster_periods"
@@ -121,6 +180,7 @@ class RosterPeriod(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     published_at = Column(DateTime)
     station = Column(String)
+    rules_json = Column(Text)  # JSON string of the EBA rule overrides it was generated with
     
     # Relationships
     assignments = relationship("ShiftAssignment", back_populates="roster_period")
@@ -143,6 +203,50 @@ class ShiftAssignment(Base):
     
     # Relationships
     roster_period = relationship("RosterPeriod", back_populates="assignments")
+    
+    __table_args__ = (Index("ix_shift_assignments_member_date", "member_id", "date"),)
+
+class RosterVersion(Base):
+    __tablename__ = "roster_versions"
+    __table_args__ = (UniqueConstraint("roster_period_id", "version"),)
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    roster_period_id = Column(String, ForeignKey("roster_periods.id"), index=True)
+    version = Column(Integer)
+    snapshot_json = Column(Text)  # Full assignment snapshot on checkpoint versions only
+    diff_json = Column(Text)  # JSON of added, removed and changed assignments vs previous version
+    added_count = Column(Integer, default=0)
+    removed_count = Column(Integer, default=0)
+    changed_count = Column(Integer, default=0)
+    created_by = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class RotationTemplate(Base):
+    __tablename__ = "rotation_templates"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, unique=True, index=True)
+    station = Column(String)
+    pattern_json = Column(Text)  # JSON list of shift codes per day, "off" for rest days
+    created_by = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    assignments = relationship("RotationAssignment", back_populates="template")
+
+class RotationAssignment(Base):
+    __tablename__ = "rotation_assignments"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    template_id = Column(String, ForeignKey("rotation_templates.id"))
+    member_id = Column(String, index=True)
+    offset = Column(Integer, default=0)  # Pattern day the member is on at anchor_date
+    anchor_date = Column(DateTime)
+    active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    template = relationship("RotationTemplate", back_populates="assignments")
 
 class RosterPublication(Base):
     __tablename__ = "roster_publications"
@@ -182,6 +286,8 @@ class LeaveRequest(Base):
     status = Column(String, default="pending")  # pending, approved, denied
     approved_by = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (Index("ix_leave_requests_member_start", "member_id", "start_date"),)
 
 # Database session management
 async def get_db():
@@ -195,7 +301,17 @@ async def get_db():
 async def init_database():
     """Initialize database tables"""
     async with engine.begin() as conn:
+        # WAL lets readers, including online backups, run without blocking writers
+        await conn.exec_driver_sql(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        await conn.run_sync(create_missing_indexes)
+
+def create_missing_indexes(connection):
+    """create_all only builds indexes with new tables, so add any missing from existing ones"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
 
 # Helper functions for data conversion
 def dict_to_model(model_class, data_dict):
@@ -0,0 +1,72 @@
+"""
+Streaming exports for WATCHTOWER
+
+Rows are read in keyset batches ordered by (date, id), each batch in its
+own short session, and encoded to CSV or NDJSON one batch at a time. The
+response starts with the first batch and memory holds one batch however
+many rows match.
+"""
+from datetime import datetime
+import csv
+import io
+import json
+
+from sqlalchemy import select, and_
+
+from database import CONFIG, AsyncSessionLocal
+from pagination import keyset_after
+
+EXPORT_BATCH_SIZE = int(CONFIG.get('EXPORT_BATCH_SIZE', 5000))
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def keyset_batches(columns, conditions, date_column, id_column, batch_size=EXPORT_BATCH_SIZE,
+                         session_factory=AsyncSessionLocal):
+    """Yield lists of rows ordered by (date, id), resuming after the last key of each batch"""
+    last = None
+    while True:
+        query = select(*columns)
+        if conditions:
+            query = query.where(and_(*conditions))
+        if last is not None:
+            query = query.where(keyset_after(date_column, id_column, last))
+        query = query.order_by(date_column, id_column).limit(batch_size)
+
+        async with session_factory() as session:
+            result = await session.execute(query)
+            rows = result.all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last = (rows[-1]._mapping[date_column], rows[-1]._mapping[id_column])
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def encode_rows(batches, fields, export_format, transform=None):
+    """Encode row batches as CSV (with a header) or NDJSON, one chunk per batch"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue().encode()
+
+    async for rows in batches:
+        records = [transform(row) if transform else dict(row._mapping) for row in rows]
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([[_plain(record.get(field)) for field in fields] for record in records])
+        else:
+            buffer = io.StringIO()
+            for record in records:
+                buffer.write(json.dumps({field: _plain(record.get(field)) for field in fields}))
+                buffer.write("\n")
+        yield buffer.getvalue().encode()
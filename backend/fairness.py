@@ -0,0 +1,248 @@
+"""
+Fairness ledger for WATCHTOWER
+
+Keeps rolling per-member counts of corro, night and weekend shifts and
+overtime hours for each station in NumPy arrays, so equity measures for a
+whole station (Gini coefficients, percentile positions) are one
+vectorised call for both the roster solver and the analytics endpoints.
+"""
+from datetime import datetime, date, timedelta
+import numpy as np
+
+LEDGER_WINDOW_DAYS = 90
+METRICS = ('corro_shifts', 'night_shifts', 'weekend_shifts', 'overtime_hours')
+
+
+def shift_metrics(shift_type, shift_date, overtime_hours=0.0):
+    """Ledger increments for a single worked shift"""
+    return np.array([
+        shift_type == 'corro',
+        shift_type == 'night',
+        shift_date.weekday() >= 5,
+        overtime_hours or 0.0,
+    ], dtype=float)
+
+
+def gini(values):
+    """Gini coefficient of each column of a (members x metrics) array"""
+    values = np.sort(np.asarray(values, dtype=float), axis=0)
+    n = values.shape[0]
+    totals = values.sum(axis=0)
+    if n == 0:
+        return np.zeros(values.shape[1:])
+    ranks = np.arange(1, n + 1).reshape(-1, *([1] * (values.ndim - 1)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = (2 * (ranks * values).sum(axis=0)) / (n * totals) - (n + 1) / n
+    return np.where(totals > 0, result, 0.0)
+
+
+def percentile_positions(values):
+    """Percentile rank (0-100) of every entry within its column, ties averaged"""
+    values = np.asarray(values, dtype=float)
+    n = values.shape[0]
+    if n == 0:
+        return values.copy()
+    ordered = np.sort(values, axis=0)
+    positions = np.empty_like(values)
+    for column in range(values.shape[1]):
+        below = np.searchsorted(ordered[:, column], values[:, column], side='left')
+        at_or_below = np.searchsorted(ordered[:, column], values[:, column], side='right')
+        positions[:, column] = (below + at_or_below) / 2 / n * 100
+    return positions
+
+
+class StationLedger:
+    """Rolling fairness counts for the members of one station.
+
+    Counts live in a ring buffer of LEDGER_WINDOW_DAYS daily buckets of
+    shape (members x metrics). Recording a shift touches one bucket and
+    the running totals; moving the window forward subtracts the buckets
+    that fall out of it. Shifts dated after the current day wait in
+    `pending` until the window reaches them.
+    """
+
+    def __init__(self, station, today=None, window_days=LEDGER_WINDOW_DAYS):
+        self.station = station
+        self.window_days = window_days
+        self.member_ids = []
+        self.index = {}
+        self.buckets = np.zeros((window_days, 0, len(METRICS)))
+        self.bucket_day = np.full(window_days, -1, dtype=np.int64)
+        self.totals = np.zeros((0, len(METRICS)))
+        self.pending = []
+        self.today = (today or datetime.utcnow().date()).toordinal()
+
+    def _member_index(self, member_id):
+        i = self.index.get(member_id)
+        if i is None:
+            i = len(self.member_ids)
+            self.member_ids.append(member_id)
+            self.index[member_id] = i
+            self.buckets = np.concatenate([self.buckets, np.zeros((self.window_days, 1, len(METRICS)))], axis=1)
+            self.totals = np.vstack([self.totals, np.zeros(len(METRICS))])
+        return i
+
+    def add_member(self, member_id):
+        """Make sure a member has a row even before they work a shift"""
+        self._member_index(member_id)
+
+    def advance(self, today=None):
+        """Move the window so it ends on `today`, expiring old buckets"""
+        today = (today or datetime.utcnow().date()).toordinal()
+        if today <= self.today:
+            return
+        self.today = today
+        stale = (self.bucket_day >= 0) & (self.bucket_day <= today - self.window_days)
+        if stale.any():
+            self.totals -= self.buckets[stale].sum(axis=0)
+            self.buckets[stale] = 0
+            self.bucket_day[stale] = -1
+
+        due = [entry for entry in self.pending if entry[1] <= today]
+        if due:
+            self.pending = [entry for entry in self.pending if entry[1] > today]
+            for member_id, day, increments in due:
+                self._apply(member_id, day, increments)
+
+    def _bucket(self, day):
+        """Ring-buffer slot for `day`, clearing whatever older day it held"""
+        slot = day % self.window_days
+        if self.bucket_day[slot] != day:
+            if self.bucket_day[slot] >= 0:
+                self.totals -= self.buckets[slot]
+            self.buckets[slot] = 0
+            self.bucket_day[slot] = day
+        return slot
+
+    def _apply(self, member_id, day, increments):
+        if day <= self.today - self.window_days:
+            return
+        i = self._member_index(member_id)
+        slot = self._bucket(day)
+        self.buckets[slot, i] += increments
+        self.totals[i] += increments
+
+    def record(self, member_id, shift_type, shift_date, overtime_hours=0.0, sign=1):
+        """Add (or with sign=-1 remove) a worked shift"""
+        day_value = shift_date.date() if isinstance(shift_date, datetime) else shift_date
+        day = day_value.toordinal()
+        increments = sign * shift_metrics(shift_type, day_value, overtime_hours)
+        if day > self.today:
+            self._member_index(member_id)
+            self.pending.append((member_id, day, increments))
+        else:
+            self._apply(member_id, day, increments)
+
+    def record_many(self, shifts):
+        """Add many worked shift dicts with one scatter-add into the buckets"""
+        rows, days, increments = [], [], []
+        for shift in shifts:
+            day_value = shift['date'].date() if isinstance(shift['date'], datetime) else shift['date']
+            day = day_value.toordinal()
+            shift_increments = shift_metrics(shift['shift_type'], day_value, shift.get('overtime_hours') or 0.0)
+            if day > self.today:
+                self._member_index(shift['member_id'])
+                self.pending.append((shift['member_id'], day, shift_increments))
+            elif day > self.today - self.window_days:
+                rows.append(self._member_index(shift['member_id']))
+                days.append(day)
+                increments.append(shift_increments)
+        if not rows:
+            return
+
+        slot_of = {day: self._bucket(day) for day in set(days)}
+        rows = np.array(rows, dtype=np.int64)
+        increments = np.array(increments)
+        np.add.at(self.buckets, (np.array([slot_of[day] for day in days]), rows), increments)
+        np.add.at(self.totals, rows, increments)
+
+    def positions(self, member_ids=None):
+        """Percentile positions (members x metrics) for the given members, station order by default"""
+        positions = percentile_positions(self.totals)
+        if member_ids is None:
+            return positions
+        rows = np.array([self.index.get(member_id, -1) for member_id in member_ids], dtype=int)
+        result = np.full((len(rows), len(METRICS)), 50.0)
+        known = rows >= 0
+        result[known] = positions[rows[known]]
+        return result
+
+    def gini(self):
+        """Gini coefficient per metric across the station"""
+        return gini(self.totals)
+
+    def snapshot(self):
+        """Totals, percentile positions and Gini coefficients as plain data"""
+        positions = self.positions()
+        return {
+            "station": self.station,
+            "window_days": self.window_days,
+            "as_of": date.fromordinal(self.today).isoformat(),
+            "gini": dict(zip(METRICS, self.gini().round(4).tolist())),
+            "members": [
+                {
+                    "member_id": member_id,
+                    "totals": dict(zip(METRICS, self.totals[i].round(2).tolist())),
+                    "percentiles": dict(zip(METRICS, positions[i].round(1).tolist())),
+                }
+                for i, member_id in enumerate(self.member_ids)
+            ],
+        }
+
+
+class FairnessLedger:
+    """Station ledgers keyed by station name"""
+
+    def __init__(self, window_days=LEDGER_WINDOW_DAYS):
+        self.window_days = window_days
+        self.stations = {}
+        self.member_station = {}
+
+    def station(self, station):
+        ledger = self.stations.get(station)
+        if ledger is None:
+            ledger = StationLedger(station, window_days=self.window_days)
+            self.stations[station] = ledger
+        ledger.advance()
+        return ledger
+
+    def load(self, members, shifts):
+        """Rebuild the ledger from (member_id, station) pairs and worked shift dicts"""
+        self.stations = {}
+        self.member_station = {}
+        for member_id, station in members:
+            self.member_station[member_id] = station
+            self.station(station).add_member(member_id)
+        for shift in shifts:
+            self.record_shift(shift)
+
+    def window_start(self):
+        """Earliest shift date the ledger counts"""
+        return datetime.utcnow() - timedelta(days=self.window_days)
+
+    def register_member(self, member_id, station):
+        self.member_station[member_id] = station
+        self.station(station).add_member(member_id)
+
+    def record_shifts(self, shifts):
+        """Apply many shift dicts, batched per station"""
+        by_station = {}
+        for shift in shifts:
+            station = self.member_station.get(shift['member_id'])
+            if station is not None:
+                by_station.setdefault(station, []).append(shift)
+        for station, station_shifts in by_station.items():
+            self.station(station).record_many(station_shifts)
+
+    def record_shift(self, shift, sign=1):
+        """Apply a shift dict with member_id, shift_type, date and overtime_hours"""
+        station = self.member_station.get(shift['member_id'])
+        if station is None:
+            return
+        self.station(station).record(
+            shift['member_id'], shift['shift_type'], shift['date'], shift.get('overtime_hours') or 0.0, sign
+        )
+
+
+# Shared in-process ledger, warmed at startup and updated on every shift write
+fairness_ledger = FairnessLedger()
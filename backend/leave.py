@@ -0,0 +1,146 @@
+"""
+Leave interval index for WATCHTOWER
+
+Holds leave requests as inclusive day intervals sorted by start day, with
+a running maximum of end days, so the requests overlapping a day range
+are found with two binary searches and a scan of the candidates between
+them: O(log n + k) while leave periods do not nest inside one another.
+Each member has an index for conflict checks, and each station has one of
+approved leave so "who is on leave on day D" is a single query.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+
+def day_number(value):
+    """Proleptic ordinal of a date, datetime or ISO string"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class IntervalIndex:
+    """Keyed [start, end] day intervals, queried by overlap.
+
+    The sorted lists are maintained in place: an insert or removal is a
+    binary search, a list shift and a repair of the running maximum that
+    stops as soon as it is unchanged.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self._keys = []
+        self._starts = []
+        self._ends = []
+        self._max_end = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, start, end):
+        self.remove(key)
+        start, end = day_number(start), day_number(end)
+        self.entries[key] = (start, end)
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._ends.insert(position, end)
+        self._keys.insert(position, key)
+        self._max_end.insert(position, max(end, self._max_end[position - 1]) if position else end)
+        # Later running maxima only change if the new end exceeds them
+        for i in range(position + 1, len(self._max_end)):
+            if self._max_end[i] >= end:
+                break
+            self._max_end[i] = end
+
+    def remove(self, key):
+        bounds = self.entries.pop(key, None)
+        if bounds is None:
+            return
+        position = bisect_left(self._starts, bounds[0])
+        while self._keys[position] != key:
+            position += 1
+        del self._starts[position], self._ends[position], self._keys[position], self._max_end[position]
+        previous = self._max_end[position - 1] if position else None
+        for i in range(position, len(self._max_end)):
+            repaired = self._ends[i] if previous is None else max(previous, self._ends[i])
+            if repaired == self._max_end[i]:
+                break
+            self._max_end[i] = previous = repaired
+
+    def overlapping(self, start, end=None):
+        """Keys of intervals sharing at least one day with [start, end]"""
+        start = day_number(start)
+        end = start if end is None else day_number(end)
+        # Intervals starting after `end` cannot overlap; nor can any before the
+        # first position whose running max end reaches `start`
+        hi = bisect_right(self._starts, end)
+        lo = bisect_left(self._max_end, start, 0, hi)
+        return [self._keys[i] for i in range(lo, hi) if self._ends[i] >= start]
+
+
+class LeaveIndex:
+    """Pending and approved leave by member, approved leave by station"""
+
+    def __init__(self):
+        self.requests = {}
+        self.members = {}
+        self.stations = {}
+
+    def load(self, rows):
+        """Rebuild from (leave_id, member_id, station, start, end, status) rows"""
+        self.requests = {}
+        self.members = {}
+        self.stations = {}
+        for row in rows:
+            self.add(*row)
+
+    def add(self, leave_id, member_id, station, start, end, status):
+        """Index a request, replacing any earlier state; denied leave is dropped"""
+        self.remove(leave_id)
+        if status == 'denied':
+            return
+        self.requests[leave_id] = (member_id, station, start, end, status)
+        self.members.setdefault(member_id, IntervalIndex()).add(leave_id, start, end)
+        if status == 'approved':
+            self.stations.setdefault(station, IntervalIndex()).add(leave_id, start, end)
+
+    def remove(self, leave_id):
+        entry = self.requests.pop(leave_id, None)
+        if entry is None:
+            return
+        member_id, station, _, _, _ = entry
+        self.members[member_id].remove(leave_id)
+        if station in self.stations:
+            self.stations[station].remove(leave_id)
+
+    def member_overlaps(self, member_id, start, end, statuses=('pending', 'approved')):
+        """Ids of a member's leave requests overlapping [start, end]"""
+        index = self.members.get(member_id)
+        if index is None:
+            return []
+        return [
+            leave_id for leave_id in index.overlapping(start, end)
+            if self.requests[leave_id][4] in statuses
+        ]
+
+    def on_leave(self, station, day):
+        """Members of a station with approved leave covering `day`"""
+        index = self.stations.get(station)
+        if index is None:
+            return set()
+        return {self.requests[leave_id][0] for leave_id in index.overlapping(day)}
+
+    def periods(self, member_ids, start, end):
+        """Approved (start, end) leave per member overlapping [start, end]"""
+        periods = {}
+        for member_id in member_ids:
+            for leave_id in self.member_overlaps(member_id, start, end, statuses=('approved',)):
+                _, _, leave_start, leave_end, _ = self.requests[leave_id]
+                periods.setdefault(member_id, []).append((leave_start, leave_end))
+        return periods
+
+
+# Shared in-process index, warmed at startup and updated by the leave endpoints
+leave_index = LeaveIndex()
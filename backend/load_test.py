@@ -0,0 +1,356 @@
+"""
+Load testing for WATCHTOWER
+
+Drives the app with concurrent virtual users, each an asyncio task that
+keeps picking a scenario from a weighted mix, running it and pausing for
+its think time:
+
+    dashboard          the dashboard's three parallel reads
+    login              a fresh sign-in
+    shift_post         recording a worked shift
+    roster_generation  generating a roster and opening it
+
+Each concurrency step runs for --duration seconds. Per route it reports
+p50/p95/p99 latency, throughput and error rate, and it counts 500s
+caused by "database is locked" separately. The step where throughput
+stops climbing while p95 keeps rising is where SQLite's single writer
+saturates.
+
+By default the app runs in-process behind an ASGI transport, which
+shares one event loop with the virtual users. --uvicorn serves it from a
+separate local uvicorn process instead, and --url targets a server that
+is already running. Unless --url or --database is given, a synthetic
+dataset of --members members is generated into a temporary database.
+
+Usage:
+    python load_test.py --users 1,10,25,50 --duration 30
+    python load_test.py --uvicorn --mix dashboard=80,shift_post=20 --users 50
+    python load_test.py --url http://localhost:8001 --users 10 --output load.json
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from roster_engine import SHIFT_TIMES
+
+DEFAULT_MIX = "dashboard=70,login=10,shift_post=15,roster_generation=5"
+DEFAULT_USERS = "1,5,10,25,50"
+DEFAULT_DURATION = 20.0
+DEFAULT_THINK = 0.1
+DEFAULT_MEMBERS = 500
+STARTUP_TIMEOUT = 60
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of already sorted values"""
+    if not values:
+        return None
+    return values[min(round(fraction * (len(values) - 1)), len(values) - 1)]
+
+
+class StepStats:
+    """Latencies and errors per route for one concurrency step"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, route, seconds, error=None):
+        self.latencies.setdefault(route, []).append(seconds)
+        if error:
+            self.errors.setdefault(route, Counter())[error] += 1
+
+    def summarise(self, elapsed):
+        routes = {}
+        for route, latencies in sorted(self.latencies.items()):
+            routes[route] = summary(latencies, self.errors.get(route, Counter()), elapsed)
+        everything = [seconds for latencies in self.latencies.values() for seconds in latencies]
+        errors = sum(self.errors.values(), Counter())
+        return {"total": summary(everything, errors, elapsed), "routes": routes}
+
+
+def summary(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    failed = sum(errors.values())
+    return {
+        "requests": len(latencies),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(failed / len(latencies), 4) if latencies else 0.0,
+        "errors": dict(errors),
+        **{
+            f"p{point}_ms": round(percentile(latencies, point / 100) * 1000, 1) if latencies else None
+            for point in (50, 95, 99)
+        },
+    }
+
+
+class VirtualUser:
+    """One simulated user with its own client session and random stream"""
+
+    def __init__(self, client, stats, members, credentials, rng):
+        self.client = client
+        self.stats = stats
+        self.members = members
+        self.credentials = credentials
+        self.rng = rng
+        self.headers = {}
+
+    async def call(self, route, method, url, **kwargs):
+        """Time one request, recording it under `route`; returns the response or None"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except Exception as e:
+            self.stats.record(route, time.perf_counter() - started, type(e).__name__)
+            return None
+        error = None
+        if response.status_code >= 400:
+            error = str(response.status_code)
+            if response.status_code == 500 and "locked" in response.text:
+                error += " database is locked"
+        self.stats.record(route, time.perf_counter() - started, error)
+        return response
+
+    async def dashboard(self):
+        await asyncio.gather(
+            self.call("GET /api/analytics/workload-summary", "GET", "/api/analytics/workload-summary"),
+            self.call("GET /api/analytics/corro-distribution", "GET", "/api/analytics/corro-distribution"),
+            self.call("GET /api/members", "GET", "/api/members"),
+        )
+
+    async def login(self):
+        response = await self.call("POST /api/auth/login", "POST", "/api/auth/login", json=self.credentials)
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def shift_post(self):
+        member = self.rng.choice(self.members)
+        shift_type = self.rng.choice(list(SHIFT_TIMES))
+        start_time, end_time = SHIFT_TIMES[shift_type]
+        day = datetime.utcnow().date() - timedelta(days=self.rng.randrange(14))
+        await self.call("POST /api/shifts", "POST", "/api/shifts", json={
+            "member_id": member["id"],
+            "shift_type": shift_type,
+            "date": f"{day.isoformat()}T{start_time}:00",
+            "start_time": start_time,
+            "end_time": end_time,
+        })
+
+    async def roster_generation(self):
+        station = self.rng.choice(self.members)["station"]
+        response = await self.call("POST /api/roster/generate", "POST", "/api/roster/generate",
+                                   json={"station": station})
+        if response is not None and response.status_code == 200:
+            await self.call("GET /api/roster/{roster_id}", "GET",
+                            f"/api/roster/{response.json()['roster_period_id']}")
+
+    async def run(self, mix, think, deadline):
+        if not self.headers:
+            await self.login()
+        scenarios, weights = zip(*mix.items())
+        while time.perf_counter() < deadline:
+            await getattr(self, self.rng.choices(scenarios, weights)[0])()
+            if think:
+                await asyncio.sleep(think * self.rng.uniform(0.5, 1.5))
+
+
+async def run_step(client, users, mix, think, duration, members, credentials, seed):
+    stats = StepStats()
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    virtual_users = [
+        VirtualUser(client, stats, members, credentials, random.Random(seed * 100003 + number))
+        for number in range(users)
+    ]
+    await asyncio.gather(*(user.run(mix, think, deadline) for user in virtual_users))
+    # Requests in flight at the deadline still count, so divide by the time actually taken
+    return stats.summarise(time.perf_counter() - started)
+
+
+async def run_load(client, args, mix, steps):
+    credentials = {"vp_number": args.vp_number, "password": args.password}
+    response = await client.post("/api/auth/login", json=credentials)
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    members = (await client.get("/api/members", headers=headers)).json()
+    if not members:
+        raise RuntimeError("The target has no members to post shifts for")
+
+    results = []
+    for users in steps:
+        print(f"Running {users} virtual users for {args.duration:g}s...", file=sys.stderr, flush=True)
+        result = await run_step(client, users, mix, args.think, args.duration, members, credentials, args.seed)
+        results.append({"users": users, **result})
+    return results
+
+
+async def run_in_process(args, mix, steps):
+    import logging
+    import httpx
+    import server
+
+    logging.disable(logging.INFO)
+    # No scheduled backups competing with the load
+    server.backup_service.interval_hours = 0
+    await server.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=args.timeout) as client:
+            return await run_load(client, args, mix, steps)
+    finally:
+        await server.shutdown_event()
+
+
+async def run_over_http(args, mix, steps, url):
+    import httpx
+    limits = httpx.Limits(max_connections=max(steps), max_keepalive_connections=max(steps))
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(client, args, mix, steps)
+
+
+def serve(port):
+    """Run the app under uvicorn without scheduled backups (the --uvicorn child)"""
+    import logging
+    import uvicorn
+    import server
+    logging.disable(logging.INFO)
+    server.backup_service.interval_hours = 0
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+    return 0
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_uvicorn(directory):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', str(port)],
+        cwd=directory, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn did not start within {STARTUP_TIMEOUT}s")
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ("dashboard", "login", "shift_post", "roster_generation"):
+            raise ValueError(f"unknown scenario '{name}'")
+        mix[name] = float(weight) if weight else 1.0
+    if not any(mix.values()):
+        raise ValueError("the mix needs at least one positive weight")
+    return mix
+
+
+def print_report(results, out=sys.stdout):
+    columns = f"{'requests':>9}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    for step in results:
+        print(f"\n{step['users']} virtual users", file=out)
+        print(f"  {'route':<42}{columns}", file=out)
+        for route, result in [*step["routes"].items(), ("all routes", step["total"])]:
+            print(f"  {route:<42}{result['requests']:>9}{result['throughput']:>9.1f}{result['error_rate']:>8.1%}"
+                  f"{result['p50_ms'] or 0:>9.1f}{result['p95_ms'] or 0:>9.1f}{result['p99_ms'] or 0:>9.1f}", file=out)
+            for error, count in sorted(result["errors"].items()):
+                if route != "all routes":
+                    print(f"    {count} x {error}", file=out)
+
+    print(f"\n{'users':>6}{'req/s':>9}{'errors':>8}{'p95 ms':>9}", file=out)
+    for step in results:
+        total = step["total"]
+        print(f"{step['users']:>6}{total['throughput']:>9.1f}{total['error_rate']:>8.1%}{total['p95_ms'] or 0:>9.1f}",
+              file=out)
+    peak = max(results, key=lambda step: step["total"]["throughput"])
+    print(f"Throughput peaked at {peak['users']} virtual users ({peak['total']['throughput']:.1f} req/s)", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test WATCHTOWER with concurrent virtual users")
+    parser.add_argument('--users', default=DEFAULT_USERS, help="Comma-separated concurrency steps")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help="Seconds per step")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Scenario weights, e.g. dashboard=70,login=10")
+    parser.add_argument('--think', type=float, default=DEFAULT_THINK,
+                        help="Mean pause in seconds between a user's scenarios")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--members', type=int, default=DEFAULT_MEMBERS,
+                        help="Members in the generated dataset")
+    parser.add_argument('--database', help="Load test this database instead of a generated one (it is written to)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--uvicorn', action='store_true', help="Serve the app from a local uvicorn process")
+    target.add_argument('--url', help="Load test a server that is already running")
+    parser.add_argument('--vp-number', default="VP12345")
+    parser.add_argument('--password', default="password123")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve is not None:
+        return serve(args.serve)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    steps = [int(users) for users in args.users.split(',')]
+    if args.output:
+        args.output = os.path.abspath(args.output)
+
+    if args.url:
+        results = asyncio.run(run_over_http(args, mix, steps, args.url.rstrip('/')))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            # Set before the app is imported, here or in the uvicorn child
+            os.environ['WATCHTOWER_DB_PATH'] = os.path.abspath(args.database or os.path.join(directory, 'load.db'))
+            if not args.database:
+                from synthetic_data import generate_dataset
+                print(f"Generating {args.members} members...", file=sys.stderr, flush=True)
+                generate_dataset(seed=args.seed, members=args.members, progress=io.StringIO())
+            if args.uvicorn:
+                process, url = start_uvicorn(directory)
+                try:
+                    results = asyncio.run(run_over_http(args, mix, steps, url))
+                finally:
+                    process.terminate()
+                    process.wait()
+            else:
+                # Archives and backups the app writes land in the temporary directory
+                os.chdir(directory)
+                results = asyncio.run(run_in_process(args, mix, steps))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "mix": mix, "duration": args.duration, "think": args.think, "seed": args.seed, "steps": results
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
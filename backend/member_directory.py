@@ -0,0 +1,115 @@
+"""
+Member directory for WATCHTOWER
+
+Holds every member as a typed record with preferences and special
+qualifications already decoded, so endpoints stop re-selecting Member
+rows and re-parsing their JSON columns. The directory is warmed at
+startup and written through whenever a member is created or changed.
+"""
+from bisect import bisect_right
+import json
+
+PLAIN_FIELDS = (
+    'id', 'vp_number', 'name', 'email', 'station', 'rank', 'seniority_years',
+    'ostt_qualification_date', 'created_at', 'updated_at',
+)
+
+
+def decode_qualifications(value):
+    if not value:
+        return []
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return [value]
+
+
+class MemberRecord:
+    """A Member row with its JSON columns decoded"""
+
+    __slots__ = PLAIN_FIELDS + ('ada_driver_authority', 'active', 'preferences', 'special_qualifications')
+
+    def __init__(self, member, default_preferences):
+        for field in PLAIN_FIELDS:
+            setattr(self, field, getattr(member, field))
+        self.ada_driver_authority = bool(member.ada_driver_authority)
+        self.active = member.active is None or bool(member.active)
+        self.special_qualifications = decode_qualifications(member.special_qualifications)
+        self.preferences = dict(default_preferences)
+        if member.preferences_json:
+            try:
+                self.preferences = json.loads(member.preferences_json)
+            except (TypeError, ValueError):
+                pass
+
+    def sort_key(self):
+        return (self.name or '', self.id)
+
+    def to_dict(self):
+        """All fields, as used for MemberResponse"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def profile(self):
+        """The plain dict used by the roster engine"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "rank": self.rank,
+            "ada_driver_authority": self.ada_driver_authority,
+            "ostt_qualification_date": self.ostt_qualification_date,
+            "special_qualifications": self.special_qualifications,
+            "preferences": self.preferences,
+        }
+
+
+class MemberDirectory:
+    """Member records by id, with a lazily rebuilt (name, id) ordering"""
+
+    def __init__(self, default_preferences):
+        self.default_preferences = default_preferences
+        self.records = {}
+        self.loaded = False
+        # Bumped on every change, so views built from member records can key on it
+        self.generation = 0
+        self._ordered = None
+        self._keys = None
+
+    def load(self, members):
+        self.records = {member.id: MemberRecord(member, self.default_preferences) for member in members}
+        self._ordered = None
+        self.generation += 1
+        self.loaded = True
+
+    def put(self, member):
+        """Write a created or changed Member row through to the directory"""
+        record = MemberRecord(member, self.default_preferences)
+        self.records[member.id] = record
+        self._ordered = None
+        self.generation += 1
+        return record
+
+    def discard(self, member_id):
+        if self.records.pop(member_id, None) is not None:
+            self._ordered = None
+            self.generation += 1
+
+    def get(self, member_id):
+        return self.records.get(member_id)
+
+    def get_many(self, member_ids):
+        return {member_id: self.records[member_id] for member_id in member_ids if member_id in self.records}
+
+    def members(self, station=None, active_only=False):
+        return [
+            record for record in self.records.values()
+            if (station is None or record.station == station) and (record.active or not active_only)
+        ]
+
+    def page(self, after=None, limit=None):
+        """Records in (name, id) order following the `after` key, and whether more remain"""
+        if self._ordered is None:
+            self._ordered = sorted(self.records.values(), key=MemberRecord.sort_key)
+            self._keys = [record.sort_key() for record in self._ordered]
+        start = bisect_right(self._keys, tuple(after)) if after else 0
+        end = len(self._ordered) if limit is None else start + limit
+        return self._ordered[start:end], end < len(self._ordered)
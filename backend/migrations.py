@@ -0,0 +1,144 @@
+"""
+Schema migrations for WATCHTOWER
+
+create_all only creates missing tables, so changes to existing tables are
+numbered migrations here. Each runs once at startup, after create_all,
+and is recorded in schema_migrations. Migrations must also be safe on a
+fresh database where create_all has already built the latest schema.
+"""
+from datetime import datetime
+
+# Preferences read from preferences_json, NULL when the JSON is malformed
+PREFERENCES_JSON = "CASE WHEN json_valid(preferences_json) THEN preferences_json END"
+RECALL_WILLINGNESS_SQL = f"json_extract({PREFERENCES_JSON}, '$.recall_willingness')"
+NIGHT_SHIFT_TOLERANCE_SQL = f"json_extract({PREFERENCES_JSON}, '$.night_shift_tolerance')"
+
+
+def column_names(connection, table):
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_xinfo({table})")}
+
+
+def rest_days_select(member, source=""):
+    """SELECT of (member_id, day) pairs for `member`, a members row or table joined in `source`"""
+    return (
+        f"SELECT {member}.id, lower(rest_day.value) FROM {source}json_each("
+        f"CASE WHEN json_valid({member}.preferences_json) THEN {member}.preferences_json ELSE '{{}}' END, "
+        f"'$.preferred_rest_days') AS rest_day"
+    )
+
+
+def promote_preferences(connection):
+    """Generated preference columns on members and a trigger-maintained rest-day table"""
+    existing = column_names(connection, 'members')
+    for name, expression in (
+        ('recall_willingness', RECALL_WILLINGNESS_SQL),
+        ('night_shift_tolerance', NIGHT_SHIFT_TOLERANCE_SQL),
+    ):
+        if name not in existing:
+            connection.exec_driver_sql(
+                f"ALTER TABLE members ADD COLUMN {name} INTEGER GENERATED ALWAYS AS ({expression}) VIRTUAL"
+            )
+
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS member_rest_days ("
+        "member_id VARCHAR NOT NULL, day VARCHAR NOT NULL, PRIMARY KEY (member_id, day))"
+    )
+    connection.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS members_rest_days_insert AFTER INSERT ON members BEGIN
+            INSERT OR IGNORE INTO member_rest_days (member_id, day) {rest_days_select('NEW')};
+        END
+    """)
+    connection.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS members_rest_days_update AFTER UPDATE OF preferences_json ON members BEGIN
+            DELETE FROM member_rest_days WHERE member_id = OLD.id;
+            INSERT OR IGNORE INTO member_rest_days (member_id, day) {rest_days_select('NEW')};
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS members_rest_days_delete AFTER DELETE ON members BEGIN
+            DELETE FROM member_rest_days WHERE member_id = OLD.id;
+        END
+    """)
+
+    # Backfill existing members
+    connection.exec_driver_sql("DELETE FROM member_rest_days")
+    connection.exec_driver_sql(
+        f"INSERT OR IGNORE INTO member_rest_days (member_id, day) {rest_days_select('members', 'members, ')}"
+    )
+
+
+def qualifications_array(member):
+    """special_qualifications of `member` as a JSON array; a bare string is one qualification"""
+    column = f"{member}.special_qualifications"
+    return (
+        f"CASE WHEN {column} IS NULL OR {column} = '' THEN '[]' "
+        f"WHEN json_valid({column}) AND json_type({column}) = 'array' THEN {column} "
+        f"ELSE json_array({column}) END"
+    )
+
+
+def normalise_qualifications(connection):
+    """member_qualifications rows kept in step with members.special_qualifications.
+
+    Expiry dates live only in the table, so updates add and remove rows
+    rather than rewriting them.
+    """
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS member_qualifications ("
+        "member_id VARCHAR NOT NULL, qualification VARCHAR NOT NULL, expires_at DATETIME, "
+        "PRIMARY KEY (member_id, qualification))"
+    )
+    connection.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS members_qualifications_insert AFTER INSERT ON members BEGIN
+            INSERT OR IGNORE INTO member_qualifications (member_id, qualification)
+            SELECT NEW.id, value FROM json_each({qualifications_array('NEW')});
+        END
+    """)
+    connection.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS members_qualifications_update AFTER UPDATE OF special_qualifications ON members BEGIN
+            DELETE FROM member_qualifications WHERE member_id = OLD.id
+                AND qualification NOT IN (SELECT value FROM json_each({qualifications_array('NEW')}));
+            INSERT OR IGNORE INTO member_qualifications (member_id, qualification)
+            SELECT NEW.id, value FROM json_each({qualifications_array('NEW')});
+        END
+    """)
+    connection.exec_driver_sql("""
+        CREATE TRIGGER IF NOT EXISTS members_qualifications_delete AFTER DELETE ON members BEGIN
+            DELETE FROM member_qualifications WHERE member_id = OLD.id;
+        END
+    """)
+
+    # Backfill existing members
+    connection.exec_driver_sql(
+        f"INSERT OR IGNORE INTO member_qualifications (member_id, qualification) "
+        f"SELECT members.id, value FROM members, json_each({qualifications_array('members')})"
+    )
+
+
+def add_roster_rules(connection):
+    """Rule overrides stored on roster periods; older rosters keep the default rules"""
+    if 'rules_json' not in column_names(connection, 'roster_periods'):
+        connection.exec_driver_sql("ALTER TABLE roster_periods ADD COLUMN rules_json TEXT")
+
+
+MIGRATIONS = [
+    (1, "promote_preferences", promote_preferences),
+    (2, "normalise_qualifications", normalise_qualifications),
+    (3, "add_roster_rules", add_roster_rules),
+]
+
+
+def run_migrations(connection):
+    """Apply every migration not yet recorded, in order"""
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, name VARCHAR, applied_at VARCHAR)"
+    )
+    applied = {row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_migrations")}
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        migrate(connection)
+        connection.exec_driver_sql(
+            "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+            (version, name, datetime.utcnow().isoformat())
+        )
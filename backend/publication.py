@@ -0,0 +1,186 @@
+"""
+Roster publication deadlines for WATCHTOWER
+
+A roster must be published PUBLICATION_NOTICE_DAYS before its period
+starts. Every unpublished roster period has one pending event in a
+min-heap: the next alert threshold it will cross. Scheduling, firing and
+cancelling are O(log n), and the background task sleeps until the
+earliest event instead of polling roster periods.
+
+A roster created at or after its deadline is not tracked: it could never
+have been published on notice. That includes rosters generated to start
+today, the /roster/generate default; rosters generated with a start_date
+at least PUBLICATION_NOTICE_DAYS ahead are tracked from creation.
+"""
+from datetime import datetime, timedelta
+import asyncio
+import heapq
+import itertools
+import logging
+import uuid
+
+from sqlalchemy import select, and_, func
+
+from database import CONFIG, AsyncSessionLocal, RosterPeriod, PublicationAlert
+
+logger = logging.getLogger(__name__)
+
+PUBLICATION_NOTICE_DAYS = int(CONFIG.get('PUBLICATION_NOTICE_DAYS', 14))
+# Days before the deadline to warn at; 0 is the deadline itself
+ALERT_THRESHOLDS = tuple(sorted(
+    {int(days) for days in CONFIG.get('PUBLICATION_ALERT_DAYS', '7,3,1').split(',')} | {0},
+    reverse=True
+))
+MAX_SLEEP_SECONDS = 3600
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, datetime.min.time())
+
+
+class DeadlineScheduler:
+    """Heap of the next alert due for each unpublished roster period"""
+
+    def __init__(self, notice_days=PUBLICATION_NOTICE_DAYS, thresholds=ALERT_THRESHOLDS):
+        self.notice_days = notice_days
+        self.thresholds = thresholds
+        self.heap = []
+        # roster id -> (station, start, deadline, pending thresholds, heap entry id)
+        self.periods = {}
+        self.counter = itertools.count()
+        self.wakeup = None
+        self.task = None
+
+    def deadline(self, start_date):
+        return _as_datetime(start_date) - timedelta(days=self.notice_days)
+
+    def schedule(self, roster_id, station, start_date, alerted=None, now=None, created_at=None):
+        """Track a roster period, replacing any earlier schedule for it.
+
+        `alerted` is the fewest days remaining already alerted for the
+        period, so restarts do not repeat alerts. Of the thresholds already
+        crossed only the most urgent is still raised. A period created at or
+        after its deadline is not tracked: it could never have been
+        published on notice, so there is nothing to warn about.
+        """
+        now = now or datetime.utcnow()
+        start_date = _as_datetime(start_date)
+        deadline = self.deadline(start_date)
+        if deadline <= (created_at or now):
+            self.periods.pop(roster_id, None)
+            return
+        pending = [days for days in self.thresholds if alerted is None or days < alerted]
+        crossed = [days for days in pending if deadline - timedelta(days=days) <= now]
+        if crossed:
+            pending = [days for days in pending if days <= min(crossed)]
+        self._push(roster_id, (station, start_date, deadline, tuple(pending)))
+
+    def _push(self, roster_id, entry):
+        station, start_date, deadline, pending = entry
+        if not pending:
+            self.periods.pop(roster_id, None)
+            return
+        entry_id = next(self.counter)
+        self.periods[roster_id] = (station, start_date, deadline, pending, entry_id)
+        heapq.heappush(self.heap, (deadline - timedelta(days=pending[0]), entry_id, roster_id))
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def cancel(self, roster_id):
+        """Stop alerting for a period; its heap entry is discarded when popped"""
+        self.periods.pop(roster_id, None)
+
+    def next_due(self):
+        return self.heap[0][0] if self.heap else None
+
+    def due(self, now=None):
+        """Pop every alert due by `now` as (station, start, deadline, days_remaining)"""
+        now = now or datetime.utcnow()
+        fired = []
+        while self.heap and self.heap[0][0] <= now:
+            _, entry_id, roster_id = heapq.heappop(self.heap)
+            entry = self.periods.get(roster_id)
+            if entry is None or entry[4] != entry_id:
+                continue
+            station, start_date, deadline, pending, _ = entry
+            fired.append((station, start_date, deadline, pending[0]))
+            self._push(roster_id, (station, start_date, deadline, pending[1:]))
+        return fired
+
+    async def load(self):
+        """Schedule every upcoming unpublished roster period"""
+        async with AsyncSessionLocal() as session:
+            periods_result = await session.execute(
+                select(RosterPeriod.id, RosterPeriod.station, RosterPeriod.start_date, RosterPeriod.created_at).where(
+                    and_(RosterPeriod.status == 'draft', RosterPeriod.start_date >= datetime.utcnow() - timedelta(days=1))
+                )
+            )
+            alerts_result = await session.execute(
+                select(PublicationAlert.station, PublicationAlert.roster_period_start, func.min(PublicationAlert.days_remaining))
+                .group_by(PublicationAlert.station, PublicationAlert.roster_period_start)
+            )
+            alerted = {(station, start): days for station, start, days in alerts_result.all()}
+            for roster_id, station, start_date, created_at in periods_result.all():
+                self.schedule(
+                    roster_id, station, start_date, alerted.get((station, start_date)), created_at=created_at
+                )
+        logger.info(f"Publication deadlines scheduled for {len(self.periods)} roster periods")
+
+    def start(self):
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        while True:
+            self.wakeup.clear()
+            fired = self.due()
+            if fired:
+                try:
+                    await write_alerts(fired)
+                except Exception as e:
+                    logger.error(f"Error writing publication alerts: {e}")
+
+            next_due = self.next_due()
+            timeout = MAX_SLEEP_SECONDS
+            if next_due is not None:
+                timeout = min(max((next_due - datetime.utcnow()).total_seconds(), 0), MAX_SLEEP_SECONDS)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+def alert_message(station, start_date, deadline, days_remaining):
+    period = f"{station} roster starting {start_date.strftime('%Y-%m-%d')}"
+    if days_remaining == 0:
+        return f"Publication deadline missed for {period} (due {deadline.strftime('%Y-%m-%d')})"
+    return f"{period} must be published by {deadline.strftime('%Y-%m-%d')} ({days_remaining} days remaining)"
+
+
+async def write_alerts(fired):
+    async with AsyncSessionLocal() as session:
+        for station, start_date, deadline, days_remaining in fired:
+            session.add(PublicationAlert(
+                id=str(uuid.uuid4()),
+                station=station,
+                roster_period_start=start_date,
+                alert_type='deadline_missed' if days_remaining == 0 else 'approaching_deadline',
+                days_remaining=days_remaining,
+                message=alert_message(station, start_date, deadline, days_remaining)
+            ))
+        await session.commit()
+
+
+# Shared scheduler, loaded and started with the app
+publication_scheduler = DeadlineScheduler()
@@ -0,0 +1,644 @@
+"""
+Roster generation engine for WATCHTOWER
+
+Fills the daily coverage slots of a roster period by solving one
+members x slots assignment problem per day. Costs combine fatigue,
+fairness and preference scores; ineligible pairs are excluded outright.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+import numpy as np
+
+from fairness import METRICS
+from coverage import CoverageIndex
+from compliance import FORTNIGHT_HOURS, candidate_fortnight_hours
+
+# Default times for each shift type
+SHIFT_TIMES = {
+    'early': ('06:00', '14:00'),
+    'late': ('14:00', '22:00'),
+    'night': ('22:00', '06:00'),
+    'van': ('06:00', '14:00'),
+    'watchhouse': ('14:00', '22:00'),
+    'corro': ('09:00', '17:00'),
+}
+
+# Rotation template code for a rostered rest day
+OFF_DUTY = 'off'
+
+STANDARD_SHIFT_HOURS = 8.0
+MIN_BREAK_HOURS = 10.0
+FORTNIGHT_DAYS = 14
+
+# Eligibility requirement names besides the members' special qualifications
+ADA_DRIVER = 'ada_driver'
+OSTT_CURRENT = 'ostt_current'
+OSTT_VALID_DAYS = 365
+
+# Requirements every slot of a shift type must satisfy
+SLOT_REQUIREMENTS = {
+    'van': (ADA_DRIVER,),
+    'watchhouse': (),
+}
+
+# Cost used for ineligible pairs; anything at or above it is left unfilled
+INELIGIBLE_COST = 1e6
+
+# Relative weights of the cost components
+FATIGUE_WEIGHT = 10.0
+FAIRNESS_WEIGHT = 4.0
+PREFERENCE_WEIGHT = 6.0
+# Calling in a member on a rotation rest day
+OFF_DUTY_COST = 25.0
+
+
+def parse_time(value):
+    """Parse an 'HH:MM' string into hours as a float"""
+    hours, minutes = value.split(':')
+    return int(hours) + int(minutes) / 60
+
+
+def shift_bounds(day, start_time, end_time):
+    """Return (start, end) datetimes for a shift on a day, handling overnight shifts"""
+    if isinstance(day, datetime):
+        day = day.date()
+    midnight = datetime.combine(day, datetime.min.time())
+    start_hours = parse_time(start_time)
+    end_hours = parse_time(end_time)
+    if end_hours <= start_hours:
+        end_hours += 24
+    return midnight + timedelta(hours=start_hours), midnight + timedelta(hours=end_hours)
+
+
+def solve_assignment(cost):
+    """Solve a rectangular assignment problem with the Hungarian method.
+
+    Returns a list of (row, column) pairs minimising the total cost, with
+    every row assigned when rows <= columns (and vice versa). Runs in
+    O(n^2 m) with the inner column scan vectorised.
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return []
+
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j]: row (1-based) matched to column j
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    pairs = [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j]]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return sorted(pairs)
+
+
+class EligibilityIndex:
+    """Bitsets over member indices for every eligibility requirement.
+
+    Built once per generation run so the solver never re-parses member
+    qualifications. Each requirement (a special qualification, ADA driver
+    authority or OSTT currency) maps to an int whose bit i is set when
+    member i holds it; a slot's candidates are the intersection of its
+    requirements, costing O(words) rather than O(members).
+    """
+
+    def __init__(self, members, as_of=None):
+        self.size = len(members)
+        self.all = (1 << self.size) - 1
+        self.bits = {}
+        as_of = as_of or datetime.utcnow()
+        ostt_cutoff = as_of - timedelta(days=OSTT_VALID_DAYS)
+
+        for i, member in enumerate(members):
+            bit = 1 << i
+            for qualification in member.get('special_qualifications') or []:
+                self.bits[qualification] = self.bits.get(qualification, 0) | bit
+            if member.get('ada_driver_authority'):
+                self.bits[ADA_DRIVER] = self.bits.get(ADA_DRIVER, 0) | bit
+            ostt_date = member.get('ostt_qualification_date')
+            if ostt_date and ostt_date >= ostt_cutoff:
+                self.bits[OSTT_CURRENT] = self.bits.get(OSTT_CURRENT, 0) | bit
+
+    def mask(self, requirement):
+        """Bitset of members holding a requirement"""
+        return self.bits.get(requirement, 0)
+
+    def candidates(self, requirements=(), exclude=0):
+        """Bitset of members holding every requirement, minus `exclude`"""
+        bits = self.all & ~exclude
+        for requirement in requirements:
+            bits &= self.bits.get(requirement, 0)
+        return bits
+
+    def to_array(self, bits):
+        """Expand a bitset into a boolean array over member indices"""
+        raw = np.frombuffer(bits.to_bytes((self.size + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder='little')[:self.size].astype(bool)
+
+    def members_of(self, bits):
+        """Member indices present in a bitset"""
+        return np.flatnonzero(self.to_array(bits))
+
+
+class RosterSolver:
+    """Per-day optimal slot assignment for a single station roster period.
+
+    `members` are dicts with id, name, ada_driver_authority,
+    ostt_qualification_date and decoded `special_qualifications` and
+    `preferences`. `history` holds the members' worked shifts before
+    the period as dicts with member_id, date, start_time, end_time,
+    shift_type and overtime_hours. `leave` maps member_id to a list of
+    (start_date, end_date) tuples of approved leave. `slot_requirements`
+    adds requirements per shift type on top of SLOT_REQUIREMENTS.
+    `fairness` is a (members x METRICS) array of fairness ledger
+    percentile positions, so members already carrying more than their
+    share of nights, weekends, corro or overtime cost more. When
+    `availability` is given, every assignment of a member in
+    `shared_member_ids` must first be claimed there for `station`.
+    `rest_days` maps lower-case day names to the ids of members who
+    prefer that day off; without it, each member's preferences are read.
+    """
+
+    def __init__(self, members, start_date, total_days, history=None, leave=None,
+                 max_fortnight_hours=76.0, enable_fatigue_balancing=True,
+                 consider_preferences=True, slot_requirements=None, eligibility_index=None,
+                 fairness=None, max_consecutive_days=5, station=None, availability=None,
+                 shared_member_ids=(), rest_days=None):
+        self.members = list(members)
+        self.start_date = start_date.date() if isinstance(start_date, datetime) else start_date
+        self.total_days = total_days
+        self.max_fortnight_hours = max_fortnight_hours
+        self.max_consecutive_days = max_consecutive_days
+        self.enable_fatigue_balancing = enable_fatigue_balancing
+        self.consider_preferences = consider_preferences
+        # Members also rostered by other stations must be claimed in the shared availability map
+        self.station = station
+        self.availability = availability
+        self.shared = set(shared_member_ids) if availability is not None else set()
+
+        n = len(self.members)
+        self.index = {member['id']: i for i, member in enumerate(self.members)}
+        self.epoch = datetime.combine(self.start_date, datetime.min.time())
+
+        # Hours worked per day, with FORTNIGHT_DAYS of history before day 0
+        self.daily_hours = np.zeros((FORTNIGHT_DAYS + total_days, n))
+        # Every known shift as (member index, start hours since the epoch, hours) for the 76h rule
+        self.shifts = ([], [], [])
+        self._fortnight_cache = None
+        # End of each member's most recent shift, in hours since the epoch
+        self.last_end = np.full(n, -np.inf)
+        self.consecutive_earlies = np.zeros(n, dtype=int)
+        self.slot_counts = {}
+        self.fairness = None if fairness is None else np.asarray(fairness, dtype=float) / 100
+
+        self.eligibility_index = eligibility_index or EligibilityIndex(self.members, as_of=self.epoch)
+        self.slot_requirements = {
+            shift_type: tuple(SLOT_REQUIREMENTS.get(shift_type, ())) + tuple(extra)
+            for shift_type, extra in {**dict.fromkeys(SLOT_REQUIREMENTS, ()), **(slot_requirements or {})}.items()
+        }
+        if rest_days is None:
+            rest_days = {}
+            for m in self.members:
+                for day in (m.get('preferences') or {}).get('preferred_rest_days', []):
+                    rest_days.setdefault(day.lower(), []).append(m['id'])
+        # Members preferring each day off, as a mask over members
+        self.prefers_rest = {}
+        for day_name, member_ids in rest_days.items():
+            mask = np.zeros(n, dtype=bool)
+            mask[[self.index[member_id] for member_id in member_ids if member_id in self.index]] = True
+            self.prefers_rest[day_name] = mask
+        self.avoid_four_earlies = np.array(
+            [(m.get('preferences') or {}).get('avoid_four_earlies', True) for m in self.members], dtype=bool
+        )
+
+        # Bitset of members on leave for each day of the period
+        self.on_leave = [0] * total_days
+        for member_id, periods in (leave or {}).items():
+            i = self.index.get(member_id)
+            if i is None:
+                continue
+            for leave_start, leave_end in periods:
+                first = max((self._as_date(leave_start) - self.start_date).days, 0)
+                last = min((self._as_date(leave_end) - self.start_date).days, total_days - 1)
+                for day_offset in range(first, last + 1):
+                    self.on_leave[day_offset] |= 1 << i
+
+        for shift in sorted(history or [], key=lambda s: s['date']):
+            self._record_history(shift)
+
+        # Working days in a row up to the day before the period
+        self.consecutive_days = np.zeros(n, dtype=int)
+        for row in self.daily_hours[:FORTNIGHT_DAYS]:
+            self.consecutive_days = np.where(row > 0, self.consecutive_days + 1, 0)
+
+    @staticmethod
+    def _as_date(value):
+        return value.date() if isinstance(value, datetime) else value
+
+    def _hours_since_epoch(self, moment):
+        return (moment - self.epoch).total_seconds() / 3600
+
+    def _record_history(self, shift):
+        i = self.index.get(shift['member_id'])
+        if i is None:
+            return
+        day = self._as_date(shift['date'])
+        offset = (day - self.start_date).days
+        hours = STANDARD_SHIFT_HOURS + (shift.get('overtime_hours') or 0)
+        if -FORTNIGHT_DAYS <= offset < 0:
+            self.daily_hours[FORTNIGHT_DAYS + offset, i] += hours
+        start, end = shift_bounds(day, shift.get('start_time') or '06:00', shift.get('end_time') or '14:00')
+        self._add_shift(i, start, hours)
+        self.last_end[i] = max(self.last_end[i], self._hours_since_epoch(end))
+        self.slot_counts.setdefault(shift['shift_type'], np.zeros(len(self.members)))[i] += 1
+
+    def _add_shift(self, i, start, hours):
+        members, starts, shift_hours = self.shifts
+        members.append(i)
+        starts.append(self._hours_since_epoch(start))
+        shift_hours.append(hours)
+        self._fortnight_cache = None
+
+    def _fortnight_hours(self, day_offset, start_time, hours):
+        """Each member's worst fortnight total if they also worked the slot.
+
+        Measured exactly as the publish-time validator does, so an eligible
+        member can never push a roster over the limit.
+        """
+        key = (day_offset, start_time, hours)
+        if self._fortnight_cache is None or self._fortnight_cache[0] != key:
+            day = self.start_date + timedelta(days=day_offset)
+            start = self._hours_since_epoch(shift_bounds(day, start_time, start_time)[0])
+            members, starts, shift_hours = (np.asarray(column) for column in self.shifts)
+            # Shifts a full fortnight earlier cannot share a window with the slot
+            recent = starts > start - FORTNIGHT_HOURS
+            worst = candidate_fortnight_hours(
+                members[recent], starts[recent], shift_hours[recent], len(self.members), start, hours
+            )
+            self._fortnight_cache = (key, worst)
+        return self._fortnight_cache[1]
+
+    def eligibility(self, day_offset, shift_type, start_time, hours=STANDARD_SHIFT_HOURS):
+        """Boolean mask of members who may work the slot"""
+        day = self.start_date + timedelta(days=day_offset)
+        start, _ = shift_bounds(day, start_time, start_time)
+        rested = self._hours_since_epoch(start) - self.last_end >= MIN_BREAK_HOURS
+        within_limit = (
+            (self._fortnight_hours(day_offset, start_time, hours) <= self.max_fortnight_hours)
+            & (self.consecutive_days < self.max_consecutive_days)
+        )
+        qualified = self.eligibility_index.candidates(
+            self.slot_requirements.get(shift_type, ()), exclude=self.on_leave[day_offset]
+        )
+        return rested & within_limit & self.eligibility_index.to_array(qualified)
+
+    def slot_costs(self, day_offset, shift_type, start_time, hours=STANDARD_SHIFT_HOURS):
+        """Cost of giving the slot to each member, INELIGIBLE_COST where excluded"""
+        n = len(self.members)
+        cost = np.zeros(n)
+
+        if self.enable_fatigue_balancing:
+            already_worked = self._fortnight_hours(day_offset, start_time, hours) - hours
+            cost += FATIGUE_WEIGHT * already_worked / self.max_fortnight_hours
+
+        counts = self.slot_counts.get(shift_type)
+        if counts is not None and n:
+            cost += FAIRNESS_WEIGHT * (counts - counts.mean())
+
+        if self.fairness is not None:
+            day = self.start_date + timedelta(days=day_offset)
+            cost += FAIRNESS_WEIGHT * self.fairness[:, METRICS.index('overtime_hours')]
+            if day.weekday() >= 5:
+                cost += FAIRNESS_WEIGHT * self.fairness[:, METRICS.index('weekend_shifts')]
+            if shift_type == 'night' or parse_time(start_time) >= 20:
+                cost += FAIRNESS_WEIGHT * self.fairness[:, METRICS.index('night_shifts')]
+            if shift_type == 'corro':
+                cost += FAIRNESS_WEIGHT * self.fairness[:, METRICS.index('corro_shifts')]
+
+        if self.consider_preferences:
+            day_name = (self.start_date + timedelta(days=day_offset)).strftime('%A').lower()
+            if day_name in self.prefers_rest:
+                cost += PREFERENCE_WEIGHT * self.prefers_rest[day_name]
+            if parse_time(start_time) < 8:
+                cost += PREFERENCE_WEIGHT * (self.avoid_four_earlies & (self.consecutive_earlies >= 3))
+
+        return np.where(self.eligibility(day_offset, shift_type, start_time, hours), cost, INELIGIBLE_COST)
+
+    def _record(self, day_offset, i, slot, worked_early):
+        """Apply an accepted assignment to the solver state"""
+        day = self.start_date + timedelta(days=day_offset)
+        start, end = shift_bounds(day, slot['start_time'], slot['end_time'])
+        self._add_shift(i, start, slot['hours'])
+        self.daily_hours[FORTNIGHT_DAYS + day_offset, i] += slot['hours']
+        self.last_end[i] = self._hours_since_epoch(end)
+        self.slot_counts.setdefault(slot['shift_type'], np.zeros(len(self.members)))[i] += 1
+        if parse_time(slot['start_time']) < 8:
+            worked_early[i] = True
+
+    def _claim(self, day_offset, i, slot):
+        """Claim a shared member's day in the availability map; always true for local members"""
+        member_id = self.members[i]['id']
+        if member_id not in self.shared:
+            return True
+        day = self.start_date + timedelta(days=day_offset)
+        start, end = shift_bounds(day, slot['start_time'], slot['end_time'])
+        return self.availability.claim(member_id, self.station, day.toordinal(), start, end, slot['hours'])
+
+    def _release(self, day_offset, i):
+        member_id = self.members[i]['id']
+        if member_id in self.shared:
+            day = self.start_date + timedelta(days=day_offset)
+            self.availability.release(member_id, self.station, day.toordinal())
+
+    def solve_day(self, day_offset, slots, seeded=(), off_duty=()):
+        """Assign members to the day's slots.
+
+        `slots` is a list of dicts with shift_type, start_time, end_time and
+        hours. `seeded` is a warm start of (member_id, shift_type) pairs,
+        typically from rotation templates: eligible seeds are accepted first
+        and consume matching slots, the solver then fills what is left.
+        Members in `off_duty` are rostered off and only used at a cost.
+
+        Returns a list of (slot, member) pairs where member is None for
+        slots nobody is eligible to fill; seeded slots carry
+        source='rotation'. State is updated so later days see the
+        assignments.
+        """
+        n = len(self.members)
+        if not n:
+            return [(slot, None) for slot in slots]
+
+        worked_early = np.zeros(n, dtype=bool)
+        busy = np.zeros(n, dtype=bool)
+        open_slots = list(slots)
+        result = []
+
+        # Eligibility only changes for the member being seeded, so one mask
+        # per shift type serves every seed of the day
+        seed_masks = {}
+        for member_id, shift_type in seeded:
+            i = self.index.get(member_id)
+            if i is None or busy[i] or shift_type not in SHIFT_TIMES:
+                continue
+            start_time, end_time = SHIFT_TIMES[shift_type]
+            if shift_type not in seed_masks:
+                seed_masks[shift_type] = self.eligibility(day_offset, shift_type, start_time)
+            if not seed_masks[shift_type][i]:
+                continue
+            slot = next((s for s in open_slots if s['shift_type'] == shift_type), None)
+            if slot is None:
+                slot = {'shift_type': shift_type, 'start_time': start_time, 'end_time': end_time,
+                        'hours': STANDARD_SHIFT_HOURS}
+            if not self._claim(day_offset, i, slot):
+                continue
+            if slot in open_slots:
+                open_slots.remove(slot)
+            slot = dict(slot, source='rotation')
+            self._record(day_offset, i, slot, worked_early)
+            busy[i] = True
+            result.append((slot, self.members[i]))
+
+        if open_slots:
+            off_penalty = np.zeros(n)
+            for member_id in off_duty:
+                i = self.index.get(member_id)
+                if i is not None:
+                    off_penalty[i] = OFF_DUTY_COST
+            cost = np.vstack([
+                self.slot_costs(day_offset, slot['shift_type'], slot['start_time'], slot['hours']) + off_penalty
+                for slot in open_slots
+            ])
+            cost[:, busy] = INELIGIBLE_COST
+
+            # Re-solve without any shared member another station already holds
+            while True:
+                assigned = {row: col for row, col in solve_assignment(cost) if cost[row, col] < INELIGIBLE_COST}
+                claimed, rejected = [], []
+                for row, col in assigned.items():
+                    (claimed if self._claim(day_offset, col, open_slots[row]) else rejected).append(col)
+                if not rejected:
+                    break
+                for col in claimed:
+                    self._release(day_offset, col)
+                cost[:, rejected] = INELIGIBLE_COST
+
+            for row, slot in enumerate(open_slots):
+                col = assigned.get(row)
+                if col is None:
+                    result.append((slot, None))
+                    continue
+                self._record(day_offset, col, slot, worked_early)
+                result.append((slot, self.members[col]))
+
+        self.consecutive_earlies = np.where(worked_early, self.consecutive_earlies + 1, 0)
+        worked = self.daily_hours[FORTNIGHT_DAYS + day_offset] > 0
+        self.consecutive_days = np.where(worked, self.consecutive_days + 1, 0)
+        return result
+
+    def solve(self, slots_per_day, rotation_plan=None):
+        """Solve every day of the period in order, yielding (day, [(slot, member)]).
+
+        A RotationPlan, if given, is expanded one day at a time as the warm
+        start for that day.
+        """
+        for day_offset in range(self.total_days):
+            day = self.start_date + timedelta(days=day_offset)
+            if rotation_plan is None:
+                yield day, self.solve_day(day_offset, slots_per_day)
+            else:
+                seeded, off_duty = rotation_plan.day(day)
+                yield day, self.solve_day(day_offset, slots_per_day, seeded, off_duty)
+
+
+class RotationPlan:
+    """Members' rotation template assignments, expanded lazily by day.
+
+    `rotations` are dicts with member_id, pattern (a list of shift codes,
+    OFF_DUTY for rest days), offset and anchor_date. A member works
+    pattern[(offset + days since anchor) % len(pattern)] on any day, so
+    nothing is materialised beyond the days actually asked for.
+    """
+
+    def __init__(self, rotations):
+        self.rotations = [r for r in rotations if r.get('pattern')]
+
+    def code_for(self, rotation, day):
+        anchor = rotation['anchor_date']
+        anchor = anchor.date() if isinstance(anchor, datetime) else anchor
+        pattern = rotation['pattern']
+        return pattern[(rotation.get('offset', 0) + (day - anchor).days) % len(pattern)]
+
+    def day(self, day):
+        """Return ([(member_id, shift_type)], {off-duty member_ids}) for a day"""
+        day = day.date() if isinstance(day, datetime) else day
+        working = []
+        off_duty = set()
+        for rotation in self.rotations:
+            code = self.code_for(rotation, day)
+            if code == OFF_DUTY:
+                off_duty.add(rotation['member_id'])
+            else:
+                working.append((rotation['member_id'], code))
+        return working, off_duty
+
+    def expand(self, start_date, total_days):
+        """Yield (day, member_id, shift_type) for every rostered shift in the period"""
+        for day_offset in range(total_days):
+            day = start_date + timedelta(days=day_offset)
+            working, _ = self.day(day)
+            for member_id, shift_type in working:
+                yield day, member_id, shift_type
+
+
+def coverage_slots(min_van_coverage, min_watchhouse_coverage):
+    """Build the list of daily slots required by a generation config"""
+    slots = []
+    for shift_type, count in (('van', min_van_coverage), ('watchhouse', min_watchhouse_coverage)):
+        start_time, end_time = SHIFT_TIMES[shift_type]
+        slots.extend(
+            {'shift_type': shift_type, 'start_time': start_time, 'end_time': end_time, 'hours': STANDARD_SHIFT_HOURS}
+            for _ in range(count)
+        )
+    return slots
+
+
+class AvailabilityMap:
+    """Cross-station claims on shared members' days.
+
+    `claims` and `lock` may be a multiprocessing Manager dict and lock so
+    station solvers in separate worker processes coordinate, or a plain
+    dict and threading lock in-process. Each member entry holds their
+    pre-period history shifts and claimed days; a claim succeeds only if
+    the member has no other shift that day, keeps the minimum break either
+    side and stays within the fortnight limit in every window.
+    """
+
+    def __init__(self, claims, lock, max_fortnight_hours=76.0, min_break_hours=MIN_BREAK_HOURS):
+        self.claims = claims
+        self.lock = lock
+        self.max_fortnight_hours = max_fortnight_hours
+        self.min_break_hours = min_break_hours
+
+    def register(self, member_id, history_shifts):
+        """Track a shared member; `history_shifts` are (start, hours) of shifts already worked"""
+        self.claims[member_id] = {"history": list(history_shifts), "days": {}}
+
+    def claim(self, member_id, station, day, start, end, hours):
+        with self.lock:
+            entry = self.claims.get(member_id)
+            if entry is None:
+                return True
+            days = entry["days"]
+            if day in days:
+                return days[day][0] == station
+
+            previous = days.get(day - 1)
+            if previous and (start - previous[2]).total_seconds() / 3600 < self.min_break_hours:
+                return False
+            following = days.get(day + 1)
+            if following and (following[1] - end).total_seconds() / 3600 < self.min_break_hours:
+                return False
+
+            shifts = entry["history"] + [
+                (claimed_start, claimed_hours) for _, claimed_start, _, claimed_hours in days.values()
+            ]
+            worst = candidate_fortnight_hours(
+                np.zeros(len(shifts), dtype=np.int64),
+                [(shift_start - start).total_seconds() / 3600 for shift_start, _ in shifts],
+                [shift_hours for _, shift_hours in shifts],
+                1, 0.0, hours
+            )
+            if worst[0] > self.max_fortnight_hours:
+                return False
+
+            days[day] = (station, start, end, hours)
+            self.claims[member_id] = entry
+            return True
+
+    def release(self, member_id, station, day):
+        with self.lock:
+            entry = self.claims.get(member_id)
+            if entry and entry["days"].get(day, (None,))[0] == station:
+                del entry["days"][day]
+                self.claims[member_id] = entry
+
+
+def solve_station(payload, availability=None):
+    """Generate one station's assignments from plain data.
+
+    Top-level so it can run in a worker process. `payload` carries the
+    station, member profiles, start_date, total_days, history, leave,
+    rotations, fairness, slots, solver options and shared_member_ids.
+    Returns the station with its assignments and unfilled slots.
+    """
+    solver = RosterSolver(
+        payload['members'],
+        payload['start_date'],
+        payload['total_days'],
+        history=payload.get('history'),
+        leave=payload.get('leave'),
+        fairness=payload.get('fairness'),
+        station=payload['station'],
+        availability=availability,
+        shared_member_ids=payload.get('shared_member_ids', ()),
+        rest_days=payload.get('rest_days'),
+        **payload.get('options', {})
+    )
+    rotations = payload.get('rotations')
+    rotation_plan = RotationPlan(rotations) if rotations is not None else None
+
+    coverage = CoverageIndex(payload['start_date'], payload['total_days'], SHIFT_TIMES)
+    assignments = []
+    for day, day_assignments in solver.solve(payload['slots'], rotation_plan):
+        for slot, member in day_assignments:
+            if member is None:
+                continue
+            coverage.add(len(assignments), member['id'], day, slot['shift_type'])
+            assignments.append(dict(
+                date=day, member_id=member['id'], shift_type=slot['shift_type'],
+                start_time=slot['start_time'], end_time=slot['end_time'], hours=slot['hours'],
+                source=slot.get('source', 'solver')
+            ))
+
+    required = Counter(slot['shift_type'] for slot in payload['slots'])
+    unfilled_slots = [
+        {"date": gap["date"], "shift_type": gap["shift_type"]}
+        for gap in coverage.understaffed(required)
+        for _ in range(gap["shortfall"])
+    ]
+    return {"station": payload['station'], "assignments": assignments, "unfilled_slots": unfilled_slots}
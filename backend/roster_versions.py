@@ -0,0 +1,152 @@
+"""
+Roster versioning for WATCHTOWER
+
+Every change to a roster's ShiftAssignments is stored as a RosterVersion
+holding a compact diff (added, removed and changed assignments) against
+the previous version. A full snapshot is written for the first version
+and every CHECKPOINT_INTERVAL versions after it, so rebuilding any
+version replays at most CHECKPOINT_INTERVAL - 1 diffs.
+
+Snapshots map assignment id to a row list in ASSIGNMENT_FIELDS order.
+"""
+from datetime import datetime
+import json
+import uuid
+
+from sqlalchemy import select, and_, func
+
+from database import RosterVersion, ShiftAssignment
+
+CHECKPOINT_INTERVAL = 20
+ASSIGNMENT_FIELDS = (
+    'member_id', 'date', 'shift_type', 'start_time', 'end_time',
+    'hours', 'is_overtime', 'assignment_reason',
+)
+
+
+def assignment_row(assignment):
+    """Compact row for a ShiftAssignment"""
+    assignment_date = assignment.date.date() if isinstance(assignment.date, datetime) else assignment.date
+    return [
+        assignment.member_id,
+        assignment_date.isoformat() if assignment_date else None,
+        assignment.shift_type,
+        assignment.start_time,
+        assignment.end_time,
+        assignment.hours if assignment.hours is not None else 8.0,
+        bool(assignment.is_overtime),
+        assignment.assignment_reason,
+    ]
+
+
+def snapshot_assignments(assignments):
+    return {assignment.id: assignment_row(assignment) for assignment in assignments}
+
+
+def diff_snapshots(old, new):
+    """Diff two snapshots into added, removed and changed assignments"""
+    return {
+        "added": {key: row for key, row in new.items() if key not in old},
+        "removed": sorted(key for key in old if key not in new),
+        "changed": {key: row for key, row in new.items() if key in old and old[key] != row},
+    }
+
+
+def apply_diff(snapshot, diff):
+    result = dict(snapshot)
+    for key in diff.get("removed", []):
+        result.pop(key, None)
+    result.update(diff.get("added", {}))
+    result.update(diff.get("changed", {}))
+    return result
+
+
+def diff_is_empty(diff):
+    return not (diff["added"] or diff["removed"] or diff["changed"])
+
+
+def expand_snapshot(snapshot):
+    """Snapshot as a list of assignment dicts"""
+    return [dict(zip(ASSIGNMENT_FIELDS, row), id=key) for key, row in snapshot.items()]
+
+
+async def latest_version_number(session, roster_period_id):
+    result = await session.execute(
+        select(func.max(RosterVersion.version)).where(RosterVersion.roster_period_id == roster_period_id)
+    )
+    return result.scalar() or 0
+
+
+async def load_version(session, roster_period_id, version=None):
+    """Rebuild a version's snapshot; the latest when `version` is None.
+
+    Returns (version, snapshot), or (0, None) when the roster has no
+    versions or the requested one does not exist.
+    """
+    if version is None:
+        version = await latest_version_number(session, roster_period_id)
+    if not version:
+        return 0, None
+
+    checkpoint_result = await session.execute(
+        select(func.max(RosterVersion.version)).where(
+            and_(
+                RosterVersion.roster_period_id == roster_period_id,
+                RosterVersion.version <= version,
+                RosterVersion.snapshot_json.isnot(None)
+            )
+        )
+    )
+    checkpoint = checkpoint_result.scalar()
+    if not checkpoint:
+        return 0, None
+
+    versions_result = await session.execute(
+        select(RosterVersion).where(
+            and_(
+                RosterVersion.roster_period_id == roster_period_id,
+                RosterVersion.version >= checkpoint,
+                RosterVersion.version <= version
+            )
+        ).order_by(RosterVersion.version)
+    )
+    rows = versions_result.scalars().all()
+    if not rows or rows[-1].version != version:
+        return 0, None
+
+    snapshot = json.loads(rows[0].snapshot_json)
+    for row in rows[1:]:
+        snapshot = apply_diff(snapshot, json.loads(row.diff_json))
+    return version, snapshot
+
+
+async def record_version(session, roster_period_id, created_by="system"):
+    """Store the roster's current assignments as a new version if they changed.
+
+    Must run after pending assignment changes are flushed; the caller
+    commits. Returns the latest version number.
+    """
+    assignments_result = await session.execute(
+        select(ShiftAssignment).where(ShiftAssignment.roster_period_id == roster_period_id)
+    )
+    current = snapshot_assignments(assignments_result.scalars().all())
+    previous_number, previous = await load_version(session, roster_period_id)
+
+    diff = diff_snapshots(previous or {}, current)
+    if previous is not None and diff_is_empty(diff):
+        return previous_number
+
+    number = previous_number + 1
+    session.add(RosterVersion(
+        id=str(uuid.uuid4()),
+        roster_period_id=roster_period_id,
+        version=number,
+        snapshot_json=json.dumps(current) if number % CHECKPOINT_INTERVAL == 1 else None,
+        diff_json=json.dumps(diff),
+        added_count=len(diff["added"]),
+        removed_count=len(diff["removed"]),
+        changed_count=len(diff["changed"]),
+        created_by=created_by
+    ))
+    await session.flush()
+    return number
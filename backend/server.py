@@ -1,24 +1,54 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, Query, status
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from starlette.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, insert, update, and_, or_, func
 from database import (
-    CONFIG, init_database, get_db, AsyncSessionLocal,
+    CONFIG, DATABASE_PATH, init_database, get_db, AsyncSessionLocal,
     User, Member, Shift, AuditLog, RosterPeriod, ShiftAssignment, 
     RosterPublication, PublicationAlert, LeaveRequest,
+    RotationTemplate, RotationAssignment, RosterVersion, MemberReliefStation, MemberRestDay, MemberQualification,
     model_to_dict, dict_to_model
 )
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import jwt
 import hashlib
 from enum import Enum
 import json
 import logging
 import random
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fairness import fairness_ledger, METRICS as FAIRNESS_METRICS
+from roster_versions import (
+    ASSIGNMENT_FIELDS, record_version, load_version, latest_version_number,
+    diff_snapshots, expand_snapshot, snapshot_assignments
+)
+from roster_engine import (
+    AvailabilityMap, solve_station, coverage_slots, shift_bounds, FORTNIGHT_DAYS, OFF_DUTY, SHIFT_TIMES
+)
+from compliance import ShiftTable, validate as validate_shift_table
+from caching import LRUCache
+from coverage import CoverageIndex
+from leave import leave_index
+from publication import publication_scheduler
+from audit import audit_writer
+from archive import ARCHIVE_AFTER_DAYS, archive_rows, history_session, quarters_for_range
+from backup import BackupInProgress, backup_service, list_backups
+from synthetic_data import generate_dataset
+from exports import EXPORT_FORMATS, keyset_batches, encode_rows
+from member_directory import MemberDirectory, MemberRecord
+from pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER,
+    encode_cursor, decode_cursor, keyset_after, parse_fields
+)
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
@@ -37,6 +67,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Security
@@ -85,6 +116,10 @@ class MemberPreferences(BaseModel):
     preferred_rest_days: List[str] = Field(default_factory=list)
     emergency_contact: Optional[str] = None
 
+class MemberQualificationEntry(BaseModel):
+    qualification: str
+    expires_at: Optional[datetime] = None  # None when the qualification does not expire
+
 class MemberResponse(BaseModel):
     id: str
     vp_number: str
@@ -110,6 +145,19 @@ class ShiftResponse(BaseModel):
     notes: Optional[str] = None
     created_at: datetime
 
+class ShiftCreate(BaseModel):
+    member_id: str
+    shift_type: ShiftType
+    date: datetime
+    start_time: str
+    end_time: str
+    overtime_hours: float = 0.0
+    was_recalled: bool = False
+    notes: Optional[str] = None
+
+class ShiftBatch(BaseModel):
+    shifts: List[ShiftCreate] = Field(max_length=int(CONFIG.get('SHIFT_BATCH_LIMIT', 10000)))
+
 class EBACompliance(BaseModel):
     member_id: str
     fortnight_hours: float
@@ -132,6 +180,21 @@ class RosterGenerationConfig(BaseModel):
     enable_preference_weighting: bool = True
     corro_rotation_priority: bool = True
 
+# Decoded member records, warmed at startup and written through on member changes
+member_directory = MemberDirectory(MemberPreferences().dict())
+
+async def warm_member_directory():
+    """Load every member into the directory"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Member))
+        member_directory.load(result.scalars().all())
+    logger.info(f"Member directory loaded with {len(member_directory.records)} members")
+
+async def loaded_member_directory():
+    if not member_directory.loaded:
+        await warm_member_directory()
+    return member_directory
+
 # Authentication functions
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
@@ -367,32 +430,185 @@ async def register(user_data: UserCreate):
         
         session.add(new_member)
         await session.commit()
+        member_directory.put(new_member)
+        fairness_ledger.register_member(new_member.id, new_member.station)
         
         return {"message": "User created successfully"}
 
 # Member management routes
+MEMBER_FIELDS = (
+    'id', 'vp_number', 'name', 'email', 'station', 'rank', 'seniority_years',
+    'preferences', 'active', 'created_at', 'updated_at',
+)
+SHIFT_FIELDS = (
+    'id', 'member_id', 'shift_type', 'date', 'start_time', 'end_time',
+    'overtime_hours', 'was_recalled', 'notes', 'created_at',
+)
+
+async def keyset_page(query, sort_column, id_column, limit, cursor, row_key, sort_type=str,
+                      session_factory=AsyncSessionLocal):
+    """One page of `query` in (sort, id) order and the cursor for the next, if any.
+
+    `row_key` gives a row's (sort value, id). A `limit` of None returns
+    every row after the cursor.
+    """
+    if cursor:
+        query = query.where(keyset_after(sort_column, id_column, decode_cursor(cursor, sort_type)))
+    query = query.order_by(sort_column, id_column)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    
+    async with session_factory() as session:
+        result = await session.execute(query)
+        rows = result.all()
+    
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*row_key(rows[-1]))
+    return rows, next_cursor
+
+def projected_page(rows, fields, next_cursor, convert=None):
+    """JSON response holding only the requested fields of each row"""
+    items = []
+    for row in rows:
+        item = {field: row._mapping[field] for field in fields}
+        items.append(convert(item) if convert else item)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return JSONResponse(content=jsonable_encoder(items), headers=headers)
+
+def page_limit(limit, cursor):
+    """Rows per page: everything unless the caller asked to page with `limit` or `cursor`"""
+    if limit is None and cursor:
+        return DEFAULT_PAGE_SIZE
+    return limit
+
+def projected_columns(model, fields, sort_column):
+    """Columns for the requested fields plus the sort key, keyed by field name"""
+    columns = {field: getattr(model, field).label(field) for field in fields}
+    columns.setdefault(sort_column.key, sort_column)
+    columns.setdefault('id', model.id)
+    return columns
+
 @api_router.get("/members", response_model=List[MemberResponse])
-async def get_members(current_user: dict = Depends(get_current_user)):
+async def get_members(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """List members by (name, id) from the member directory.
+
+    Without `limit` or `cursor` every member is returned. With either, one
+    page is returned and the next page's cursor is in the X-Next-Cursor
+    header. `fields` limits the fields returned.
+    """
+    try:
+        selected = parse_fields(fields, MEMBER_FIELDS)
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    directory = await loaded_member_directory()
+    records, has_more = directory.page(after, page_limit(limit, cursor))
+    next_cursor = encode_cursor(*records[-1].sort_key()) if has_more and records else None
+    
+    if selected is None:
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return [MemberResponse(**record.to_dict()) for record in records]
+    
+    items = [{field: getattr(record, field) for field in selected} for record in records]
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return JSONResponse(content=jsonable_encoder(items), headers=headers)
+
+@api_router.get("/members/recall-candidates", response_model=List[MemberResponse])
+async def get_recall_candidates(
+    station: Station,
+    date: datetime,
+    min_night_tolerance: Optional[int] = Query(None, ge=0),
+    current_user: dict = Depends(get_current_user)
+):
+    """Active members of a station willing to be recalled on a day.
+
+    Filtered in SQL on the indexed preference columns; members preferring
+    the day off or on approved leave are left out.
+    """
+    day_name = date.strftime('%A').lower()
+    conditions = [
+        Member.station == station.value,
+        Member.active == True,
+        Member.recall_willingness == 1,
+        ~Member.id.in_(select(MemberRestDay.member_id).where(MemberRestDay.day == day_name)),
+    ]
+    if min_night_tolerance is not None:
+        conditions.append(Member.night_shift_tolerance >= min_night_tolerance)
+    
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Member))
-        members = result.scalars().all()
-        
-        response_members = []
-        for member in members:
-            member_dict = model_to_dict(member)
-            if member.preferences_json:
-                try:
-                    member_dict['preferences'] = json.loads(member.preferences_json)
-                except:
-                    member_dict['preferences'] = MemberPreferences().dict()
-            else:
-                member_dict['preferences'] = MemberPreferences().dict()
-            response_members.append(MemberResponse(**member_dict))
-        
-        return response_members
+        result = await session.execute(select(Member.id).where(and_(*conditions)))
+        member_ids = set(result.scalars().all()) - leave_index.on_leave(station.value, date)
+    
+    directory = await loaded_member_directory()
+    records = sorted(directory.get_many(member_ids).values(), key=MemberRecord.sort_key)
+    return [MemberResponse(**record.to_dict()) for record in records]
+
+@api_router.get("/members/qualified", response_model=List[MemberResponse])
+async def get_qualified_members(
+    qualification: List[str] = Query(...),
+    station: Optional[Station] = None,
+    date: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Active members holding every given qualification, current on `date` (default now).
+
+    Served by the (qualification, member_id) index on member_qualifications.
+    """
+    date = date or datetime.utcnow()
+    qualifications = set(qualification)
+    query = (
+        select(MemberQualification.member_id)
+        .join(Member, Member.id == MemberQualification.member_id)
+        .where(
+            and_(
+                MemberQualification.qualification.in_(qualifications),
+                or_(MemberQualification.expires_at == None, MemberQualification.expires_at >= date),
+                Member.active == True
+            )
+        )
+        .group_by(MemberQualification.member_id)
+        .having(func.count() == len(qualifications))
+    )
+    if station is not None:
+        query = query.where(Member.station == station.value)
+    
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        member_ids = result.scalars().all()
+    
+    directory = await loaded_member_directory()
+    records = sorted(directory.get_many(member_ids).values(), key=MemberRecord.sort_key)
+    return [MemberResponse(**record.to_dict()) for record in records]
 
 @api_router.get("/members/{member_id}", response_model=MemberResponse)
 async def get_member(member_id: str, current_user: dict = Depends(get_current_user)):
+    directory = await loaded_member_directory()
+    member = directory.get(member_id)
+    
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+    
+    return MemberResponse(**member.to_dict())
+
+@api_router.put("/members/{member_id}/preferences")
+async def update_member_preferences(
+    member_id: str, 
+    preferences: MemberPreferences, 
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user["role"] not in ["sergeant", "inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(Member).where(Member.id == member_id))
         member = result.scalar_one_or_none()
@@ -400,23 +616,38 @@ async def get_member(member_id: str, current_user: dict = Depends(get_current_us
         if not member:
             raise HTTPException(status_code=404, detail="Member not found")
         
-        member_dict = model_to_dict(member)
-        if member.preferences_json:
-            try:
-                member_dict['preferences'] = json.loads(member.preferences_json)
-            except:
-                member_dict['preferences'] = MemberPreferences().dict()
-        else:
-            member_dict['preferences'] = MemberPreferences().dict()
-            
-        return MemberResponse(**member_dict)
+        member.preferences_json = json.dumps(preferences.dict())
+        member.updated_at = datetime.utcnow()
+        
+        # Log the change in the same commit
+        audit_writer.record(
+            current_user["id"], "update_preferences", "member", member_id, preferences.dict(), session=session
+        )
+        await session.commit()
+        member_directory.put(member)
+        
+        return {"message": "Preferences updated successfully"}
 
-@api_router.put("/members/{member_id}/preferences")
-async def update_member_preferences(
-    member_id: str, 
-    preferences: MemberPreferences, 
+@api_router.get("/members/{member_id}/qualifications", response_model=List[MemberQualificationEntry])
+async def get_member_qualifications(member_id: str, current_user: dict = Depends(get_current_user)):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(MemberQualification)
+            .where(MemberQualification.member_id == member_id)
+            .order_by(MemberQualification.qualification)
+        )
+        return [
+            MemberQualificationEntry(qualification=row.qualification, expires_at=row.expires_at)
+            for row in result.scalars().all()
+        ]
+
+@api_router.put("/members/{member_id}/qualifications")
+async def update_member_qualifications(
+    member_id: str,
+    qualifications: List[MemberQualificationEntry],
     current_user: dict = Depends(get_current_user)
 ):
+    """Replace a member's special qualifications and their expiry dates"""
     if current_user["role"] not in ["sergeant", "inspector", "admin"]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
@@ -427,54 +658,170 @@ async def update_member_preferences(
         if not member:
             raise HTTPException(status_code=404, detail="Member not found")
         
-        member.preferences_json = json.dumps(preferences.dict())
+        expiries = {entry.qualification: entry.expires_at for entry in qualifications}
+        member.special_qualifications = json.dumps(list(expiries))
         member.updated_at = datetime.utcnow()
+        # The members trigger adds and removes member_qualifications rows on flush
+        await session.flush()
+        for name, expires_at in expiries.items():
+            await session.execute(
+                update(MemberQualification)
+                .where(and_(MemberQualification.member_id == member_id, MemberQualification.qualification == name))
+                .values(expires_at=expires_at)
+            )
         
+        audit_writer.record(
+            current_user["id"], "update_qualifications", "member", member_id,
+            jsonable_encoder(qualifications), session=session
+        )
         await session.commit()
+        member_directory.put(member)
         
-        # Log the change
-        audit_log = AuditLog(
-            id=str(uuid.uuid4()),
-            user_id=current_user["id"],
-            action="update_preferences",
-            target_type="member",
-            target_id=member_id,
-            changes_json=json.dumps(preferences.dict())
-        )
-        session.add(audit_log)
+        return {"message": "Qualifications updated", "qualifications": list(expiries)}
+
+@api_router.put("/members/{member_id}/relief-stations")
+async def update_member_relief_stations(
+    member_id: str,
+    stations: List[Station],
+    current_user: dict = Depends(get_current_user)
+):
+    """Set the stations a member relieves at, besides their home station"""
+    if current_user["role"] not in ["sergeant", "inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    member = (await loaded_member_directory()).get(member_id)
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+    
+    async with AsyncSessionLocal() as session:
+        existing = await session.execute(select(MemberReliefStation).where(MemberReliefStation.member_id == member_id))
+        for relief in existing.scalars().all():
+            await session.delete(relief)
+        
+        relief_stations = sorted({station.value for station in stations} - {member.station})
+        for station in relief_stations:
+            session.add(MemberReliefStation(id=str(uuid.uuid4()), member_id=member_id, station=station))
         await session.commit()
+        audit_writer.record(current_user["id"], "update_relief_stations", "member", member_id, relief_stations)
         
-        return {"message": "Preferences updated successfully"}
+        return {"message": "Relief stations updated", "relief_stations": relief_stations}
 
 @api_router.get("/shifts", response_model=List[ShiftResponse])
 async def get_shifts(
+    response: Response,
     member_id: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    async with AsyncSessionLocal() as session:
-        query = select(Shift)
-        conditions = []
-        
-        if member_id:
-            conditions.append(Shift.member_id == member_id)
-        if start_date:
-            conditions.append(Shift.date >= start_date)
-        if end_date:
-            conditions.append(Shift.date <= end_date)
+    """List shifts by (date, id).
+
+    Without `limit` or `cursor` every matching shift is returned. With
+    either, one page is returned and the next page's cursor is in the
+    X-Next-Cursor header. `fields` limits the columns selected and
+    returned. Archived shifts are included when `start_date` reaches back
+    to them.
+    """
+    limit = page_limit(limit, cursor)
+    conditions = []
+    if member_id:
+        conditions.append(Shift.member_id == member_id)
+    if start_date:
+        conditions.append(Shift.date >= start_date)
+    if end_date:
+        conditions.append(Shift.date <= end_date)
+    
+    try:
+        selected = parse_fields(fields, SHIFT_FIELDS)
+        
+        if selected is None:
+            query = select(Shift)
+            if conditions:
+                query = query.where(and_(*conditions))
+            rows, next_cursor = await keyset_page(
+                query, Shift.date, Shift.id, limit, cursor,
+                lambda row: (row[0].date, row[0].id), datetime,
+                lambda: history_session(start_date, end_date)
+            )
+            if next_cursor:
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            return [ShiftResponse(**model_to_dict(row[0])) for row in rows]
         
+        columns = projected_columns(Shift, selected, Shift.date)
+        query = select(*columns.values())
         if conditions:
             query = query.where(and_(*conditions))
-        
-        result = await session.execute(query)
-        shifts = result.scalars().all()
-        
-        return [ShiftResponse(**model_to_dict(shift)) for shift in shifts]
+        rows, next_cursor = await keyset_page(
+            query, Shift.date, Shift.id, limit, cursor,
+            lambda row: (row._mapping['date'], row._mapping['id']), datetime,
+            lambda: history_session(start_date, end_date)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return projected_page(rows, selected, next_cursor)
+
+SHIFT_EXPORT_FIELDS = (
+    'id', 'member_id', 'vp_number', 'member_name', 'station', 'shift_type', 'date',
+    'start_time', 'end_time', 'hours', 'overtime_hours', 'was_recalled', 'notes',
+)
+
+def export_response(batches, fields, export_format, filename, transform=None):
+    return StreamingResponse(
+        encode_rows(batches, fields, export_format, transform),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+def shift_export_record(row):
+    record = dict(row._mapping)
+    record['hours'] = calculate_shift_hours({"overtime_hours": record['overtime_hours'] or 0})
+    return record
+
+@api_router.get("/shifts/export")
+async def export_shifts(
+    member_id: Optional[str] = None,
+    station: Optional[Station] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream worked shifts with member details as CSV or NDJSON, ordered by date.
+
+    Archived shifts are included when `start_date` reaches back to them.
+    """
+    conditions = [Member.id == Shift.member_id]
+    if member_id:
+        conditions.append(Shift.member_id == member_id)
+    if station:
+        conditions.append(Member.station == station.value)
+    if start_date:
+        conditions.append(Shift.date >= start_date)
+    if end_date:
+        conditions.append(Shift.date <= end_date)
+    
+    columns = (
+        Shift.id, Shift.member_id, Member.vp_number, Member.name.label('member_name'), Member.station,
+        Shift.shift_type, Shift.date, Shift.start_time, Shift.end_time, Shift.overtime_hours,
+        Shift.was_recalled, Shift.notes
+    )
+    try:
+        quarters_for_range(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    batches = keyset_batches(
+        columns, conditions, Shift.date, Shift.id,
+        session_factory=lambda: history_session(start_date, end_date)
+    )
+    return export_response(batches, SHIFT_EXPORT_FIELDS, export_format, "shifts", shift_export_record)
 
 @api_router.post("/shifts", response_model=ShiftResponse)
 async def create_shift(
-    shift_data: dict,
+    shift_data: ShiftCreate,
     current_user: dict = Depends(get_current_user)
 ):
     if current_user["role"] not in ["sergeant", "inspector", "admin"]:
@@ -483,18 +830,103 @@ async def create_shift(
     async with AsyncSessionLocal() as session:
         new_shift = Shift(
             id=str(uuid.uuid4()),
-            **shift_data
+            **{**shift_data.dict(), "shift_type": shift_data.shift_type.value}
         )
         
         session.add(new_shift)
         await session.commit()
         
+        if new_shift.member_id not in fairness_ledger.member_station:
+            member = (await loaded_member_directory()).get(new_shift.member_id)
+            if member:
+                fairness_ledger.register_member(new_shift.member_id, member.station)
+        fairness_ledger.record_shift({
+            "member_id": new_shift.member_id,
+            "shift_type": new_shift.shift_type,
+            "date": new_shift.date,
+            "overtime_hours": new_shift.overtime_hours
+        })
+        
         return ShiftResponse(**model_to_dict(new_shift))
 
+@api_router.post("/shifts/batch")
+async def create_shifts_batch(
+    batch: ShiftBatch,
+    current_user: dict = Depends(get_current_user)
+):
+    """Insert many worked shifts in one transaction; any invalid shift rejects the batch"""
+    if current_user["role"] not in ["sergeant", "inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    if not batch.shifts:
+        return {"message": "No shifts to import", "inserted": 0, "members": 0}
+    
+    async with AsyncSessionLocal() as session:
+        member_ids = {shift.member_id for shift in batch.shifts}
+        directory = await loaded_member_directory()
+        stations = {member_id: record.station for member_id, record in directory.get_many(member_ids).items()}
+        
+        errors = [
+            {"index": i, "member_id": shift.member_id, "error": "Member not found"}
+            for i, shift in enumerate(batch.shifts) if shift.member_id not in stations
+        ]
+        errors += [
+            {"index": i, "member_id": shift.member_id, "error": "Times must be HH:MM"}
+            for i, shift in enumerate(batch.shifts)
+            if not (valid_shift_time(shift.start_time) and valid_shift_time(shift.end_time))
+        ]
+        if errors:
+            raise HTTPException(
+                status_code=400,
+                detail={"message": f"{len(errors)} invalid shifts; nothing was imported", "errors": errors}
+            )
+        
+        now = datetime.utcnow()
+        rows = [
+            {**shift.dict(), "id": str(uuid.uuid4()), "shift_type": shift.shift_type.value, "created_at": now}
+            for shift in batch.shifts
+        ]
+        try:
+            await session.execute(insert(Shift), rows)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Error importing shifts: {e}")
+            raise HTTPException(status_code=500, detail="Failed to import shifts")
+    
+    # Derived data is updated once per affected member and station, not per shift
+    for member_id in member_ids - set(fairness_ledger.member_station):
+        fairness_ledger.register_member(member_id, stations[member_id])
+    fairness_ledger.record_shifts(rows)
+    
+    return {"message": "Shifts imported", "inserted": len(rows), "members": len(member_ids)}
+
+def valid_shift_time(value):
+    try:
+        datetime.strptime(value, "%H:%M")
+        return True
+    except ValueError:
+        return False
+
 # Initialize sample data
 @api_router.post("/init-sample-data")
-async def initialize_sample_data():
-    """Initialize the database with sample data for demo purposes"""
+async def initialize_sample_data(
+    synthetic: bool = False,
+    seed: int = 1,
+    stations: int = Query(2, ge=1),
+    members: int = Query(200, ge=3, le=50000),
+    years: float = Query(1.0, gt=0, le=10),
+    end_date: Optional[date] = None
+):
+    """Initialize the database with sample data for demo purposes.
+
+    With `synthetic`, a seeded dataset of `members` across `stations` with
+    `years` of shift history up to `end_date` (default today) is generated
+    instead (see synthetic_data.py). The same seed and end date always
+    give the same rows.
+    """
+    if stations > len(Station):
+        served = ', '.join(station.value for station in Station)
+        raise HTTPException(status_code=400, detail=f"At most {len(Station)} stations; the API only serves {served}")
     try:
         async with AsyncSessionLocal() as session:
             # Check if data already exists
@@ -504,6 +936,16 @@ async def initialize_sample_data():
             if user_count > 0:
                 return {"message": "Sample data already exists"}
             
+            if synthetic:
+                counts = await asyncio.to_thread(
+                    generate_dataset, DATABASE_PATH, seed, stations, members, years, end_date
+                )
+                await warm_member_directory()
+                await warm_fairness_ledger()
+                await warm_leave_index()
+                logger.info(f"Synthetic data generated: {counts}")
+                return {"message": "Synthetic data generated successfully", "rows": counts}
+            
             # Parse demo users from config
             
             # Parse demo users
@@ -576,6 +1018,9 @@ async def initialize_sample_data():
             # Create sample shifts for demonstration
             await create_sample_shifts(session)
             await session.commit()
+            await warm_member_directory()
+            await warm_fairness_ledger()
+            await warm_leave_index()
             
             logger.info("Sample data initialized successfully")
             return {"message": "Sample data initialized successfully"}
@@ -627,8 +1072,7 @@ async def get_workload_summary(current_user: dict = Depends(get_current_user)):
         eight_weeks_ago = datetime.utcnow() - timedelta(weeks=8)
         
         # Get all members
-        members_result = await session.execute(select(Member))
-        members = members_result.scalars().all()
+        members = (await loaded_member_directory()).members()
         
         result = []
         for member in members:
@@ -691,8 +1135,7 @@ async def get_corro_distribution(current_user: dict = Depends(get_current_user))
         four_weeks_ago = datetime.utcnow() - timedelta(weeks=4)
         
         # Get all active members
-        members_result = await session.execute(select(Member).where(Member.active == True))
-        members = members_result.scalars().all()
+        members = (await loaded_member_directory()).members(active_only=True)
         
         result = []
         for member in members:
@@ -729,8 +1172,7 @@ async def get_corro_distribution(current_user: dict = Depends(get_current_user))
 async def get_eba_violations_detail(current_user: dict = Depends(get_current_user)):
     """Get detailed EBA violations breakdown"""
     async with AsyncSessionLocal() as session:
-        members_result = await session.execute(select(Member).where(Member.active == True))
-        members = members_result.scalars().all()
+        members = (await loaded_member_directory()).members(active_only=True)
         
         violations = []
         for member in members:
@@ -753,8 +1195,7 @@ async def get_eba_violations_detail(current_user: dict = Depends(get_current_use
 async def get_eba_warnings_detail(current_user: dict = Depends(get_current_user)):
     """Get detailed EBA warnings breakdown"""
     async with AsyncSessionLocal() as session:
-        members_result = await session.execute(select(Member).where(Member.active == True))
-        members = members_result.scalars().all()
+        members = (await loaded_member_directory()).members(active_only=True)
         
         warnings = []
         for member in members:
@@ -776,8 +1217,7 @@ async def get_eba_warnings_detail(current_user: dict = Depends(get_current_user)
 async def get_eba_compliant_members(current_user: dict = Depends(get_current_user)):
     """Get members who are EBA compliant"""
     async with AsyncSessionLocal() as session:
-        members_result = await session.execute(select(Member).where(Member.active == True))
-        members = members_result.scalars().all()
+        members = (await loaded_member_directory()).members(active_only=True)
         
         compliant = []
         for member in members:
@@ -797,8 +1237,7 @@ async def get_eba_compliant_members(current_user: dict = Depends(get_current_use
 async def get_over_76_hours(current_user: dict = Depends(get_current_user)):
     """Get members over 76 hours"""
     async with AsyncSessionLocal() as session:
-        members_result = await session.execute(select(Member).where(Member.active == True))
-        members = members_result.scalars().all()
+        members = (await loaded_member_directory()).members(active_only=True)
         
         over_76 = []
         for member in members:
@@ -819,8 +1258,7 @@ async def get_over_76_hours(current_user: dict = Depends(get_current_user)):
 async def get_approaching_76_hours(current_user: dict = Depends(get_current_user)):
     """Get members approaching 76 hours (65-76h range)"""
     async with AsyncSessionLocal() as session:
-        members_result = await session.execute(select(Member).where(Member.active == True))
-        members = members_result.scalars().all()
+        members = (await loaded_member_directory()).members(active_only=True)
         
         approaching = []
         for member in members:
@@ -837,13 +1275,25 @@ async def get_approaching_76_hours(current_user: dict = Depends(get_current_user
         
         return sorted(approaching, key=lambda x: x["fortnight_hours"], reverse=True)
 
+@api_router.get("/analytics/fairness")
+async def get_fairness_ledger(station: Station, current_user: dict = Depends(get_current_user)):
+    """Get rolling corro, night, weekend and overtime equity for a station"""
+    directory = await loaded_member_directory()
+    names = {member.id: member.name for member in directory.members(station.value, active_only=True)}
+    
+    snapshot = fairness_ledger.station(station.value).snapshot()
+    snapshot["members"] = [
+        dict(entry, member_name=names[entry["member_id"]])
+        for entry in snapshot["members"] if entry["member_id"] in names
+    ]
+    return snapshot
+
 @api_router.get("/members/{member_id}/detailed-view")
 async def get_detailed_member_view(member_id: str, current_user: dict = Depends(get_current_user)):
     """Get comprehensive detailed view for a member"""
     async with AsyncSessionLocal() as session:
         # Get member
-        member_result = await session.execute(select(Member).where(Member.id == member_id))
-        member = member_result.scalar_one_or_none()
+        member = (await loaded_member_directory()).get(member_id)
         
         if not member:
             raise HTTPException(status_code=404, detail="Member not found")
@@ -863,13 +1313,11 @@ async def get_detailed_member_view(member_id: str, current_user: dict = Depends(
         # Get EBA compliance
         compliance = await check_eba_compliance(member_id, session)
         
-        # Parse preferences
-        preferences = {}
-        if member.preferences_json:
-            try:
-                preferences = json.loads(member.preferences_json)
-            except:
-                preferences = MemberPreferences().dict()
+        preferences = member.preferences
+        
+        # Fairness position within the station: 100 when at the median for every metric
+        fairness_positions = fairness_ledger.station(member.station).positions([member.id])[0]
+        fairness_score = round(100 - float(abs(fairness_positions - 50).mean()) * 2, 1)
         
         # Calculate shift breakdown (weekly hours for last 12 weeks)
         shift_breakdown = []
@@ -935,7 +1383,8 @@ async def get_detailed_member_view(member_id: str, current_user: dict = Depends(
             "equity_tracking": {
                 "corro_assignments_3months": len([s for s in shifts if s.shift_type == "corro" and s.date >= datetime.utcnow() - timedelta(days=90)]),
                 "overtime_hours_3months": sum(s.overtime_hours for s in shifts if s.date >= datetime.utcnow() - timedelta(days=90)),
-                "fairness_score": min(100, max(0, 100 - abs(compliance.fortnight_hours - 50))),  # Simple fairness calculation
+                "fairness_score": fairness_score,
+                "fairness_percentiles": dict(zip(FAIRNESS_METRICS, fairness_positions.round(1).tolist())),
                 "weekend_assignments": len([s for s in shifts if s.date.weekday() >= 5])
             }
         }
@@ -944,12 +1393,59 @@ async def get_detailed_member_view(member_id: str, current_user: dict = Depends(
 
 class RosterGenerationConfig(BaseModel):
     station: str
+    # First day of the roster, today by default. Publication deadline alerts
+    # are only raised for rosters starting PUBLICATION_NOTICE_DAYS or more ahead.
+    start_date: Optional[date] = None
     period_weeks: int = 2
     min_van_coverage: int = 2
     min_watchhouse_coverage: int = 1
+    max_consecutive_days: int = 5
     enable_fatigue_balancing: bool = True
     consider_preferences: bool = True
     fair_corro_rotation: bool = True
+    # Extra requirements per shift type, e.g. {"van": ["ada_driver", "ostt_current"]}
+    slot_requirements: Dict[str, List[str]] = Field(default_factory=dict)
+    use_rotation_templates: bool = True
+
+class MultiStationGenerationConfig(RosterGenerationConfig):
+    station: Optional[str] = None
+    stations: List[str]
+    max_workers: Optional[int] = None
+
+class RosterAssignmentCreate(BaseModel):
+    member_id: str
+    date: datetime
+    shift_type: ShiftType
+    start_time: str
+    end_time: str
+    hours: float = 8.0
+    is_overtime: bool = False
+
+class RosterAssignmentChange(BaseModel):
+    id: str
+    member_id: Optional[str] = None
+    date: Optional[datetime] = None
+    shift_type: Optional[ShiftType] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    hours: Optional[float] = None
+    is_overtime: Optional[bool] = None
+
+class RosterEdit(BaseModel):
+    added: List[RosterAssignmentCreate] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)
+    changed: List[RosterAssignmentChange] = Field(default_factory=list)
+    edited_by: str = "system"
+
+class RotationTemplateCreate(BaseModel):
+    name: str
+    station: str
+    pattern: List[str] = Field(description="Shift code per day of the cycle, 'off' for rest days")
+
+class RotationAssignmentCreate(BaseModel):
+    member_id: str
+    offset: int = Field(default=0, description="Cycle day the member is on at anchor_date")
+    anchor_date: datetime
 
 @api_router.get("/roster/periods")
 async def get_roster_periods(station: str, session=Depends(get_db)):
@@ -965,92 +1461,550 @@ async def get_roster_periods(station: str, session=Depends(get_db)):
         logger.error(f"Error fetching roster periods: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch roster periods")
 
+@api_router.get("/roster/templates")
+async def get_rotation_templates(station: Optional[str] = None, session=Depends(get_db)):
+    """Get rotation templates, optionally for one station"""
+    query = select(RotationTemplate)
+    if station:
+        query = query.where(RotationTemplate.station == station)
+    result = await session.execute(query.order_by(RotationTemplate.name))
+    
+    templates = []
+    for template in result.scalars().all():
+        template_dict = model_to_dict(template)
+        template_dict['pattern'] = json.loads(template_dict.pop('pattern_json') or '[]')
+        templates.append(template_dict)
+    return templates
+
+@api_router.post("/roster/templates")
+async def create_rotation_template(template: RotationTemplateCreate, session=Depends(get_db)):
+    """Create a named rotation template such as 2 earlies, 2 lates, 3 nights, 4 off"""
+    valid_codes = {shift_type.value for shift_type in ShiftType} | {OFF_DUTY}
+    invalid = [code for code in template.pattern if code not in valid_codes]
+    if not template.pattern or invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid rotation pattern codes: {invalid or 'empty pattern'}")
+    
+    existing = await session.execute(select(RotationTemplate).where(RotationTemplate.name == template.name))
+    if existing.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="Rotation template already exists")
+    
+    rotation_template = RotationTemplate(
+        id=str(uuid.uuid4()),
+        name=template.name,
+        station=template.station,
+        pattern_json=json.dumps(template.pattern),
+        created_by='system'
+    )
+    session.add(rotation_template)
+    await session.commit()
+    
+    return {"message": "Rotation template created", "template_id": rotation_template.id}
+
+@api_router.post("/roster/templates/{template_id}/assignments")
+async def assign_rotation_template(
+    template_id: str,
+    assignment: RotationAssignmentCreate,
+    session=Depends(get_db)
+):
+    """Put a member on a rotation template at a given cycle offset"""
+    template_result = await session.execute(select(RotationTemplate).where(RotationTemplate.id == template_id))
+    rotation_template = template_result.scalar_one_or_none()
+    if not rotation_template:
+        raise HTTPException(status_code=404, detail="Rotation template not found")
+    
+    if not (await loaded_member_directory()).get(assignment.member_id):
+        raise HTTPException(status_code=404, detail="Member not found")
+    
+    # A member follows one rotation at a time
+    current = await session.execute(
+        select(RotationAssignment).where(
+            and_(RotationAssignment.member_id == assignment.member_id, RotationAssignment.active == True)
+        )
+    )
+    for previous in current.scalars().all():
+        previous.active = False
+    
+    rotation_assignment = RotationAssignment(
+        id=str(uuid.uuid4()),
+        template_id=template_id,
+        member_id=assignment.member_id,
+        offset=assignment.offset % len(json.loads(rotation_template.pattern_json)),
+        anchor_date=assignment.anchor_date
+    )
+    session.add(rotation_assignment)
+    await session.commit()
+    
+    return {"message": "Member assigned to rotation", "assignment_id": rotation_assignment.id}
+
+async def load_generation_payload(session, station, members, start_date, end_date, config):
+    """Gather everything the solver needs for one station as plain, picklable data"""
+    member_ids = [member.id for member in members]
+    total_days = (end_date - start_date).days
+    period_start = datetime.combine(start_date, datetime.min.time())
+    period_end = datetime.combine(end_date, datetime.min.time())
+
+    # Recent worked shifts feed the fatigue window and 10h break checks
+    history_result = await session.execute(
+        select(Shift).where(
+            and_(
+                Shift.member_id.in_(member_ids),
+                Shift.date >= period_start - timedelta(days=FORTNIGHT_DAYS),
+                Shift.date < period_start
+            )
+        )
+    )
+    history = [model_to_dict(shift) for shift in history_result.scalars().all()]
+    for shift in history:
+        shift['date'] = datetime.fromisoformat(shift['date'])
+
+    leave = leave_index.periods(member_ids, start_date, end_date)
+
+    # Only qualifications current for the whole period count towards specialist slots
+    qualifications_result = await session.execute(
+        select(MemberQualification.member_id, MemberQualification.qualification).where(
+            and_(
+                MemberQualification.member_id.in_(member_ids),
+                or_(MemberQualification.expires_at == None, MemberQualification.expires_at >= period_end)
+            )
+        )
+    )
+    current_qualifications = {}
+    for member_id, qualification in qualifications_result.all():
+        current_qualifications.setdefault(member_id, []).append(qualification)
+    profiles = [member.profile() for member in members]
+    for profile in profiles:
+        profile["special_qualifications"] = current_qualifications.get(profile["id"], [])
+
+    # Preferred rest days from the trigger-maintained member_rest_days table
+    rest_days_result = await session.execute(
+        select(MemberRestDay.day, MemberRestDay.member_id).where(MemberRestDay.member_id.in_(member_ids))
+    )
+    rest_days = {}
+    for day_name, member_id in rest_days_result.all():
+        rest_days.setdefault(day_name, []).append(member_id)
+
+    # Rotation templates seed each day before optimisation
+    rotations = None
+    if config.use_rotation_templates:
+        rotations_result = await session.execute(
+            select(RotationAssignment, RotationTemplate.pattern_json)
+            .join(RotationTemplate, RotationAssignment.template_id == RotationTemplate.id)
+            .where(
+                and_(
+                    RotationAssignment.member_id.in_(member_ids),
+                    RotationAssignment.active == True
+                )
+            )
+        )
+        rotations = [
+            {
+                "member_id": rotation.member_id,
+                "pattern": json.loads(pattern_json or '[]'),
+                "offset": rotation.offset or 0,
+                "anchor_date": rotation.anchor_date
+            }
+            for rotation, pattern_json in rotations_result.all()
+        ]
+
+    return {
+        "station": station,
+        "members": profiles,
+        "start_date": start_date,
+        "total_days": total_days,
+        "history": history,
+        "leave": leave,
+        "rotations": rotations,
+        "rest_days": rest_days,
+        "fairness": fairness_ledger.station(station).positions(member_ids),
+        "slots": coverage_slots(config.min_van_coverage, config.min_watchhouse_coverage),
+        "options": {
+            "enable_fatigue_balancing": config.enable_fatigue_balancing,
+            "consider_preferences": config.consider_preferences,
+            "slot_requirements": config.slot_requirements,
+            **generation_rules(config)
+        }
+    }
+
+def generation_rules(config):
+    """EBA rules a generation config overrides, in compliance.DEFAULT_RULES terms"""
+    return {"max_consecutive_days": config.max_consecutive_days}
+
+def add_generated_roster(session, station, start_date, end_date, result, config):
+    """Add a draft RosterPeriod and its generated assignments to the session.
+
+    The period keeps the rules it was generated under, so validating or
+    publishing it checks the same rules.
+    """
+    roster_period = RosterPeriod(
+        id=str(uuid.uuid4()),
+        station=station,
+        start_date=start_date,
+        end_date=end_date,
+        status='draft',
+        created_by='system',
+        rules_json=json.dumps(generation_rules(config))
+    )
+    session.add(roster_period)
+    
+    for assignment in result["assignments"]:
+        session.add(ShiftAssignment(
+            id=str(uuid.uuid4()),
+            roster_period_id=roster_period.id,
+            member_id=assignment['member_id'],
+            date=assignment['date'],
+            shift_type=assignment['shift_type'],
+            start_time=assignment['start_time'],
+            end_time=assignment['end_time'],
+            hours=assignment['hours'],
+            assignment_reason=(
+                'rotation_template' if assignment['source'] == 'rotation'
+                else 'auto_generated_high_priority' if config.enable_fatigue_balancing
+                else 'auto_generated'
+            )
+        ))
+    return roster_period
+
+def generated_roster_response(roster_period, version, result):
+    return {
+        "roster_period_id": roster_period.id,
+        "version": version,
+        "total_assignments": len(result["assignments"]),
+        "unfilled_slots": result["unfilled_slots"],
+        "period_info": {
+            "start_date": roster_period.start_date.isoformat(),
+            "end_date": roster_period.end_date.isoformat(),
+            "station": roster_period.station,
+            "status": roster_period.status
+        }
+    }
+
 @api_router.post("/roster/generate")
 async def generate_roster(config: RosterGenerationConfig, session=Depends(get_db)):
     """Generate a new roster based on configuration"""
     try:
         # Create a new roster period
-        start_date = datetime.utcnow().date()
+        start_date = config.start_date or datetime.utcnow().date()
         end_date = start_date + timedelta(weeks=config.period_weeks)
         
-        roster_period = RosterPeriod(
-            id=str(uuid.uuid4()),
-            station=config.station,
-            start_date=start_date,
-            end_date=end_date,
-            status='draft',
-            created_by='system'
-        )
+        # Generate shift assignments by solving each day's coverage slots optimally
+        members = (await loaded_member_directory()).members(config.station, active_only=True)
+        payload = await load_generation_payload(session, config.station, members, start_date, end_date, config)
+        result = solve_station(payload)
         
-        session.add(roster_period)
+        roster_period = add_generated_roster(session, config.station, start_date, end_date, result, config)
+        await session.flush()
+        version = await record_version(session, roster_period.id, created_by='system')
+        await session.commit()
+        await session.refresh(roster_period)
+        publication_scheduler.schedule(roster_period.id, roster_period.station, roster_period.start_date)
         
-        # Generate shift assignments (simplified for demo)
-        members_result = await session.execute(select(Member).where(Member.station == config.station))
-        members = members_result.scalars().all()
-        total_days = (end_date - start_date).days
+        return {
+            "message": "Roster generated successfully",
+            **generated_roster_response(roster_period, version, result)
+        }
         
-        shift_types = ['van', 'watchhouse', 'corro', 'early', 'late', 'night']
-        assignment_count = 0
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error generating roster: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate roster: {str(e)}")
+
+@api_router.post("/roster/generate/multi-station")
+async def generate_multi_station_roster(config: MultiStationGenerationConfig, session=Depends(get_db)):
+    """Generate rosters for several stations at once.
+
+    Each station is solved in its own worker process. Members who relieve
+    at other stations join those stations' pools, and a shared
+    availability map stops them being double-booked or over the
+    fortnight limit across stations. All rosters commit together or not
+    at all.
+    """
+    stations = list(dict.fromkeys(config.stations))
+    if not stations:
+        raise HTTPException(status_code=400, detail="At least one station is required")
+    
+    try:
+        start_date = config.start_date or datetime.utcnow().date()
+        end_date = start_date + timedelta(weeks=config.period_weeks)
         
-        for day_offset in range(total_days):
-            current_date = start_date + timedelta(days=day_offset)
-            
-            # Create minimum required shifts per day
-            for van_slot in range(config.min_van_coverage):
-                member = members[assignment_count % len(members)] if members else None
-                if member:
-                    shift_assignment = ShiftAssignment(
-                        id=str(uuid.uuid4()),
-                        roster_period_id=roster_period.id,
-                        member_id=member.id,
-                        date=current_date,
-                        shift_type='van',
-                        start_time='06:00',
-                        end_time='14:00',
-                        assignment_reason='auto_generated_high_priority' if config.enable_fatigue_balancing else 'auto_generated'
-                    )
-                    session.add(shift_assignment)
-                    assignment_count += 1
-            
-            for watchhouse_slot in range(config.min_watchhouse_coverage):
-                member = members[assignment_count % len(members)] if members else None
-                if member:
-                    shift_assignment = ShiftAssignment(
-                        id=str(uuid.uuid4()),
-                        roster_period_id=roster_period.id,
-                        member_id=member.id,
-                        date=current_date,
-                        shift_type='watchhouse',
-                        start_time='14:00',
-                        end_time='22:00',
-                        assignment_reason='auto_generated'
-                    )
-                    session.add(shift_assignment)
-                    assignment_count += 1
+        directory = await loaded_member_directory()
+        members_by_id = {
+            member.id: member for member in directory.members(active_only=True) if member.station in stations
+        }
+        pools = {station: [m for m in members_by_id.values() if m.station == station] for station in stations}
         
+        relief_result = await session.execute(
+            select(MemberReliefStation.member_id, MemberReliefStation.station)
+            .join(Member, Member.id == MemberReliefStation.member_id)
+            .where(and_(MemberReliefStation.station.in_(stations), Member.active == True))
+        )
+        relief = relief_result.all()
+        members_by_id.update(directory.get_many({member_id for member_id, _ in relief} - set(members_by_id)))
+        for member_id, station in relief:
+            if member_id in members_by_id and members_by_id[member_id] not in pools[station]:
+                pools[station].append(members_by_id[member_id])
+        
+        pool_counts = {}
+        for pool in pools.values():
+            for member in pool:
+                pool_counts[member.id] = pool_counts.get(member.id, 0) + 1
+        shared_ids = {member_id for member_id, count in pool_counts.items() if count > 1}
+        
+        payloads = []
+        for station in stations:
+            payload = await load_generation_payload(session, station, pools[station], start_date, end_date, config)
+            payload["shared_member_ids"] = [m.id for m in pools[station] if m.id in shared_ids]
+            payloads.append(payload)
+        
+        loop = asyncio.get_running_loop()
+        workers = min(len(stations), config.max_workers or os.cpu_count() or 1)
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+            availability = AvailabilityMap(manager.dict(), manager.Lock())
+            for payload in payloads:
+                for profile in payload["members"]:
+                    if profile["id"] in shared_ids and profile["id"] not in availability.claims:
+                        availability.register(profile["id"], history_shifts(payload["history"], profile["id"]))
+            results = await asyncio.gather(*[
+                loop.run_in_executor(pool, solve_station, payload, availability if shared_ids else None)
+                for payload in payloads
+            ])
+        
+        # One transaction for every station's roster
+        roster_periods = [
+            add_generated_roster(session, result["station"], start_date, end_date, result, config)
+            for result in results
+        ]
+        await session.flush()
+        versions = [
+            await record_version(session, roster_period.id, created_by='system')
+            for roster_period in roster_periods
+        ]
         await session.commit()
-        await session.refresh(roster_period)
+        for roster_period in roster_periods:
+            publication_scheduler.schedule(roster_period.id, roster_period.station, roster_period.start_date)
         
         return {
-            "message": "Roster generated successfully",
-            "roster_period_id": roster_period.id,
-            "total_assignments": assignment_count,
-            "period_info": {
-                "start_date": roster_period.start_date.isoformat(),
-                "end_date": roster_period.end_date.isoformat(),
-                "station": roster_period.station,
-                "status": roster_period.status
+            "message": "Rosters generated successfully",
+            "shared_members": len(shared_ids),
+            "rosters": {
+                result["station"]: generated_roster_response(roster_period, version, result)
+                for roster_period, version, result in zip(roster_periods, versions, results)
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         await session.rollback()
-        logger.error(f"Error generating roster: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate roster: {str(e)}")
+        logger.error(f"Error generating multi-station rosters: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate rosters: {str(e)}")
+
+def history_shifts(history, member_id):
+    """(start, hours) of each shift a member worked in the pre-period history"""
+    return [
+        (
+            shift_bounds(shift['date'], shift.get('start_time') or '06:00', shift.get('end_time') or '14:00')[0],
+            8 + (shift.get('overtime_hours') or 0)
+        )
+        for shift in history if shift['member_id'] == member_id
+    ]
+
+RANK_ORDER = {'Inspector': 1, 'Sergeant': 2, 'Senior Constable': 3, 'Constable': 4}
+SHIFT_CODES = {'early': 'E', 'late': 'L', 'night': 'N', 'van': 'V', 'watchhouse': 'W', 'corro': 'C'}
+ROSTER_VIEW_FORMATS = ("detailed", "columnar")
+COLUMNAR_MEMBER_FIELDS = (
+    "member_id", "name", "vp_number", "rank", "station", "seniority_years",
+    "ada_driver_authority", "ostt_qualification_date", "special_qualifications"
+)
+
+# Serialized roster views keyed by roster, version, status, format and member directory generation
+roster_view_cache = LRUCache(maxsize=int(CONFIG.get('ROSTER_CACHE_SIZE', 128)))
+# Coverage index per roster id, brought up to date by replaying version diffs
+roster_coverage_cache = LRUCache(maxsize=int(CONFIG.get('ROSTER_CACHE_SIZE', 128)))
+
+def roster_summary(assignments, total_members, total_hours):
+    return {
+        "van_shifts": len([a for a in assignments if a.shift_type == 'van']),
+        "watchhouse_shifts": len([a for a in assignments if a.shift_type == 'watchhouse']),
+        "corro_shifts": len([a for a in assignments if a.shift_type == 'corro']),
+        "night_shifts": len([a for a in assignments if a.shift_type == 'night']),
+        "total_members": total_members,
+        "total_hours": total_hours
+    }
+
+def build_roster_detailed(roster_period, assignments, member_dict, version):
+    """Nested per-member, per-day roster view with a 14-day spread"""
+    # Create 14-day spread
+    start_date = roster_period.start_date
+    end_date = min(start_date + timedelta(days=14), roster_period.end_date)
+    
+    # Generate date range for 14 days
+    date_range = []
+    current_date = start_date
+    while current_date <= end_date and len(date_range) < 14:
+        date_range.append(current_date)
+        current_date += timedelta(days=1)
+    
+    # Organize assignments by member and date
+    member_schedules = {}
+    for assignment in assignments:
+        member_id = assignment.member_id
+        assignment_date = assignment.date.date() if isinstance(assignment.date, datetime) else assignment.date
+        
+        if member_id not in member_schedules:
+            member_schedules[member_id] = {}
+        
+        if assignment_date not in member_schedules[member_id]:
+            member_schedules[member_id][assignment_date] = []
+        
+        member_schedules[member_id][assignment_date].append({
+            'shift_type': assignment.shift_type,
+            'start_time': assignment.start_time,
+            'end_time': assignment.end_time,
+            'hours': assignment.hours
+        })
+    
+    # Build member summary with 14-day spread
+    member_summaries = []
+    for member_id, member in member_dict.items():
+        # Build 14-day schedule
+        daily_schedule = []
+        for date in date_range:
+            day_key = date.date() if isinstance(date, datetime) else date
+            day_assignments = member_schedules.get(member_id, {}).get(day_key, [])
+            day_info = {
+                'date': date.isoformat(),
+                'day_name': date.strftime('%A'),
+                'assignments': day_assignments,
+                'total_hours': sum(shift.get('hours', 8.0) for shift in day_assignments),
+                'shift_count': len(day_assignments)
+            }
+            daily_schedule.append(day_info)
+        
+        # Calculate totals for this member
+        total_shifts = sum(day['shift_count'] for day in daily_schedule)
+        total_hours = sum(day['total_hours'] for day in daily_schedule)
+        
+        member_summary = {
+            'member_id': member_id,
+            'name': member.name,
+            'vp_number': member.vp_number,
+            'rank': member.rank,
+            'special_qualifications': member.special_qualifications,
+            'ostt_qualification_date': member.ostt_qualification_date.isoformat() if member.ostt_qualification_date else None,
+            'ada_driver_authority': member.ada_driver_authority,
+            'station': member.station,
+            'seniority_years': member.seniority_years,
+            'daily_schedule': daily_schedule,
+            'total_shifts': total_shifts,
+            'total_hours': total_hours
+        }
+        member_summaries.append(member_summary)
+    
+    # Sort members by rank hierarchy and name
+    member_summaries.sort(key=lambda x: (RANK_ORDER.get(x['rank'], 5), x['name']))
+    
+    # Create assignment details for backward compatibility
+    assignment_details = []
+    for assignment in assignments:
+        member = member_dict.get(assignment.member_id)
+        assignment_dict = model_to_dict(assignment)
+        if member:
+            assignment_dict['member_name'] = member.name
+            assignment_dict['member_rank'] = member.rank
+            assignment_dict['member_vp_number'] = member.vp_number
+        assignment_details.append(assignment_dict)
+    
+    return {
+        "roster_period": model_to_dict(roster_period),
+        "version": version,
+        "assignments": assignment_details,
+        "total_assignments": len(assignments),
+        "member_summaries": member_summaries,
+        "date_range": [date.isoformat() for date in date_range],
+        "summary": roster_summary(assignments, len(member_summaries), sum(ms['total_hours'] for ms in member_summaries))
+    }
+
+def build_roster_columnar(roster_period, assignments, member_dict, version):
+    """Compact roster view: member table, date axis and member x day grid of shift codes.
+
+    Grid cells hold SHIFT_CODES letters ('' for no shift, joined with '/'
+    when a member has several). Assignments whose times or hours differ
+    from the shift type's defaults are listed in time_exceptions.
+    """
+    start_date = roster_period.start_date.date() if isinstance(roster_period.start_date, datetime) else roster_period.start_date
+    end_date = roster_period.end_date.date() if isinstance(roster_period.end_date, datetime) else roster_period.end_date
+    dates = [start_date + timedelta(days=offset) for offset in range(max((end_date - start_date).days, 1))]
+    day_index = {day: i for i, day in enumerate(dates)}
+    
+    member_ids = sorted(
+        set(member_dict) | {assignment.member_id for assignment in assignments},
+        key=lambda member_id: (
+            RANK_ORDER.get(getattr(member_dict.get(member_id), 'rank', None), 5),
+            getattr(member_dict.get(member_id), 'name', None) or ''
+        )
+    )
+    member_index = {member_id: i for i, member_id in enumerate(member_ids)}
+    
+    member_rows = []
+    for member_id in member_ids:
+        member = member_dict.get(member_id)
+        if member is None:
+            member_rows.append([member_id] + [None] * (len(COLUMNAR_MEMBER_FIELDS) - 1))
+            continue
+        member_rows.append([
+            member_id, member.name, member.vp_number, member.rank, member.station, member.seniority_years,
+            member.ada_driver_authority,
+            member.ostt_qualification_date.isoformat() if member.ostt_qualification_date else None,
+            member.special_qualifications
+        ])
+    
+    grid = [[''] * len(dates) for _ in member_ids]
+    member_hours = [0.0] * len(member_ids)
+    time_exceptions = []
+    for assignment in assignments:
+        assignment_date = assignment.date.date() if isinstance(assignment.date, datetime) else assignment.date
+        d = day_index.get(assignment_date)
+        if d is None:
+            continue
+        i = member_index[assignment.member_id]
+        code = SHIFT_CODES.get(assignment.shift_type, assignment.shift_type)
+        grid[i][d] = f"{grid[i][d]}/{code}" if grid[i][d] else code
+        hours = assignment.hours if assignment.hours is not None else 8.0
+        member_hours[i] += hours
+        if (assignment.start_time, assignment.end_time) != SHIFT_TIMES.get(assignment.shift_type) or hours != 8.0:
+            time_exceptions.append([i, d, assignment.shift_type, assignment.start_time, assignment.end_time, hours])
+    
+    return {
+        "format": "columnar",
+        "roster_period": model_to_dict(roster_period),
+        "version": version,
+        "members": {"fields": list(COLUMNAR_MEMBER_FIELDS), "rows": member_rows},
+        "dates": [day.isoformat() for day in dates],
+        "shift_codes": {code: shift_type for shift_type, code in SHIFT_CODES.items()},
+        "grid": grid,
+        "member_hours": member_hours,
+        "time_exceptions": {
+            "fields": ["member", "day", "shift_type", "start_time", "end_time", "hours"],
+            "rows": time_exceptions
+        },
+        "total_assignments": len(assignments),
+        "summary": roster_summary(assignments, len(member_ids), sum(member_hours))
+    }
 
 @api_router.get("/roster/{roster_id}")
-async def get_roster_details(roster_id: str, session=Depends(get_db)):
-    """Get detailed roster information with 14-day member spread"""
+async def get_roster_details(
+    roster_id: str,
+    request: Request,
+    response_format: str = Query("detailed", alias="format"),
+    session=Depends(get_db)
+):
+    """Get roster information, built once per roster version and served with an ETag.
+
+    format=detailed (default) returns per-member 14-day schedules;
+    format=columnar returns a member table, date axis and shift code grid.
+    """
+    if response_format not in ROSTER_VIEW_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(ROSTER_VIEW_FORMATS)}")
     try:
         # Get roster period
         roster_result = await session.execute(select(RosterPeriod).where(RosterPeriod.id == roster_id))
@@ -1058,126 +2012,31 @@ async def get_roster_details(roster_id: str, session=Depends(get_db)):
         if not roster_period:
             raise HTTPException(status_code=404, detail="Roster not found")
         
-        # Get assignments
-        assignments_result = await session.execute(
-            select(ShiftAssignment).where(ShiftAssignment.roster_period_id == roster_id)
-        )
-        assignments = assignments_result.scalars().all()
-        
-        # Get all unique member IDs
-        member_ids = list(set(assignment.member_id for assignment in assignments))
+        version = await latest_version_number(session, roster_id)
+        directory = await loaded_member_directory()
+        # Views embed member names and ranks, so member edits must change the key
+        cache_key = (roster_id, version, roster_period.status, response_format, directory.generation)
+        etag = '"' + hashlib.sha1(repr(cache_key).encode()).hexdigest()[:20] + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
         
-        # Get comprehensive member details
-        members_result = await session.execute(
-            select(Member).where(Member.id.in_(member_ids))
-        )
-        members = members_result.scalars().all()
-        member_dict = {member.id: member for member in members}
-        
-        # Create 14-day spread
-        start_date = roster_period.start_date
-        end_date = min(start_date + timedelta(days=14), roster_period.end_date)
-        
-        # Generate date range for 14 days
-        date_range = []
-        current_date = start_date
-        while current_date <= end_date and len(date_range) < 14:
-            date_range.append(current_date)
-            current_date += timedelta(days=1)
-        
-        # Organize assignments by member and date
-        member_schedules = {}
-        for assignment in assignments:
-            member_id = assignment.member_id
-            assignment_date = assignment.date.date() if isinstance(assignment.date, datetime) else assignment.date
-            
-            if member_id not in member_schedules:
-                member_schedules[member_id] = {}
-            
-            if assignment_date not in member_schedules[member_id]:
-                member_schedules[member_id][assignment_date] = []
-            
-            member_schedules[member_id][assignment_date].append({
-                'shift_type': assignment.shift_type,
-                'start_time': assignment.start_time,
-                'end_time': assignment.end_time,
-                'hours': assignment.hours
-            })
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
         
-        # Build member summary with 14-day spread
-        member_summaries = []
-        for member_id, member in member_dict.items():
-            # Parse special qualifications
-            special_qualifications = []
-            if member.special_qualifications:
-                try:
-                    special_qualifications = json.loads(member.special_qualifications)
-                except:
-                    special_qualifications = [member.special_qualifications] if member.special_qualifications else []
-            
-            # Build 14-day schedule
-            daily_schedule = []
-            for date in date_range:
-                day_assignments = member_schedules.get(member_id, {}).get(date, [])
-                day_info = {
-                    'date': date.isoformat(),
-                    'day_name': date.strftime('%A'),
-                    'assignments': day_assignments,
-                    'total_hours': sum(shift.get('hours', 8.0) for shift in day_assignments),
-                    'shift_count': len(day_assignments)
-                }
-                daily_schedule.append(day_info)
+        body = roster_view_cache.get(cache_key)
+        if body is None:
+            assignments_result = await session.execute(
+                select(ShiftAssignment).where(ShiftAssignment.roster_period_id == roster_id)
+            )
+            assignments = assignments_result.scalars().all()
             
-            # Calculate totals for this member
-            total_shifts = sum(day['shift_count'] for day in daily_schedule)
-            total_hours = sum(day['total_hours'] for day in daily_schedule)
+            member_ids = set(assignment.member_id for assignment in assignments)
+            member_dict = directory.get_many(member_ids)
             
-            member_summary = {
-                'member_id': member_id,
-                'name': member.name,
-                'vp_number': member.vp_number,
-                'rank': member.rank,
-                'special_qualifications': special_qualifications,
-                'ostt_qualification_date': member.ostt_qualification_date.isoformat() if member.ostt_qualification_date else None,
-                'ada_driver_authority': member.ada_driver_authority,
-                'station': member.station,
-                'seniority_years': member.seniority_years,
-                'daily_schedule': daily_schedule,
-                'total_shifts': total_shifts,
-                'total_hours': total_hours
-            }
-            member_summaries.append(member_summary)
+            build = build_roster_columnar if response_format == "columnar" else build_roster_detailed
+            body = json.dumps(build(roster_period, assignments, member_dict, version), default=str).encode()
+            roster_view_cache.put(cache_key, body)
         
-        # Sort members by rank hierarchy and name
-        rank_order = {'Inspector': 1, 'Sergeant': 2, 'Senior Constable': 3, 'Constable': 4}
-        member_summaries.sort(key=lambda x: (rank_order.get(x['rank'], 5), x['name']))
-        
-        # Create assignment details for backward compatibility
-        assignment_details = []
-        for assignment in assignments:
-            member = member_dict.get(assignment.member_id)
-            assignment_dict = model_to_dict(assignment)
-            if member:
-                assignment_dict['member_name'] = member.name
-                assignment_dict['member_rank'] = member.rank
-                assignment_dict['member_vp_number'] = member.vp_number
-            assignment_details.append(assignment_dict)
-        
-        return {
-            "roster_period": model_to_dict(roster_period),
-            "assignments": assignment_details,
-            "total_assignments": len(assignments),
-            "member_summaries": member_summaries,
-            "date_range": [date.isoformat() for date in date_range],
-            "summary": {
-                "van_shifts": len([a for a in assignments if a.shift_type == 'van']),
-                "watchhouse_shifts": len([a for a in assignments if a.shift_type == 'watchhouse']),
-                "corro_shifts": len([a for a in assignments if a.shift_type == 'corro']),
-                "night_shifts": len([a for a in assignments if a.shift_type == 'night']),
-                "total_members": len(member_summaries),
-                "total_hours": sum(ms['total_hours'] for ms in member_summaries)
-            }
-        }
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except HTTPException:
         raise
@@ -1185,6 +2044,285 @@ async def get_roster_details(roster_id: str, session=Depends(get_db)):
         logger.error(f"Error fetching roster details: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch roster details")
 
+@api_router.patch("/roster/{roster_id}/assignments")
+async def edit_roster_assignments(roster_id: str, edit: RosterEdit, session=Depends(get_db)):
+    """Add, remove and change assignments of a draft roster as one new version"""
+    roster_result = await session.execute(select(RosterPeriod).where(RosterPeriod.id == roster_id))
+    roster_period = roster_result.scalar_one_or_none()
+    if not roster_period:
+        raise HTTPException(status_code=404, detail="Roster not found")
+    if roster_period.status != 'draft':
+        raise HTTPException(status_code=400, detail="Only draft rosters can be edited")
+    
+    try:
+        # Rosters created before versioning get their current state as a baseline
+        await record_version(session, roster_id, created_by='system')
+        
+        edited_ids = set(edit.removed) | {change.id for change in edit.changed}
+        existing = {}
+        if edited_ids:
+            existing_result = await session.execute(
+                select(ShiftAssignment).where(
+                    and_(ShiftAssignment.roster_period_id == roster_id, ShiftAssignment.id.in_(edited_ids))
+                )
+            )
+            existing = {assignment.id: assignment for assignment in existing_result.scalars().all()}
+        missing = edited_ids - set(existing)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Assignments not found: {sorted(missing)}")
+        
+        for assignment_id in edit.removed:
+            await session.delete(existing[assignment_id])
+        
+        for change in edit.changed:
+            assignment = existing[change.id]
+            for field, value in change.dict(exclude={'id'}, exclude_none=True).items():
+                setattr(assignment, field, value.value if isinstance(value, Enum) else value)
+            assignment.assigned_by = edit.edited_by
+            assignment.assignment_reason = 'manual_edit'
+        
+        for new_assignment in edit.added:
+            session.add(ShiftAssignment(
+                id=str(uuid.uuid4()),
+                roster_period_id=roster_id,
+                member_id=new_assignment.member_id,
+                date=new_assignment.date,
+                shift_type=new_assignment.shift_type.value,
+                start_time=new_assignment.start_time,
+                end_time=new_assignment.end_time,
+                hours=new_assignment.hours,
+                is_overtime=new_assignment.is_overtime,
+                assigned_by=edit.edited_by,
+                assignment_reason='manual_edit'
+            ))
+        
+        await session.flush()
+        version = await record_version(session, roster_id, created_by=edit.edited_by)
+        await session.commit()
+        
+        return {"message": "Roster updated", "roster_id": roster_id, "version": version}
+    
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error editing roster: {e}")
+        raise HTTPException(status_code=500, detail="Failed to edit roster")
+
+@api_router.get("/roster/{roster_id}/versions")
+async def get_roster_versions(roster_id: str, session=Depends(get_db)):
+    """List the versions of a roster without their contents"""
+    result = await session.execute(
+        select(
+            RosterVersion.version, RosterVersion.created_by, RosterVersion.created_at,
+            RosterVersion.added_count, RosterVersion.removed_count, RosterVersion.changed_count
+        ).where(RosterVersion.roster_period_id == roster_id).order_by(RosterVersion.version)
+    )
+    return [
+        {
+            "version": row.version,
+            "created_by": row.created_by,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "added": row.added_count,
+            "removed": row.removed_count,
+            "changed": row.changed_count
+        }
+        for row in result.all()
+    ]
+
+@api_router.get("/roster/{roster_id}/versions/{version}")
+async def get_roster_version(roster_id: str, version: int, session=Depends(get_db)):
+    """Get the full set of assignments as of a roster version"""
+    version, snapshot = await load_version(session, roster_id, version)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Roster version not found")
+    
+    return {
+        "roster_id": roster_id,
+        "version": version,
+        "assignments": expand_snapshot(snapshot)
+    }
+
+@api_router.get("/roster/{roster_id}/changes")
+async def get_roster_changes(
+    roster_id: str,
+    since: int = 0,
+    to_version: Optional[int] = None,
+    session=Depends(get_db)
+):
+    """Get the diff between two roster versions, by default from `since` to the latest.
+
+    Rows are lists in `fields` order; `since=0` returns everything as added.
+    """
+    to_version, target = await load_version(session, roster_id, to_version)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Roster version not found")
+    
+    base = {}
+    if since:
+        since, base = await load_version(session, roster_id, since)
+        if base is None:
+            raise HTTPException(status_code=404, detail="Roster version not found")
+    
+    return {
+        "roster_id": roster_id,
+        "from_version": since,
+        "to_version": to_version,
+        "fields": list(ASSIGNMENT_FIELDS),
+        **diff_snapshots(base, target)
+    }
+
+async def validate_roster(session, roster_period, rules=None):
+    """Run the EBA rules over a roster's assignments plus the members' worked shifts.
+
+    `rules` defaults to the rules the roster was generated with. Returns
+    structured violations with member names; empty when compliant.
+    """
+    if rules is None and roster_period.rules_json:
+        rules = json.loads(roster_period.rules_json)
+    assignments_result = await session.execute(
+        select(
+            ShiftAssignment.member_id, ShiftAssignment.date, ShiftAssignment.shift_type,
+            ShiftAssignment.start_time, ShiftAssignment.end_time, ShiftAssignment.hours
+        ).where(ShiftAssignment.roster_period_id == roster_period.id)
+    )
+    assignments = assignments_result.all()
+    member_ids = list({assignment.member_id for assignment in assignments})
+    if not member_ids:
+        return []
+    
+    # History far enough back to cover a fortnight window or a run of nights
+    history_start = roster_period.start_date - timedelta(days=FORTNIGHT_DAYS)
+    history_result = await session.execute(
+        select(
+            Shift.member_id, Shift.date, Shift.shift_type, Shift.start_time, Shift.end_time, Shift.overtime_hours
+        ).where(
+            and_(
+                Shift.member_id.in_(member_ids),
+                Shift.date >= history_start,
+                Shift.date < roster_period.end_date + timedelta(days=1)
+            )
+        )
+    )
+    
+    records = []
+    for shift in history_result.all():
+        start, end = shift_bounds(shift.date, shift.start_time or '06:00', shift.end_time or '14:00')
+        records.append((shift.member_id, start, end, 8 + (shift.overtime_hours or 0), shift.shift_type, False))
+    for assignment in assignments:
+        start, end = shift_bounds(assignment.date, assignment.start_time, assignment.end_time)
+        records.append((
+            assignment.member_id, start, end,
+            assignment.hours if assignment.hours is not None else 8.0, assignment.shift_type, True
+        ))
+    
+    violations = validate_shift_table(ShiftTable(records), rules)
+    
+    members = (await loaded_member_directory()).get_many(member_ids)
+    for violation in violations:
+        member = members.get(violation["member_id"])
+        violation["member_name"] = member.name if member else "Unknown"
+    return violations
+
+@api_router.get("/roster/{roster_id}/validation")
+async def get_roster_validation(roster_id: str, session=Depends(get_db)):
+    """Check a roster against the full EBA rule set without publishing it"""
+    roster_result = await session.execute(select(RosterPeriod).where(RosterPeriod.id == roster_id))
+    roster_period = roster_result.scalar_one_or_none()
+    if not roster_period:
+        raise HTTPException(status_code=404, detail="Roster not found")
+    
+    violations = await validate_roster(session, roster_period)
+    return {
+        "roster_id": roster_id,
+        "compliant": not violations,
+        "violations": violations
+    }
+
+async def roster_coverage(session, roster_period):
+    """Coverage index for a roster as of its latest version"""
+    version = await latest_version_number(session, roster_period.id)
+    index = roster_coverage_cache.get(roster_period.id)
+    
+    if index is None or index.version > version:
+        if version:
+            version, snapshot = await load_version(session, roster_period.id, version)
+        else:
+            # Rosters created before versioning have no snapshot yet
+            assignments_result = await session.execute(
+                select(ShiftAssignment).where(ShiftAssignment.roster_period_id == roster_period.id)
+            )
+            snapshot = snapshot_assignments(assignments_result.scalars().all())
+        total_days = (roster_period.end_date - roster_period.start_date).days
+        index = CoverageIndex.from_snapshot(roster_period.start_date, total_days, SHIFT_TIMES, snapshot, version)
+    elif index.version < version:
+        versions_result = await session.execute(
+            select(RosterVersion.version, RosterVersion.diff_json).where(
+                and_(
+                    RosterVersion.roster_period_id == roster_period.id,
+                    RosterVersion.version > index.version,
+                    RosterVersion.version <= version
+                )
+            ).order_by(RosterVersion.version)
+        )
+        for number, diff_json in versions_result.all():
+            index.apply_diff(json.loads(diff_json), number)
+    
+    roster_coverage_cache.put(roster_period.id, index)
+    return index
+
+ASSIGNMENT_EXPORT_FIELDS = (
+    'id', 'member_id', 'vp_number', 'member_name', 'date', 'shift_type', 'start_time',
+    'end_time', 'hours', 'is_overtime', 'assignment_reason',
+)
+
+@api_router.get("/roster/{roster_id}/export")
+async def export_roster(
+    roster_id: str,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    session=Depends(get_db)
+):
+    """Stream a roster's assignments with member details as CSV or NDJSON"""
+    roster_result = await session.execute(select(RosterPeriod.station).where(RosterPeriod.id == roster_id))
+    station = roster_result.scalar_one_or_none()
+    if station is None:
+        raise HTTPException(status_code=404, detail="Roster not found")
+    
+    columns = (
+        ShiftAssignment.id, ShiftAssignment.member_id, Member.vp_number, Member.name.label('member_name'),
+        ShiftAssignment.date, ShiftAssignment.shift_type, ShiftAssignment.start_time, ShiftAssignment.end_time,
+        ShiftAssignment.hours, ShiftAssignment.is_overtime, ShiftAssignment.assignment_reason
+    )
+    conditions = [ShiftAssignment.roster_period_id == roster_id, Member.id == ShiftAssignment.member_id]
+    batches = keyset_batches(columns, conditions, ShiftAssignment.date, ShiftAssignment.id)
+    return export_response(batches, ASSIGNMENT_EXPORT_FIELDS, export_format, f"roster-{station}-{roster_id[:8]}")
+
+@api_router.get("/roster/{roster_id}/coverage")
+async def get_roster_coverage(
+    roster_id: str,
+    min_van_coverage: int = 2,
+    min_watchhouse_coverage: int = 1,
+    session=Depends(get_db)
+):
+    """List the days and shift types staffed below the minimum coverage"""
+    roster_result = await session.execute(select(RosterPeriod).where(RosterPeriod.id == roster_id))
+    roster_period = roster_result.scalar_one_or_none()
+    if not roster_period:
+        raise HTTPException(status_code=404, detail="Roster not found")
+    
+    index = await roster_coverage(session, roster_period)
+    requirements = {'van': min_van_coverage, 'watchhouse': min_watchhouse_coverage}
+    understaffed = index.understaffed(requirements)
+    return {
+        "roster_id": roster_id,
+        "version": index.version,
+        "requirements": requirements,
+        "fully_covered": not understaffed,
+        "understaffed": understaffed,
+        "counts": index.summary()
+    }
+
 @api_router.put("/roster/{roster_id}/publish")
 async def publish_roster(roster_id: str, session=Depends(get_db)):
     """Publish a draft roster"""
@@ -1198,45 +2336,35 @@ async def publish_roster(roster_id: str, session=Depends(get_db)):
         if roster_period.status == 'published':
             raise HTTPException(status_code=400, detail="Roster is already published")
         
-        # Check for EBA compliance violations before publishing
-        assignments_result = await session.execute(
-            select(ShiftAssignment).where(ShiftAssignment.roster_period_id == roster_id)
-        )
-        assignments = assignments_result.scalars().all()
-        
-        # Simple compliance check - ensure no member has more than 5 consecutive shifts
-        member_consecutive_days = {}
-        for assignment in sorted(assignments, key=lambda x: x.date):
-            member_id = assignment.member_id
-            if member_id not in member_consecutive_days:
-                member_consecutive_days[member_id] = []
-            member_consecutive_days[member_id].append(assignment.date)
-        
-        # Check for violations
-        violations = []
-        for member_id, dates in member_consecutive_days.items():
-            consecutive_count = 1
-            for i in range(1, len(dates)):
-                if (dates[i] - dates[i-1]).days == 1:
-                    consecutive_count += 1
-                    if consecutive_count > 5:
-                        member_result = await session.execute(select(Member).where(Member.id == member_id))
-                        member = member_result.scalar_one_or_none()
-                        violations.append(f"{member.name if member else 'Unknown'} has {consecutive_count} consecutive shifts")
-                else:
-                    consecutive_count = 1
+        # Check the full EBA rule set against history and the roster together
+        violations = await validate_roster(session, roster_period)
         
         if violations:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Cannot publish roster due to EBA violations: {', '.join(violations[:3])}"
+                detail={
+                    "message": "Cannot publish roster due to EBA violations: "
+                               + ', '.join(f"{v['member_name']}: {v['message']}" for v in violations[:3]),
+                    "violations": violations
+                }
             )
         
         # Update status to published
         roster_period.status = 'published'
         roster_period.published_at = datetime.utcnow()
+        session.add(RosterPublication(
+            id=str(uuid.uuid4()),
+            station=roster_period.station,
+            roster_period_start=roster_period.start_date,
+            roster_period_end=roster_period.end_date,
+            publication_date=roster_period.published_at,
+            published_by=roster_period.created_by,
+            days_in_advance=(roster_period.start_date - roster_period.published_at).days,
+            compliance_status='compliant'
+        ))
         
         await session.commit()
+        publication_scheduler.cancel(roster_id)
         
         return {
             "message": "Roster published successfully",
@@ -1251,6 +2379,367 @@ async def publish_roster(roster_id: str, session=Depends(get_db)):
         logger.error(f"Error publishing roster: {e}")
         raise HTTPException(status_code=500, detail="Failed to publish roster")
 
+@api_router.get("/publication-alerts")
+async def get_publication_alerts(
+    station: Optional[Station] = None,
+    include_acknowledged: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """List roster publication deadline alerts, newest first"""
+    async with AsyncSessionLocal() as session:
+        query = select(PublicationAlert)
+        if station:
+            query = query.where(PublicationAlert.station == station.value)
+        if not include_acknowledged:
+            query = query.where(PublicationAlert.acknowledged == False)
+        
+        result = await session.execute(query.order_by(PublicationAlert.created_at.desc()))
+        return [model_to_dict(alert) for alert in result.scalars().all()]
+
+# Leave Management Endpoints
+
+class LeaveType(str, Enum):
+    ANNUAL_LEAVE = "annual_leave"
+    REST_DAY = "rest_day"
+    SICK_LEAVE = "sick_leave"
+
+class LeaveRequestCreate(BaseModel):
+    member_id: str
+    request_type: LeaveType
+    start_date: datetime
+    end_date: datetime
+    is_urgent: bool = False
+    reason: Optional[str] = None
+
+async def leave_conflicts(session, member_id, start_date, end_date, exclude_id=None):
+    """Leave, roster assignments and worked shifts overlapping a leave period"""
+    first_day = datetime.combine(start_date.date(), datetime.min.time())
+    after_last_day = datetime.combine(end_date.date(), datetime.min.time()) + timedelta(days=1)
+    
+    overlapping_leave = [
+        leave_id for leave_id in leave_index.member_overlaps(member_id, start_date, end_date)
+        if leave_id != exclude_id
+    ]
+    assignments_result = await session.execute(
+        select(ShiftAssignment.id, ShiftAssignment.roster_period_id, ShiftAssignment.date, ShiftAssignment.shift_type)
+        .where(
+            and_(
+                ShiftAssignment.member_id == member_id,
+                ShiftAssignment.date >= first_day,
+                ShiftAssignment.date < after_last_day
+            )
+        ).order_by(ShiftAssignment.date)
+    )
+    shifts_result = await session.execute(
+        select(Shift.id, Shift.date, Shift.shift_type)
+        .where(and_(Shift.member_id == member_id, Shift.date >= first_day, Shift.date < after_last_day))
+        .order_by(Shift.date)
+    )
+    return {
+        "leave": overlapping_leave,
+        "assignments": [
+            {
+                "id": row.id,
+                "roster_period_id": row.roster_period_id,
+                "date": row.date.date().isoformat(),
+                "shift_type": row.shift_type
+            }
+            for row in assignments_result.all()
+        ],
+        "shifts": [
+            {"id": row.id, "date": row.date.date().isoformat(), "shift_type": row.shift_type}
+            for row in shifts_result.all()
+        ]
+    }
+
+@api_router.post("/leave")
+async def submit_leave_request(
+    leave_data: LeaveRequestCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Submit a leave request; overlapping pending or approved leave is rejected"""
+    if leave_data.end_date < leave_data.start_date:
+        raise HTTPException(status_code=400, detail="Leave must end on or after its start date")
+    
+    member = (await loaded_member_directory()).get(leave_data.member_id)
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+    
+    async with AsyncSessionLocal() as session:
+        conflicts = await leave_conflicts(session, member.id, leave_data.start_date, leave_data.end_date)
+        if conflicts["leave"]:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Leave overlaps an existing request", "conflicts": conflicts}
+            )
+        
+        leave_request = LeaveRequest(
+            id=str(uuid.uuid4()),
+            member_id=member.id,
+            request_type=leave_data.request_type.value,
+            start_date=leave_data.start_date,
+            end_date=leave_data.end_date,
+            is_urgent=leave_data.is_urgent,
+            reason=leave_data.reason,
+            status='pending'
+        )
+        session.add(leave_request)
+        await session.commit()
+        leave_index.add(
+            leave_request.id, member.id, member.station,
+            leave_request.start_date, leave_request.end_date, leave_request.status
+        )
+        audit_writer.record(
+            current_user["id"], "leave_submitted", "leave_request", leave_request.id,
+            {"member_id": leave_request.member_id}
+        )
+        
+        return {**model_to_dict(leave_request), "conflicts": conflicts}
+
+@api_router.get("/leave")
+async def get_leave_requests(
+    member_id: Optional[str] = None,
+    status: Optional[str] = None,
+    station: Optional[Station] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """List leave requests, optionally by member, status or station"""
+    async with AsyncSessionLocal() as session:
+        query = select(LeaveRequest)
+        if member_id:
+            query = query.where(LeaveRequest.member_id == member_id)
+        if status:
+            query = query.where(LeaveRequest.status == status)
+        if station:
+            query = query.join(Member, Member.id == LeaveRequest.member_id).where(Member.station == station.value)
+        
+        result = await session.execute(query.order_by(LeaveRequest.start_date))
+        return [model_to_dict(leave_request) for leave_request in result.scalars().all()]
+
+@api_router.get("/leave/on-leave")
+async def get_members_on_leave(
+    station: Station,
+    date: datetime,
+    current_user: dict = Depends(get_current_user)
+):
+    """Members of a station with approved leave on a day"""
+    return {
+        "station": station.value,
+        "date": date.date().isoformat(),
+        "member_ids": sorted(leave_index.on_leave(station.value, date))
+    }
+
+async def decide_leave_request(leave_id, status, current_user, force=False):
+    if current_user["role"] not in ["sergeant", "inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(LeaveRequest, Member.station)
+            .join(Member, Member.id == LeaveRequest.member_id)
+            .where(LeaveRequest.id == leave_id)
+        )
+        row = result.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Leave request not found")
+        leave_request, station = row
+        
+        conflicts = await leave_conflicts(
+            session, leave_request.member_id, leave_request.start_date, leave_request.end_date,
+            exclude_id=leave_request.id
+        )
+        if status == 'approved' and not force and (conflicts["leave"] or conflicts["assignments"]):
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Leave conflicts with rostered shifts or other leave", "conflicts": conflicts}
+            )
+        
+        leave_request.status = status
+        leave_request.approved_by = current_user["vp_number"]
+        await session.commit()
+        leave_index.add(
+            leave_request.id, leave_request.member_id, station,
+            leave_request.start_date, leave_request.end_date, leave_request.status
+        )
+        audit_writer.record(
+            current_user["id"], f"leave_{status}", "leave_request", leave_id,
+            {"member_id": leave_request.member_id, "force": force}
+        )
+        
+        return {**model_to_dict(leave_request), "conflicts": conflicts}
+
+@api_router.put("/leave/{leave_id}/approve")
+async def approve_leave_request(
+    leave_id: str,
+    force: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Approve a leave request; conflicting assignments block it unless `force` is set"""
+    return await decide_leave_request(leave_id, 'approved', current_user, force)
+
+@api_router.put("/leave/{leave_id}/deny")
+async def deny_leave_request(leave_id: str, current_user: dict = Depends(get_current_user)):
+    """Deny a leave request"""
+    return await decide_leave_request(leave_id, 'denied', current_user)
+
+# Audit log
+AUDIT_EXPORT_FIELDS = ('id', 'timestamp', 'user_id', 'action', 'target_type', 'target_id', 'changes_json')
+
+class AuditLogResponse(BaseModel):
+    id: str
+    user_id: Optional[str] = None
+    action: str
+    target_type: Optional[str] = None
+    target_id: Optional[str] = None
+    changes: Optional[Any] = None
+    timestamp: datetime
+
+def audit_conditions(user_id, target_type, target_id, action, start, end):
+    conditions = []
+    if user_id:
+        conditions.append(AuditLog.user_id == user_id)
+    if target_type:
+        conditions.append(AuditLog.target_type == target_type)
+    if target_id:
+        conditions.append(AuditLog.target_id == target_id)
+    if action:
+        conditions.append(AuditLog.action == action)
+    if start:
+        conditions.append(AuditLog.timestamp >= start)
+    if end:
+        conditions.append(AuditLog.timestamp <= end)
+    return conditions
+
+def audit_response(entry):
+    changes = None
+    if entry.changes_json:
+        try:
+            changes = json.loads(entry.changes_json)
+        except (TypeError, ValueError):
+            changes = entry.changes_json
+    return AuditLogResponse(
+        id=entry.id, user_id=entry.user_id, action=entry.action, target_type=entry.target_type,
+        target_id=entry.target_id, changes=changes, timestamp=entry.timestamp
+    )
+
+@api_router.get("/audit", response_model=List[AuditLogResponse])
+async def get_audit_log(
+    response: Response,
+    user_id: Optional[str] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """List audit entries by (timestamp, id), a page at a time.
+
+    The next page's cursor is returned in the X-Next-Cursor header.
+    Archived entries are included when `start` reaches back to them.
+    """
+    if current_user["role"] not in ["sergeant", "inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    # Include entries still queued in the audit writer
+    await audit_writer.flush()
+    query = select(AuditLog)
+    conditions = audit_conditions(user_id, target_type, target_id, action, start, end)
+    if conditions:
+        query = query.where(and_(*conditions))
+    try:
+        rows, next_cursor = await keyset_page(
+            query, AuditLog.timestamp, AuditLog.id, limit, cursor,
+            lambda row: (row[0].timestamp, row[0].id), datetime,
+            lambda: history_session(start, end)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [audit_response(row[0]) for row in rows]
+
+@api_router.get("/audit/export")
+async def export_audit_log(
+    user_id: Optional[str] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream audit entries as CSV or NDJSON, ordered by timestamp, including archived ones from `start`"""
+    if current_user["role"] not in ["sergeant", "inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    await audit_writer.flush()
+    columns = tuple(getattr(AuditLog, field) for field in AUDIT_EXPORT_FIELDS)
+    conditions = audit_conditions(user_id, target_type, target_id, action, start, end)
+    try:
+        quarters_for_range(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    batches = keyset_batches(
+        columns, conditions, AuditLog.timestamp, AuditLog.id,
+        session_factory=lambda: history_session(start, end)
+    )
+    return export_response(batches, AUDIT_EXPORT_FIELDS, export_format, "audit_log")
+
+@api_router.post("/admin/archive")
+async def archive_old_rows(
+    days: int = Query(ARCHIVE_AFTER_DAYS, ge=120),
+    current_user: dict = Depends(get_current_user)
+):
+    """Move shifts and audit entries older than `days` into the per-quarter archive.
+
+    The minimum keeps every 12 week analytics window in the live database.
+    """
+    if current_user["role"] not in ["inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    await audit_writer.flush()
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    try:
+        moved = await asyncio.to_thread(archive_rows, cutoff)
+    except Exception as e:
+        logger.error(f"Error archiving rows: {e}")
+        raise HTTPException(status_code=500, detail="Failed to archive rows")
+    
+    return {
+        "cutoff": cutoff.isoformat(),
+        "archived": [
+            {"quarter": f"{year}q{number}", "table": table, "rows": count}
+            for ((year, number), table), count in sorted(moved.items())
+        ]
+    }
+
+@api_router.post("/admin/backups")
+async def create_backup(current_user: dict = Depends(get_current_user)):
+    """Take an online snapshot of the database now"""
+    if current_user["role"] not in ["inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    try:
+        return await backup_service.backup()
+    except BackupInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error writing backup: {e}")
+        raise HTTPException(status_code=500, detail="Failed to write backup")
+
+@api_router.get("/admin/backups")
+async def get_backups(current_user: dict = Depends(get_current_user)):
+    """Retained snapshots, newest first"""
+    if current_user["role"] not in ["inspector", "admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    return {"running": backup_service.running, "backups": list_backups()}
+
 # Add router to app
 app.include_router(api_router)
 
@@ -1259,6 +2748,44 @@ app.include_router(api_router)
 async def startup_event():
     await init_database()
     logger.info("Database initialized")
+    await warm_member_directory()
+    await warm_fairness_ledger()
+    await warm_leave_index()
+    await publication_scheduler.load()
+    publication_scheduler.start()
+    audit_writer.start()
+    backup_service.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await publication_scheduler.stop()
+    await audit_writer.stop()
+    await backup_service.stop()
+
+async def warm_fairness_ledger():
+    """Load the rolling fairness window for every station"""
+    members = [(member.id, member.station) for member in (await loaded_member_directory()).members()]
+    async with AsyncSessionLocal() as session:
+        shifts_result = await session.execute(
+            select(Shift.member_id, Shift.shift_type, Shift.date, Shift.overtime_hours)
+            .where(Shift.date >= fairness_ledger.window_start())
+        )
+        fairness_ledger.load(members, [row._asdict() for row in shifts_result.all()])
+    logger.info("Fairness ledger loaded")
+
+async def warm_leave_index():
+    """Index every pending and approved leave request"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(
+                LeaveRequest.id, LeaveRequest.member_id, Member.station,
+                LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status
+            )
+            .join(Member, Member.id == LeaveRequest.member_id)
+            .where(LeaveRequest.status != 'denied')
+        )
+        leave_index.load(result.all())
+    logger.info("Leave index loaded")
 
 # Root endpoint
 @app.get("/")
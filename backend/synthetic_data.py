@@ -0,0 +1,338 @@
+"""
+Synthetic dataset generator for WATCHTOWER
+
+Builds a reproducible, realistically sized dataset: stations of members
+with ranks, qualifications and preferences, rotation templates, years of
+worked shifts following each member's rotation, with leave, overtime and
+recalls. The same seed and end date always produce the same rows, so
+benchmarks and load tests can be compared run to run. Random draws come
+from NumPy generators seeded per member, and rows are written with
+executemany in large transactions.
+
+The first two stations are geelong and corio; any more are named
+station_03, station_04 and so on. Only geelong and corio are served by
+the station-typed endpoints, so /init-sample-data refuses more than two. The demo users from the configuration
+are created first so the usual logins work. Every generated member also
+gets a login with SYNTHETIC_PASSWORD.
+
+Usage:
+    python synthetic_data.py --members 2000 --years 2
+    python synthetic_data.py --seed 7 --stations 6 --members 10000 --end-date 2025-07-01
+"""
+from datetime import datetime, date, timedelta
+import argparse
+import hashlib
+import json
+import random
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from database import CONFIG, DATABASE_PATH, Shift
+from bulk_import import ensure_schema, SQLITE_DATETIME
+from roster_engine import SHIFT_TIMES, OFF_DUTY
+
+SYNTHETIC_PASSWORD = "password123"
+BASE_STATIONS = ("geelong", "corio")
+RANKS = ("Constable", "Senior Constable", "Sergeant", "Inspector")
+RANK_WEIGHTS = (0.62, 0.24, 0.11, 0.03)
+ROLE_BY_RANK = {
+    "Constable": "general_duties", "Senior Constable": "general_duties",
+    "Sergeant": "sergeant", "Inspector": "inspector",
+}
+QUALIFICATIONS = (
+    'Traffic Operations', 'Community Policing', 'Criminal Investigation',
+    'Emergency Response', 'Court Security', 'Firearms Training',
+)
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+# Rotation templates per station; night-intolerant members only get those without nights
+ROTATIONS = {
+    "Day rotation": ['early', 'early', 'early', 'late', 'late', OFF_DUTY, OFF_DUTY],
+    "Three-shift rotation": [
+        'early', 'early', 'late', 'late', 'night', 'night', OFF_DUTY, OFF_DUTY, OFF_DUTY, OFF_DUTY
+    ],
+    "Van and watchhouse": ['van', 'van', 'watchhouse', 'watchhouse', 'corro', OFF_DUTY, OFF_DUTY],
+}
+FIRST_NAMES = (
+    'Sarah', 'John', 'Mike', 'Emma', 'Liam', 'Olivia', 'Noah', 'Ava', 'Jack', 'Mia', 'James', 'Chloe',
+    'Lucas', 'Grace', 'Ethan', 'Zoe', 'Oscar', 'Ruby', 'Henry', 'Isla', 'Thomas', 'Amelia', 'Leo', 'Harper',
+)
+LAST_NAMES = (
+    'Smith', 'Jones', 'Williams', 'Brown', 'Wilson', 'Taylor', 'Johnson', 'White', 'Martin', 'Anderson',
+    'Thompson', 'Nguyen', 'Thomas', 'Walker', 'Harris', 'Lee', 'Ryan', 'Robinson', 'Kelly', 'King',
+)
+# Version and variant bits of a version 4 UUID
+UUID_CLEAR = ~((0xf000 << 64) | (0xc000 << 48))
+UUID_VERSION_4 = (4 << 76) | (0x8000 << 48)
+SWAP_RATE = 0.05
+OVERTIME_RATE = 0.12
+RECALL_RATE = 0.03
+ANNUAL_LEAVE_BLOCKS_PER_YEAR = 2
+SICK_DAYS_PER_YEAR = 4
+
+
+def station_names(count):
+    return [BASE_STATIONS[i] if i < len(BASE_STATIONS) else f"station_{i + 1:02d}" for i in range(count)]
+
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def demo_users():
+    """Demo users from the configuration, as in /init-sample-data"""
+    users = []
+    for i in range(1, 4):
+        parts = CONFIG.get(f'DEMO_USER_{i}', '').split(':')
+        if len(parts) >= 8:
+            users.append({
+                'vp_number': parts[0], 'password': parts[1], 'name': parts[2], 'email': parts[3],
+                'role': parts[4], 'station': parts[5], 'rank': parts[6], 'seniority_years': int(parts[7]),
+            })
+    return users
+
+
+class SyntheticDataset:
+    """Generates and writes one dataset; every draw derives from `seed`"""
+
+    def __init__(self, connection, seed=1, stations=2, members=200, years=1.0, end_date=None,
+                 progress=sys.stderr):
+        self.connection = connection
+        self.seed = seed
+        self.stations = station_names(stations)
+        self.member_count = members
+        self.end_date = end_date or date.today()
+        self.total_days = int(round(365 * years))
+        self.start_date = self.end_date - timedelta(days=self.total_days)
+        self.progress = progress
+        self.ids = random.Random(seed)
+        self.day_strings = [
+            datetime.combine(self.start_date + timedelta(days=day), datetime.min.time()).strftime(SQLITE_DATETIME)
+            for day in range(self.total_days + 1)
+        ]
+        self.counts = {}
+
+    def new_id(self):
+        """A version 4 UUID string drawn from the seeded generator, as uuid.UUID(int=..., version=4)"""
+        bits = self.ids.getrandbits(128) & UUID_CLEAR | UUID_VERSION_4
+        text = '%032x' % bits
+        return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+    def write(self, table, columns, rows):
+        if not rows:
+            return
+        self.connection.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+        )
+        self.counts[table] = self.counts.get(table, 0) + len(rows)
+
+    def templates(self):
+        """Rotation template ids by (station, name)"""
+        now = datetime.combine(self.start_date, datetime.min.time()).strftime(SQLITE_DATETIME)
+        template_ids = {}
+        rows = []
+        for station in self.stations:
+            for name, pattern in ROTATIONS.items():
+                template_id = self.new_id()
+                template_ids[(station, name)] = template_id
+                rows.append((template_id, f"{station} {name}", station, json.dumps(pattern), 'synthetic', now))
+        self.write('rotation_templates', ('id', 'name', 'station', 'pattern_json', 'created_by', 'created_at'), rows)
+        return template_ids
+
+    def people(self):
+        """(vp_number, name, email, role, station, rank, seniority, password) per member"""
+        rng = np.random.default_rng([self.seed, 0])
+        people = []
+        for user in demo_users():
+            if user['station'] in self.stations:
+                people.append((
+                    user['vp_number'], user['name'], user['email'], user['role'], user['station'],
+                    user['rank'], user['seniority_years'], user['password']
+                ))
+        taken = {person[0] for person in people}
+        ranks = rng.choice(len(RANKS), size=self.member_count, p=RANK_WEIGHTS)
+        station_index = rng.integers(0, len(self.stations), size=self.member_count)
+        first = rng.integers(0, len(FIRST_NAMES), size=self.member_count)
+        last = rng.integers(0, len(LAST_NAMES), size=self.member_count)
+        number = 20000
+        for i in range(self.member_count - len(people)):
+            while f"VP{number}" in taken:
+                number += 1
+            vp_number = f"VP{number}"
+            number += 1
+            rank = RANKS[ranks[i]]
+            name = f"{FIRST_NAMES[first[i]]} {LAST_NAMES[last[i]]}"
+            seniority = int(rng.integers(0, 6) + 3 * ranks[i] + rng.integers(0, 4))
+            email = f"{name.lower().replace(' ', '.')}.{vp_number.lower()}@vicpol.gov.au"
+            people.append((
+                vp_number, name, email, ROLE_BY_RANK[rank], self.stations[station_index[i]],
+                rank, seniority, SYNTHETIC_PASSWORD
+            ))
+        return people
+
+    def generate(self):
+        started = time.monotonic()
+        template_ids = self.templates()
+        password_hashes = {}
+        users, members, assignments, shifts, leave = [], [], [], [], []
+        day_offsets = np.arange(self.total_days)
+        weekdays = (self.start_date.weekday() + day_offsets) % 7
+        shift_types = list(SHIFT_TIMES)
+
+        for index, (vp_number, name, email, role, station, rank, seniority, password) in enumerate(self.people()):
+            rng = np.random.default_rng([self.seed, 1, index])
+            member_id = self.new_id()
+            if password not in password_hashes:
+                password_hashes[password] = hash_password(password)
+            created = self.day_strings[0]
+            users.append((self.new_id(), vp_number, name, email, role, station, password_hashes[password], created))
+
+            qualifications = [f"{station.title()} Operations"]
+            if rank in ('Sergeant', 'Inspector'):
+                qualifications += ['Leadership', 'Advanced Training']
+            qualifications += [QUALIFICATIONS[q] for q in rng.choice(len(QUALIFICATIONS), rng.integers(1, 4), replace=False)]
+            night_tolerance = int(rng.choice([0, 1, 2, 3, 4], p=[0.1, 0.15, 0.4, 0.2, 0.15]))
+            rest_days = [WEEKDAYS[d] for d in sorted(rng.choice(7, rng.integers(0, 3), replace=False))]
+            preferences = {
+                "night_shift_tolerance": night_tolerance, "recall_willingness": bool(rng.random() < 0.8),
+                "avoid_consecutive_doubles": True, "avoid_four_earlies": bool(rng.random() < 0.7),
+                "medical_limitations": None, "welfare_notes": None,
+                "preferred_rest_days": rest_days, "emergency_contact": None,
+            }
+            ostt_date = datetime.combine(self.end_date, datetime.min.time()) - timedelta(days=int(rng.integers(0, 800)))
+            members.append((
+                member_id, vp_number, name, email, station, rank, seniority, json.dumps(qualifications),
+                ostt_date.strftime(SQLITE_DATETIME), bool(rng.random() < 0.6), json.dumps(preferences),
+                True, created, created
+            ))
+
+            # Rotation
+            names = [n for n, pattern in ROTATIONS.items() if night_tolerance > 0 or 'night' not in pattern]
+            rotation = names[int(rng.integers(0, len(names)))]
+            pattern = ROTATIONS[rotation]
+            offset = int(rng.integers(0, len(pattern)))
+            assignments.append((
+                self.new_id(), template_ids[(station, rotation)], member_id, offset, self.day_strings[0], True, created
+            ))
+
+            # Leave: annual leave blocks and single sick days, all approved
+            on_leave = np.zeros(self.total_days, dtype=bool)
+            years = self.total_days / 365
+            for _ in range(int(rng.poisson(ANNUAL_LEAVE_BLOCKS_PER_YEAR * years))):
+                length = int(rng.integers(5, 15))
+                start = int(rng.integers(0, max(self.total_days - length, 1)))
+                on_leave[start:start + length] = True
+                leave.append(self._leave_row(member_id, 'annual_leave', start, start + length - 1))
+            for start in rng.integers(0, self.total_days, size=int(rng.poisson(SICK_DAYS_PER_YEAR * years))):
+                on_leave[start] = True
+                leave.append(self._leave_row(member_id, 'sick_leave', int(start), int(start)))
+
+            # Worked shifts follow the rotation, with occasional swaps
+            codes = np.array(pattern)[(offset + day_offsets) % len(pattern)]
+            worked = (codes != OFF_DUTY) & ~on_leave
+            swap = rng.random(self.total_days) < SWAP_RATE
+            swapped = np.array(shift_types)[rng.integers(0, len(shift_types), self.total_days)]
+            if night_tolerance == 0:
+                swapped = np.where(swapped == 'night', 'late', swapped)
+            codes = np.where(swap, swapped, codes)
+            recalled = rng.random(self.total_days) < RECALL_RATE
+            overtime = np.where(
+                (rng.random(self.total_days) < OVERTIME_RATE) | recalled,
+                np.minimum(np.round(rng.gamma(2.0, 1.0, self.total_days) * 4) / 4, 6.0) + 0.25,
+                0.0
+            )
+            for day in np.flatnonzero(worked):
+                shift_type = codes[day]
+                start_time, end_time = SHIFT_TIMES[shift_type]
+                shifts.append((
+                    self.new_id(), member_id, shift_type, self.day_strings[day], start_time, end_time,
+                    float(overtime[day]), bool(recalled[day]), None, self.day_strings[day]
+                ))
+
+            if len(shifts) >= 200000:
+                self._flush(users, members, assignments, shifts, leave)
+                users, members, assignments, shifts, leave = [], [], [], [], []
+                self.report(started)
+
+        self._flush(users, members, assignments, shifts, leave)
+        self.report(started, final=True)
+        return self.counts
+
+    def _leave_row(self, member_id, request_type, first_day, last_day):
+        return (
+            self.new_id(), member_id, request_type, self.day_strings[first_day], self.day_strings[last_day],
+            request_type == 'sick_leave', None, 'approved', 'synthetic', self.day_strings[max(first_day - 14, 0)]
+        )
+
+    def _flush(self, users, members, assignments, shifts, leave):
+        self.write('users', ('id', 'vp_number', 'name', 'email', 'role', 'station', 'password_hash', 'created_at'), users)
+        self.write('members', (
+            'id', 'vp_number', 'name', 'email', 'station', 'rank', 'seniority_years', 'special_qualifications',
+            'ostt_qualification_date', 'ada_driver_authority', 'preferences_json', 'active', 'created_at', 'updated_at'
+        ), members)
+        self.write('rotation_assignments', (
+            'id', 'template_id', 'member_id', 'offset', 'anchor_date', 'active', 'created_at'
+        ), assignments)
+        self.write('shifts', (
+            'id', 'member_id', 'shift_type', 'date', 'start_time', 'end_time', 'overtime_hours',
+            'was_recalled', 'notes', 'created_at'
+        ), shifts)
+        self.write('leave_requests', (
+            'id', 'member_id', 'request_type', 'start_date', 'end_date', 'is_urgent', 'reason', 'status',
+            'approved_by', 'created_at'
+        ), leave)
+        self.connection.commit()
+
+    def report(self, started, final=False):
+        elapsed = time.monotonic() - started
+        prefix = "Done:" if final else "..."
+        summary = ', '.join(f"{count:,} {table}" for table, count in self.counts.items())
+        print(f"{prefix} {summary} ({elapsed:.1f}s)", file=self.progress, flush=True)
+
+
+def generate_dataset(database_path=DATABASE_PATH, seed=1, stations=2, members=200, years=1.0,
+                     end_date=None, progress=sys.stderr):
+    """Write a synthetic dataset into an empty database; returns rows written per table.
+
+    The shift indexes are dropped for the load and rebuilt afterwards,
+    which is much faster than maintaining them row by row.
+    """
+    ensure_schema(database_path)
+    connection = sqlite3.connect(database_path)
+    try:
+        if connection.execute("SELECT count(*) FROM users").fetchone()[0]:
+            raise ValueError("Database already has users; generate into an empty database")
+        for index in Shift.__table__.indexes:
+            connection.execute(f"DROP INDEX IF EXISTS {index.name}")
+        counts = SyntheticDataset(connection, seed, stations, members, years, end_date, progress).generate()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    ensure_schema(database_path)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic WATCHTOWER dataset")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--stations', type=int, default=2)
+    parser.add_argument('--members', type=int, default=200, help="Members across all stations")
+    parser.add_argument('--years', type=float, default=1.0, help="Years of shift history")
+    parser.add_argument('--end-date', type=date.fromisoformat, help="Last day of history (default today)")
+    parser.add_argument('--database', default=DATABASE_PATH)
+    args = parser.parse_args(argv)
+
+    try:
+        generate_dataset(args.database, args.seed, args.stations, args.members, args.years, args.end_date)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Shared fixtures for the WATCHTOWER backend tests
+
+The backend modules import each other by flat name, so backend/ goes on
+the path. Every run gets a throwaway database through WATCHTOWER_DB_PATH,
+set before anything imports database.py; archives and backups land next
+to it.
+"""
+from pathlib import Path
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+os.environ['WATCHTOWER_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='watchtower-tests-'), 'watchtower.db')
+
+DEMO_PASSWORD = "password123"
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The app with sample data, started and stopped once per test run"""
+    from fastapi.testclient import TestClient
+    import server
+
+    # No scheduled backups running under the tests
+    server.backup_service.interval_hours = 0
+    with TestClient(server.app) as client:
+        response = client.post("/api/init-sample-data")
+        assert response.status_code == 200, response.text
+        yield client
+
+
+def login(client, vp_number):
+    response = client.post("/api/auth/login", json={"vp_number": vp_number, "password": DEMO_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def inspector(client):
+    return login(client, "VP12345")
+
+
+@pytest.fixture(scope="session")
+def constable(client):
+    return login(client, "VP12347")
+
+
+@pytest.fixture(scope="session")
+def members(client, inspector):
+    """Sample members by VP number"""
+    response = client.get("/api/members", headers=inspector)
+    assert response.status_code == 200, response.text
+    return {member["vp_number"]: member for member in response.json()}
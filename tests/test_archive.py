@@ -0,0 +1,133 @@
+from datetime import datetime
+import json
+import os
+import sqlite3
+
+import pytest
+
+from archive import ARCHIVE_DIR, archive_rows, archived_quarters, quarter_path, quarters_for_range
+from bulk_import import ensure_schema
+
+# One worked shift per quarter, 2013q1 to 2015q4, older than anything else in the test database
+QUARTERS = [(year, number) for year in (2013, 2014, 2015) for number in (1, 2, 3, 4)]
+
+
+def quarter_day(quarter, day=10):
+    year, number = quarter
+    return datetime(year, 3 * (number - 1) + 1, day, 6)
+
+
+def rows(path, sql):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "live.db")
+    ensure_schema(path)
+    with sqlite3.connect(path) as connection:
+        connection.executemany(
+            "INSERT INTO shifts (id, member_id, shift_type, date, start_time, end_time) VALUES (?, 'm', 'van', ?, "
+            "'06:00', '14:00')",
+            [(f"s{i}", day.isoformat(sep=' ')) for i, day in enumerate(
+                [datetime(2025, 2, 1), datetime(2025, 3, 31, 23), datetime(2025, 4, 1), datetime(2025, 5, 20)]
+            )]
+        )
+        connection.execute("INSERT INTO audit_logs (id, action, timestamp) VALUES ('a0', 'login', '2025-01-05')")
+    connection.close()
+    return path
+
+
+def test_archive_moves_rows_before_the_cutoff(database, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+
+    moved = archive_rows(datetime(2025, 5, 1), database, archive_dir)
+
+    assert moved == {((2025, 1), "shifts"): 2, ((2025, 2), "shifts"): 1, ((2025, 1), "audit_logs"): 1}
+    assert archived_quarters(archive_dir) == [(2025, 1), (2025, 2)]
+    assert rows(database, "SELECT id FROM shifts") == [("s3",)]
+    assert rows(quarter_path((2025, 1), archive_dir), "SELECT id FROM shifts ORDER BY id") == [("s0",), ("s1",)]
+    assert rows(quarter_path((2025, 2), archive_dir), "SELECT id FROM shifts") == [("s2",)]
+
+    assert archive_rows(datetime(2025, 5, 1), database, archive_dir) == {}
+    assert quarters_for_range(datetime(2025, 3, 31), datetime(2025, 4, 2), archive_dir) == [(2025, 1), (2025, 2)]
+    assert quarters_for_range(datetime(2025, 4, 1), None, archive_dir) == [(2025, 2)]
+    assert quarters_for_range(None, None, archive_dir) == []
+
+
+def test_archive_picks_up_columns_added_later(database, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    archive_rows(datetime(2025, 3, 1), database, archive_dir)
+    with sqlite3.connect(database) as connection:
+        connection.execute("ALTER TABLE shifts ADD COLUMN station VARCHAR")
+        connection.execute("UPDATE shifts SET station = 'corio'")
+    connection.close()
+
+    archive_rows(datetime(2025, 4, 1), database, archive_dir)
+
+    assert rows(quarter_path((2025, 1), archive_dir), "SELECT id, station FROM shifts ORDER BY id") == [
+        ("s0", None), ("s1", "corio")
+    ]
+
+
+@pytest.fixture(scope="module")
+def archived_shifts(client, inspector, members):
+    member_id = members["VP12346"]["id"]
+    response = client.post("/api/shifts/batch", headers=inspector, json={"shifts": [
+        {"member_id": member_id, "shift_type": "van", "date": quarter_day(quarter).isoformat(),
+         "start_time": "06:00", "end_time": "14:00"}
+        for quarter in QUARTERS
+    ]})
+    assert response.status_code == 200, response.text
+
+    moved = archive_rows(datetime(2016, 1, 1))
+
+    assert {quarter for quarter, table in moved} == set(QUARTERS)
+    assert all(os.path.exists(quarter_path(quarter, ARCHIVE_DIR)) for quarter in QUARTERS)
+    return member_id
+
+
+def shift_dates(client, headers, **params):
+    response = client.get("/api/shifts", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return [shift["date"][:10] for shift in response.json()]
+
+
+def test_reads_reaching_back_include_archived_rows(client, inspector, archived_shifts):
+    live = shift_dates(client, inspector, member_id=archived_shifts)
+    assert live and min(live) >= "2016"
+
+    dates = shift_dates(client, inspector, member_id=archived_shifts, start_date="2015-01-01")
+    assert dates[:4] == ["2015-01-10", "2015-04-10", "2015-07-10", "2015-10-10"]
+    assert dates[4:] == live
+
+    assert shift_dates(client, inspector, member_id=archived_shifts, start_date="2014-06-01",
+                       end_date="2015-01-01") == ["2014-07-10", "2014-10-10"]
+
+
+def test_archived_reads_page_and_export(client, inspector, archived_shifts):
+    params = {"member_id": archived_shifts, "start_date": "2015-01-01", "end_date": "2015-12-31"}
+    dates, cursor = [], None
+    while True:
+        response = client.get("/api/shifts", headers=inspector, params={**params, "limit": 3,
+                                                                         **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        dates += [shift["date"][:10] for shift in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert dates == ["2015-01-10", "2015-04-10", "2015-07-10", "2015-10-10"]
+
+    response = client.get("/api/shifts/export", headers=inspector, params={**params, "format": "ndjson"})
+    assert response.status_code == 200, response.text
+    assert [json.loads(line)["date"][:10] for line in response.text.splitlines()] == dates
+
+
+def test_too_many_archived_quarters_is_a_bad_request(client, inspector, archived_shifts):
+    response = client.get("/api/shifts", headers=inspector, params={"start_date": "2013-01-01"})
+    assert response.status_code == 400
+    assert "archived quarters" in response.json()["detail"]
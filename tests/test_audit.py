@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+
+from sqlalchemy import func, select
+
+from audit import AuditWriter
+from database import AsyncSessionLocal, AuditLog
+
+
+class GatedWriter(AuditWriter):
+    """Writer whose first batch stalls mid-write until released"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def write(self, rows):
+        if not self.started.is_set():
+            self.started.set()
+            await self.release.wait()
+        await super().write(rows)
+
+
+async def count_rows(target_type):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(func.count()).where(AuditLog.target_type == target_type))
+        return result.scalar()
+
+
+def record(writer, target_type, count):
+    for i in range(count):
+        writer.record("tester", "test", target_type, str(i))
+
+
+def test_flush_writes_everything_queued(client):
+    async def scenario():
+        target_type = f"flush-{uuid.uuid4()}"
+        writer = AuditWriter(batch_size=7)
+        record(writer, target_type, 30)
+        await writer.flush()
+        assert writer.pending == []
+        return await count_rows(target_type)
+
+    assert asyncio.run(scenario()) == 30
+
+
+def test_flush_waits_for_a_batch_in_flight(client):
+    async def scenario():
+        target_type = f"in-flight-{uuid.uuid4()}"
+        writer = GatedWriter(flush_seconds=0.01)
+        writer.start()
+        record(writer, target_type, 20)
+        # The background task has taken the batch and is still writing it
+        await asyncio.wait_for(writer.started.wait(), 5)
+        assert writer.pending == []
+        record(writer, target_type, 5)
+
+        flush = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0.05)
+        assert not flush.done()
+
+        writer.release.set()
+        await asyncio.wait_for(flush, 5)
+        written = await count_rows(target_type)
+        await writer.stop()
+        return written
+
+    assert asyncio.run(scenario()) == 25
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import server
+from backup import BACKUP_DIR, backup_database, list_backups, prune_backups
+
+
+def count(path, table):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "live.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+        connection.executemany("INSERT INTO notes (body) VALUES (?)", [("x" * 500,)] * 400)
+    connection.close()
+    return path
+
+
+def touch_backups(backup_dir, *stamps):
+    os.makedirs(backup_dir, exist_ok=True)
+    for stamp in stamps:
+        with open(os.path.join(backup_dir, f"watchtower-{stamp}.db"), "w") as f:
+            f.write("snapshot")
+
+
+def test_backup_is_a_complete_single_file_copy(database, tmp_path):
+    backup_dir = str(tmp_path / "backups")
+
+    result = backup_database(database, backup_dir, step_pages=8, step_sleep=0)
+
+    path = os.path.join(backup_dir, result["file"])
+    assert os.listdir(backup_dir) == [result["file"]]
+    assert result["bytes"] == os.path.getsize(path) and result["restarts"] == 0
+    assert count(path, "notes") == 400
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert connection.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    connection.close()
+
+
+def test_backup_finishes_in_one_step_after_repeated_restarts(database, tmp_path):
+    backup_dir = str(tmp_path / "backups")
+    writing, stop = threading.Event(), threading.Event()
+    # Enough pages that the writer lands commits while the copy is under way
+    with sqlite3.connect(database) as connection:
+        connection.executemany("INSERT INTO notes (body) VALUES (?)", [("x" * 500,)] * 5000)
+    connection.close()
+
+    def write():
+        connection = sqlite3.connect(database)
+        while not stop.is_set():
+            connection.execute("INSERT INTO notes (body) VALUES ('y')")
+            connection.commit()
+            writing.set()
+        connection.close()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    writing.wait()
+    try:
+        result = backup_database(database, backup_dir, step_pages=1, step_sleep=0, max_restarts=2)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert result["restarts"] == 2
+    assert count(os.path.join(backup_dir, result["file"]), "notes") >= 5400
+
+
+def test_prune_keeps_the_newest(tmp_path):
+    backup_dir = str(tmp_path / "backups")
+    touch_backups(backup_dir, "20260101T000000", "20260301T000000", "20260201T000000")
+    with open(os.path.join(backup_dir, "notes.txt"), "w") as f:
+        f.write("not a snapshot")
+
+    assert [b["created_at"] for b in list_backups(backup_dir)] == [
+        "2026-03-01T00:00:00", "2026-02-01T00:00:00", "2026-01-01T00:00:00"
+    ]
+    assert prune_backups(2, backup_dir) == ["watchtower-20260101T000000.db"]
+    assert prune_backups(2, backup_dir) == []
+    assert sorted(os.listdir(backup_dir)) == [
+        "notes.txt", "watchtower-20260201T000000.db", "watchtower-20260301T000000.db"
+    ]
+    assert list_backups(str(tmp_path / "missing")) == []
+
+
+def test_backup_endpoint_prunes_to_the_retention(client, inspector, constable, monkeypatch):
+    assert client.post("/api/admin/backups", headers=constable).status_code == 403
+    touch_backups(BACKUP_DIR, "20200101T000000", "20200102T000000")
+    monkeypatch.setattr(server.backup_service, "retain", 2)
+
+    response = client.post("/api/admin/backups", headers=inspector)
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert "watchtower-20200101T000000.db" in result["pruned"]
+    listed = client.get("/api/admin/backups", headers=inspector).json()
+    assert listed["running"] is False
+    assert [b["file"] for b in listed["backups"]][0] == result["file"]
+    assert len(listed["backups"]) == 2
+    assert count(os.path.join(BACKUP_DIR, result["file"]), "members") == len(client.get(
+        "/api/members", headers=inspector).json())
@@ -0,0 +1,107 @@
+import gzip
+import io
+import json
+import sqlite3
+
+import pytest
+
+from bulk_import import normalise_time, parse_datetimes, run_import
+
+MEMBERS_CSV = """vp_number,name,station,rank,ada_driver_authority,special_qualifications
+vp100,Ada Driver,Geelong,Constable,yes,tactical;first_aid
+VP101,Bo Night,corio,Sergeant,no,
+"""
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "import.db")
+    members = tmp_path / "members.csv"
+    members.write_text(MEMBERS_CSV)
+    importer = run_import("members", str(members), database_path=path, progress=io.StringIO())
+    assert (importer.inserted, importer.rejected) == (2, 0)
+    return path
+
+
+def query(path, sql):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(sql).fetchall()
+
+
+def write_shifts(tmp_path, records):
+    path = tmp_path / "shifts.ndjson.gz"
+    with gzip.open(path, "wt") as f:
+        f.writelines(json.dumps(record) + "\n" for record in records)
+    return str(path)
+
+
+def test_members_are_normalised(database):
+    rows = query(database, "SELECT vp_number, station, ada_driver_authority, special_qualifications "
+                           "FROM members ORDER BY vp_number")
+    assert rows == [
+        ("VP100", "geelong", 1, '["tactical", "first_aid"]'),
+        ("VP101", "corio", 0, "[]"),
+    ]
+
+
+def test_reimporting_a_member_keeps_their_id_and_preferences(database, tmp_path):
+    [(member_id,)] = query(database, "SELECT id FROM members WHERE vp_number = 'VP101'")
+    with sqlite3.connect(database) as connection:
+        connection.execute("UPDATE members SET preferences_json = '{\"night_shift_tolerance\": 5}'")
+    update = tmp_path / "update.csv"
+    update.write_text("vp_number,name,station\nVP101,Bo Day,geelong\n")
+
+    run_import("members", str(update), database_path=database, progress=io.StringIO())
+
+    assert query(database, "SELECT id, name, station, preferences_json FROM members WHERE vp_number = 'VP101'") == [
+        (member_id, "Bo Day", "geelong", '{"night_shift_tolerance": 5}')
+    ]
+
+
+def test_shifts_reject_unknown_members_and_bad_values(database, tmp_path):
+    [(member_id,)] = query(database, "SELECT id FROM members WHERE vp_number = 'VP101'")
+    good = {"shift_type": "Van", "start_time": "600", "end_time": "14:00:00"}
+    records = [
+        {**good, "vp_number": "vp100", "date": "2026-03-02"},
+        {**good, "vp_number": "VP999", "date": "2026-03-03"},
+        {**good, "member_id": "no-such-id", "date": "2026-03-03"},
+        {**good, "member_id": member_id, "date": "2026-02-30"},
+        {**good, "member_id": member_id, "date": ""},
+        {**good, "member_id": member_id, "date": "2026-03-04", "end_time": "24:00"},
+        {**good, "member_id": member_id, "date": "2026-03-04", "shift_type": "lunch"},
+        {**good, "member_id": member_id, "date": "2026-03-05T22:00", "overtime_hours": "1.5"},
+    ]
+    progress = io.StringIO()
+
+    importer = run_import("shifts", write_shifts(tmp_path, records), database_path=database,
+                          chunk_size=3, progress=progress)
+
+    assert (importer.inserted, importer.rejected) == (2, 6)
+    assert importer.errors == [
+        "record 2: unknown member",
+        "record 3: unknown member",
+        "record 4: invalid date '2026-02-30'",
+        "record 5: invalid date ''",
+        "record 6: times must be HH:MM",
+        "record 7: unknown shift type 'lunch'",
+    ]
+    assert "2 imported, 6 rejected" in progress.getvalue()
+    rows = query(database, "SELECT m.vp_number, s.shift_type, s.date, s.start_time, s.end_time, s.overtime_hours "
+                           "FROM shifts s JOIN members m ON m.id = s.member_id ORDER BY s.date")
+    assert rows == [
+        ("VP100", "van", "2026-03-02 00:00:00.000000", "06:00", "14:00", 0.0),
+        ("VP101", "van", "2026-03-05 22:00:00.000000", "06:00", "14:00", 1.5),
+    ]
+
+
+def test_parse_datetimes_isolates_bad_values():
+    strings, valid = parse_datetimes(["2026-03-02", "tomorrow", None, "2026-03-02 06:30"])
+    assert valid.tolist() == [True, False, False, True]
+    assert strings[3] == "2026-03-02 06:30:00.000000"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("6:00", "06:00"), ("0600", "06:00"), ("22:00:00", "22:00"), ("24:00", None), ("6pm", None), (None, None),
+])
+def test_normalise_time(value, expected):
+    assert normalise_time(value) == expected
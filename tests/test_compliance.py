@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+import random
+
+import numpy as np
+import pytest
+
+from compliance import (
+    FORTNIGHT_HOURS, MEMBER_STRIDE, ShiftTable, candidate_fortnight_hours, fortnight_totals, validate
+)
+
+EPOCH = datetime(2026, 3, 2)
+
+
+def shift(member_id, day, hour, hours=8.0, shift_type="early", from_roster=True):
+    start = EPOCH + timedelta(days=day, hours=hour)
+    return (member_id, start, start + timedelta(hours=hours), hours, shift_type, from_roster)
+
+
+def rules_of(violations):
+    return [(v["member_id"], v["rule"]) for v in violations]
+
+
+def brute_force_totals(member, start, hours):
+    return np.array([
+        sum(
+            h for m, s, h in zip(member, start, hours)
+            if m == member[i] and start[i] <= s < start[i] + FORTNIGHT_HOURS
+        )
+        for i in range(len(start))
+    ])
+
+
+def test_empty_table():
+    assert validate(ShiftTable([])) == []
+
+
+def test_compliant_roster():
+    records = [shift("a", day, 6) for day in (0, 1, 2, 3, 4, 7, 8, 9)]
+    assert validate(ShiftTable(records)) == []
+
+
+def test_short_break():
+    records = [shift("a", 0, 6, shift_type="early"), shift("a", 0, 20, shift_type="night")]
+    violations = validate(ShiftTable(records))
+    assert rules_of(violations) == [("a", "min_break")]
+    assert violations[0]["break_hours"] == 6.0
+
+
+def test_history_only_breaches_are_not_reported():
+    records = [shift("a", 0, 6, from_roster=False), shift("a", 0, 20, from_roster=False)]
+    records += [shift("a", day, 6, from_roster=False) for day in range(1, 8)]
+    records.append(shift("b", 0, 6))
+    assert validate(ShiftTable(records)) == []
+
+
+def test_fortnight_window_spanning_fifteen_calendar_days():
+    """A 22:00 start on day 0 keeps a 14:00 shift on day 14 inside its window"""
+    records = [shift("a", 0, 22, shift_type="night", from_roster=False)]
+    records += [shift("a", day, 6, from_roster=False) for day in (2, 3, 4, 7, 8, 9, 10, 11)]
+    records.append(shift("a", 14, 14))
+
+    violations = validate(ShiftTable(records), rules={"max_consecutive_days": 14})
+
+    assert rules_of(violations) == [("a", "fortnight_hours")]
+    assert violations[0]["hours"] == 80.0
+    assert violations[0]["date"] == "2026-03-02"
+
+
+def test_night_recovery():
+    records = [shift("a", day, 22, hours=10, shift_type="night") for day in range(7)]
+    records.append(shift("a", 7, 20, shift_type="late"))
+
+    violations = validate(ShiftTable(records), rules={"max_consecutive_days": 14, "max_fortnight_hours": 200})
+
+    assert rules_of(violations) == [("a", "night_recovery")]
+    assert violations[0]["consecutive_nights"] == 7
+
+
+def test_consecutive_days():
+    records = [shift("a", day, 6) for day in range(7)]
+    violations = validate(ShiftTable(records))
+    assert rules_of(violations) == [("a", "consecutive_days")]
+    assert violations[0]["consecutive_days"] == 7
+    assert violations[0]["date"] == "2026-03-07"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fortnight_totals_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    member = np.sort(rng.integers(0, 4, 60))
+    start = np.concatenate([np.sort(rng.uniform(0, 800, (member == m).sum())) for m in range(4)])
+    hours = rng.choice([8.0, 10.0, 12.0], len(start))
+
+    totals, _ = fortnight_totals(member * MEMBER_STRIDE + start, hours)
+
+    np.testing.assert_allclose(totals, brute_force_totals(member, start, hours))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_candidate_hours_match_validator(seed):
+    """The solver's check flags exactly the candidates the validator would reject"""
+    rng = random.Random(seed)
+    records = [
+        shift(f"m{m}", day, rng.choice((6, 14, 22)), from_roster=False)
+        for m in range(6) for day in range(-14, 0) if rng.random() < 0.6
+    ]
+    table = ShiftTable(records, epoch=EPOCH)
+    size = len(table.member_ids)
+    candidate = shift("x", 0, 14)
+
+    worst = candidate_fortnight_hours(table.member, table.start, table.hours, size, 14.0, 8.0)
+
+    for member_index, member_id in enumerate(table.member_ids):
+        with_candidate = ShiftTable(records + [(member_id,) + candidate[1:]], epoch=EPOCH)
+        limit = {"max_fortnight_hours": worst[member_index] - 0.5}
+        breaches = [v for v in validate(with_candidate, rules=limit) if v["rule"] == "fortnight_hours"]
+        assert breaches and breaches[0]["hours"] == worst[member_index]
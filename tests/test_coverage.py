@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+import random
+
+import numpy as np
+import pytest
+
+from coverage import CoverageIndex
+from roster_engine import SHIFT_TIMES
+from roster_versions import diff_snapshots
+
+START = date(2026, 3, 2)
+DAYS = 14
+
+
+def row(member_id, day, shift_type):
+    start, end = SHIFT_TIMES[shift_type]
+    return [member_id, (START + timedelta(days=day)).isoformat(), shift_type, start, end, 8.0, False, None]
+
+
+def build(snapshot, version=0):
+    return CoverageIndex.from_snapshot(START, DAYS, SHIFT_TIMES, snapshot, version)
+
+
+def assert_same(index, expected):
+    np.testing.assert_array_equal(index.counts, expected.counts)
+    assert {m: bits for m, bits in index.occupancy.items() if bits} == \
+        {m: bits for m, bits in expected.occupancy.items() if bits}
+
+
+def test_apply_diff_moves_an_assignment():
+    index = build({"a1": row("a", 0, "van"), "b1": row("b", 0, "van")}, version=1)
+
+    index.apply_diff({"added": {"a2": row("a", 3, "watchhouse")}, "removed": ["b1"],
+                      "changed": {"a1": row("a", 1, "van")}}, 2)
+
+    assert index.version == 2
+    assert index.count(START, "van") == 0
+    assert index.count(START + timedelta(days=1), "van") == 1
+    assert index.count(START + timedelta(days=3), "watchhouse") == 1
+    assert not index.is_occupied("a", START)
+    assert index.is_occupied("a", START + timedelta(days=1))
+    assert not index.is_occupied("b", START)
+
+
+def test_apply_diff_keeps_a_member_occupied_while_one_shift_remains():
+    index = build({"a1": row("a", 2, "early"), "a2": row("a", 2, "late")})
+
+    index.apply_diff({"removed": ["a1"]})
+
+    assert index.is_occupied("a", START + timedelta(days=2))
+    assert index.count(START + timedelta(days=2), "early") == 0
+    assert index.version == 0
+
+
+def test_apply_diff_ignores_rows_outside_the_period():
+    index = build({})
+    index.apply_diff({"added": {"x": row("a", DAYS, "van"), "y": row("a", -1, "van")}})
+    index.apply_diff({"removed": ["x", "y", "missing"]})
+    assert not index.counts.any()
+    assert not any(index.occupancy.values())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_replayed_diffs_match_a_rebuild(seed):
+    rng = random.Random(seed)
+    members = [f"m{i}" for i in range(6)]
+
+    def snapshot(size):
+        return {
+            f"s{rng.randrange(60)}": row(rng.choice(members), rng.randrange(DAYS), rng.choice(list(SHIFT_TIMES)))
+            for _ in range(size)
+        }
+
+    current = snapshot(30)
+    index = build(current, version=1)
+    for version in range(2, 8):
+        following = snapshot(30)
+        index.apply_diff(diff_snapshots(current, following), version)
+        current = following
+        assert_same(index, build(current))
+
+    assert index.version == 7
+    required = {"van": 2, "watchhouse": 1}
+    assert index.understaffed(required) == build(current).understaffed(required)
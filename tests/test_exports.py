@@ -0,0 +1,87 @@
+import asyncio
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, Shift
+from exports import encode_rows, keyset_batches
+from server import SHIFT_EXPORT_FIELDS
+
+RANGE = {"start_date": "2025-01-01T00:00:00", "end_date": "2026-12-31T00:00:00"}
+
+
+def export(client, headers, export_format, **params):
+    response = client.get("/api/shifts/export", headers=headers, params={**RANGE, **params, "format": export_format})
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_exports_match_the_shift_list(client, inspector, members):
+    member_id = members["VP12346"]["id"]
+    listed = client.get("/api/shifts", headers=inspector, params={**RANGE, "member_id": member_id}).json()
+    assert listed
+
+    response = export(client, inspector, "csv", member_id=member_id)
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="shifts.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    response = export(client, inspector, "ndjson", member_id=member_id)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [row["id"] for row in rows] == [record["id"] for record in records] == [s["id"] for s in listed]
+    assert {row["vp_number"] for row in rows} == {record["vp_number"] for record in records} == {"VP12346"}
+    assert rows[0]["date"] == records[0]["date"]
+
+
+def test_station_filter(client, inspector):
+    records = [json.loads(line) for line in export(client, inspector, "ndjson", station="corio").text.splitlines()]
+    assert records and {record["station"] for record in records} == {"corio"}
+
+
+def test_empty_csv_export_has_a_header(client, inspector):
+    response = export(client, inspector, "csv", member_id="no-such-member")
+    assert response.text.splitlines() == [",".join(SHIFT_EXPORT_FIELDS)]
+
+
+def test_unknown_format_and_roster(client, inspector):
+    assert client.get("/api/shifts/export", headers=inspector, params={"format": "xml"}).status_code == 422
+    assert client.get("/api/roster/no-such-roster/export").status_code == 404
+
+
+def test_keyset_batches_resume_after_each_batch(client):
+    columns = (Shift.id, Shift.date, Shift.member_id)
+    conditions = [Shift.date >= "2026-01-01"]
+
+    async def scenario():
+        batches = [rows async for rows in keyset_batches(columns, conditions, Shift.date, Shift.id, batch_size=7)]
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(*columns).where(*conditions).order_by(Shift.date, Shift.id))
+            expected = result.all()
+        return batches, expected
+
+    batches, expected = asyncio.run(scenario())
+    assert len(expected) > 14
+    assert all(len(rows) == 7 for rows in batches[:-1]) and 0 < len(batches[-1]) <= 7
+    assert [row.id for rows in batches for row in rows] == [row.id for row in expected]
+
+
+def test_encode_rows_yields_one_chunk_per_batch():
+    class Row:
+        def __init__(self, **values):
+            self._mapping = values
+
+    async def batches():
+        yield [Row(id="a", n=1), Row(id="b", n=2)]
+        yield [Row(id="c", n=None)]
+
+    async def encode(export_format):
+        return [chunk.decode() async for chunk in encode_rows(batches(), ("id", "n"), export_format)]
+
+    assert asyncio.run(encode("csv")) == ["id,n\r\n", "a,1\r\nb,2\r\n", "c,\r\n"]
+    assert asyncio.run(encode("ndjson")) == [
+        '{"id": "a", "n": 1}\n{"id": "b", "n": 2}\n', '{"id": "c", "n": null}\n'
+    ]
@@ -0,0 +1,104 @@
+from datetime import date, datetime, timedelta
+import random
+
+import numpy as np
+import pytest
+
+from fairness import METRICS, FairnessLedger, StationLedger, gini, percentile_positions
+
+TODAY = date(2026, 3, 11)  # a Wednesday
+SATURDAY = date(2026, 3, 7)
+
+
+def column(values):
+    return np.array(values, dtype=float).reshape(-1, 1)
+
+
+def test_gini_hand_computed():
+    # Sorted 0, 0, 1, 3: sum |xi - xj| over all pairs is 20, so 20 / (2 * 4^2 * mean 1)
+    assert gini(column([3, 0, 1, 0])) == pytest.approx([0.625])
+    assert gini(column([2, 2, 2])) == pytest.approx([0.0])
+    assert gini(column([0, 0])) == pytest.approx([0.0])
+    assert gini(np.zeros((0, 2))).tolist() == [0.0, 0.0]
+
+
+def test_gini_matches_mean_absolute_difference():
+    values = np.random.default_rng(1).integers(0, 10, size=(25, 3)).astype(float)
+    differences = np.abs(values[:, None, :] - values[None, :, :]).sum(axis=(0, 1))
+    expected = differences / (2 * len(values) ** 2 * values.mean(axis=0))
+    np.testing.assert_allclose(gini(values), expected)
+
+
+def test_percentile_positions_hand_computed():
+    # Ties share the midpoint of the ranks they span
+    assert percentile_positions(column([3, 0, 1, 0])).ravel().tolist() == [87.5, 25.0, 62.5, 25.0]
+
+
+def test_station_ledger_counts():
+    ledger = StationLedger("geelong", today=TODAY, window_days=30)
+    ledger.record("m1", "corro", SATURDAY, overtime_hours=2.0)
+    ledger.record("m1", "night", datetime(2026, 3, 9, 22))
+    ledger.record("m2", "early", TODAY)
+    ledger.record("m2", "night", TODAY - timedelta(days=30))  # already outside the window
+    ledger.add_member("m3")
+
+    totals = dict(zip(ledger.member_ids, ledger.totals.tolist()))
+    assert totals == {"m1": [1, 1, 1, 2.0], "m2": [0, 0, 0, 0], "m3": [0, 0, 0, 0]}
+    assert ledger.positions(["m1", "unknown"])[:, METRICS.index("night_shifts")].tolist() == [
+        pytest.approx(500 / 6), 50.0
+    ]
+
+    ledger.record("m1", "night", datetime(2026, 3, 9, 22), sign=-1)
+    assert ledger.totals[0].tolist() == [1, 0, 1, 2.0]
+
+
+def test_station_ledger_window_moves():
+    ledger = StationLedger("geelong", today=TODAY, window_days=30)
+    ledger.record("m1", "corro", TODAY - timedelta(days=20))
+    ledger.record("m1", "night", TODAY + timedelta(days=5))
+    assert ledger.totals.tolist() == [[1, 0, 0, 0]]
+
+    ledger.advance(TODAY + timedelta(days=5))
+    assert ledger.totals.tolist() == [[1, 1, 0, 0]]
+    ledger.advance(TODAY + timedelta(days=10))
+    assert ledger.totals.tolist() == [[0, 1, 0, 0]]
+
+
+def test_record_many_matches_record():
+    rng = random.Random(3)
+    shifts = [
+        {
+            "member_id": f"m{rng.randrange(6)}",
+            "shift_type": rng.choice(("early", "late", "night", "corro")),
+            "date": datetime.combine(TODAY + timedelta(days=rng.randrange(-40, 5)), datetime.min.time()),
+            "overtime_hours": rng.choice((0, 0, 1.5)),
+        }
+        for _ in range(200)
+    ]
+    one_by_one = StationLedger("geelong", today=TODAY, window_days=30)
+    batched = StationLedger("geelong", today=TODAY, window_days=30)
+    for shift in shifts:
+        one_by_one.record(shift["member_id"], shift["shift_type"], shift["date"], shift["overtime_hours"])
+    batched.record_many(shifts)
+
+    for ledger in (one_by_one, batched):
+        ledger.advance(TODAY + timedelta(days=5))
+    order = [batched.index[member_id] for member_id in one_by_one.member_ids]
+    np.testing.assert_allclose(batched.totals[order], one_by_one.totals)
+    np.testing.assert_allclose(batched.gini(), one_by_one.gini())
+
+
+def test_fairness_ledger_by_station():
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    ledger = FairnessLedger()
+    ledger.load([("m1", "geelong"), ("m2", "geelong"), ("m3", "corio")], [
+        {"member_id": "m1", "shift_type": "corro", "date": today - timedelta(days=1)},
+        {"member_id": "m3", "shift_type": "night", "date": today - timedelta(days=2), "overtime_hours": 3},
+        {"member_id": "unknown", "shift_type": "night", "date": today},
+    ])
+
+    geelong = ledger.station("geelong").snapshot()
+    assert [member["member_id"] for member in geelong["members"]] == ["m1", "m2"]
+    assert geelong["members"][0]["totals"]["corro_shifts"] == 1
+    assert geelong["gini"]["corro_shifts"] == 0.5
+    assert ledger.station("corio").snapshot()["members"][0]["totals"]["overtime_hours"] == 3
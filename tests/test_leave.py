@@ -0,0 +1,149 @@
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+
+from leave import IntervalIndex, LeaveIndex
+
+
+def day(offset):
+    """A day well clear of the sample shifts and generated rosters"""
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time()) + timedelta(days=offset)
+
+
+def submit(client, headers, member, start, end, **extra):
+    return client.post("/api/leave", headers=headers, json={
+        "member_id": member["id"],
+        "request_type": "annual_leave",
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        **extra
+    })
+
+
+def audit_actions(client, headers, leave_id):
+    params = {"target_type": "leave_request", "target_id": leave_id}
+    response = client.get("/api/audit", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return [entry["action"] for entry in response.json()]
+
+
+def on_leave(client, headers, member, when):
+    response = client.get(
+        "/api/leave/on-leave", headers=headers, params={"station": member["station"], "date": when.isoformat()}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["member_ids"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_interval_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    base = date(2026, 1, 1).toordinal()
+    index = IntervalIndex()
+    intervals = {}
+    for _ in range(300):
+        key = rng.randrange(40)
+        if rng.random() < 0.3:
+            index.remove(key)
+            intervals.pop(key, None)
+        else:
+            start = base + rng.randrange(100)
+            end = start + rng.choice((0, 1, 3, 10, 60))
+            index.add(key, date.fromordinal(start), date.fromordinal(end))
+            intervals[key] = (start, end)
+        assert len(index) == len(intervals)
+
+        query_start = base + rng.randrange(-10, 110)
+        query_end = query_start + rng.randrange(5)
+        expected = {key for key, (start, end) in intervals.items() if start <= query_end and end >= query_start}
+        assert set(index.overlapping(date.fromordinal(query_start), date.fromordinal(query_end))) == expected
+
+
+def test_leave_index_statuses():
+    index = LeaveIndex()
+    index.load([
+        ("a", "m1", "geelong", "2026-03-02", "2026-03-04", "approved"),
+        ("b", "m1", "geelong", "2026-03-10", "2026-03-12", "pending"),
+        ("c", "m2", "geelong", "2026-03-03", "2026-03-03", "denied"),
+    ])
+
+    assert index.member_overlaps("m1", "2026-03-01", "2026-03-31") == ["a", "b"]
+    assert index.on_leave("geelong", "2026-03-03") == {"m1"}
+    assert index.on_leave("geelong", "2026-03-10") == set()
+    assert index.periods(["m1", "m2"], "2026-03-01", "2026-03-31") == {"m1": [("2026-03-02", "2026-03-04")]}
+
+    index.add("b", "m1", "geelong", "2026-03-10", "2026-03-12", "approved")
+    assert index.on_leave("geelong", "2026-03-11") == {"m1"}
+    index.add("a", "m1", "geelong", "2026-03-02", "2026-03-04", "denied")
+    assert index.member_overlaps("m1", "2026-03-01", "2026-03-05") == []
+
+
+def test_submit_and_approve(client, inspector, members):
+    member = members["VP12347"]
+    response = submit(client, inspector, member, day(200), day(202), reason="Holiday")
+    assert response.status_code == 200, response.text
+    leave_id = response.json()["id"]
+    assert response.json()["status"] == "pending"
+    assert audit_actions(client, inspector, leave_id) == ["leave_submitted"]
+
+    overlapping = submit(client, inspector, member, day(202), day(204))
+    assert overlapping.status_code == 409
+    assert overlapping.json()["detail"]["conflicts"]["leave"] == [leave_id]
+
+    assert member["id"] not in on_leave(client, inspector, member, day(201))
+    response = client.put(f"/api/leave/{leave_id}/approve", headers=inspector)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "approved"
+    assert member["id"] in on_leave(client, inspector, member, day(201))
+    assert member["id"] not in on_leave(client, inspector, member, day(203))
+    assert sorted(audit_actions(client, inspector, leave_id)) == ["leave_approved", "leave_submitted"]
+
+
+def test_deny_frees_the_period(client, inspector, members):
+    member = members["VP12346"]
+    leave_id = submit(client, inspector, member, day(210), day(211)).json()["id"]
+
+    response = client.put(f"/api/leave/{leave_id}/deny", headers=inspector)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "denied"
+    assert "leave_denied" in audit_actions(client, inspector, leave_id)
+    assert submit(client, inspector, member, day(210), day(211)).status_code == 200
+
+
+def test_constable_cannot_decide(client, inspector, constable, members):
+    leave_id = submit(client, constable, members["VP12347"], day(220), day(220)).json()["id"]
+
+    assert client.put(f"/api/leave/{leave_id}/approve", headers=constable).status_code == 403
+    assert client.put(f"/api/leave/{leave_id}/deny", headers=constable).status_code == 403
+    assert audit_actions(client, inspector, leave_id) == ["leave_submitted"]
+
+
+def test_invalid_requests(client, inspector, members):
+    assert submit(client, inspector, members["VP12347"], day(231), day(230)).status_code == 400
+    assert submit(client, inspector, {"id": "missing"}, day(230), day(231)).status_code == 404
+    assert client.put("/api/leave/missing/approve", headers=inspector).status_code == 404
+
+
+def test_rostered_assignments_block_approval(client, inspector, members):
+    member = members["VP12347"]
+    roster_id = client.post("/api/roster/generate", json={"station": member["station"]}).json()["roster_period_id"]
+    response = client.patch(f"/api/roster/{roster_id}/assignments", json={"added": [{
+        "member_id": member["id"], "date": day(241).isoformat(),
+        "shift_type": "early", "start_time": "06:00", "end_time": "14:00"
+    }]})
+    assert response.status_code == 200, response.text
+
+    response = submit(client, inspector, member, day(240), day(242))
+    assert response.status_code == 200, response.text
+    leave_id = response.json()["id"]
+    assert [a["roster_period_id"] for a in response.json()["conflicts"]["assignments"]] == [roster_id]
+
+    response = client.put(f"/api/leave/{leave_id}/approve", headers=inspector)
+    assert response.status_code == 409
+    assert member["id"] not in on_leave(client, inspector, member, day(241))
+
+    response = client.put(f"/api/leave/{leave_id}/approve", headers=inspector, params={"force": True})
+    assert response.status_code == 200, response.text
+    assert member["id"] in on_leave(client, inspector, member, day(241))
+    assert "leave_approved" in audit_actions(client, inspector, leave_id)
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from member_directory import MemberDirectory
+import server
+
+DEFAULTS = {"night_shift_tolerance": 2}
+
+
+def member(member_id, name, **values):
+    fields = dict(
+        id=member_id, vp_number=member_id.upper(), name=name, email="", station="geelong", rank="Constable",
+        seniority_years=1, ostt_qualification_date=None, created_at=None, updated_at=None,
+        ada_driver_authority=1, active=None, special_qualifications=None, preferences_json=None,
+    )
+    return SimpleNamespace(**{**fields, **values})
+
+
+def names(records):
+    return [record.name for record in records]
+
+
+def test_put_and_discard_refresh_the_ordering():
+    directory = MemberDirectory(DEFAULTS)
+    directory.load([member("b", "Bravo"), member("c", "Charlie")])
+    assert names(directory.page()[0]) == ["Bravo", "Charlie"]
+    generation = directory.generation
+
+    directory.put(member("a", "Delta"))
+    directory.put(member("c", "Alpha"))
+    assert names(directory.page()[0]) == ["Alpha", "Bravo", "Delta"]
+    assert names(directory.page(("Alpha", "c"), 1)[0]) == ["Bravo"]
+
+    directory.discard("b")
+    directory.discard("missing")
+    assert names(directory.page()[0]) == ["Alpha", "Delta"]
+    assert directory.generation == generation + 3
+
+
+def test_records_decode_json_columns():
+    directory = MemberDirectory(DEFAULTS)
+    directory.load([
+        member("a", "A", special_qualifications='["tactical"]', preferences_json='{"night_shift_tolerance": 4}'),
+        member("b", "B", special_qualifications="first_aid", preferences_json="not json", active=0),
+    ])
+    a, b = directory.get("a"), directory.get("b")
+    assert (a.special_qualifications, a.preferences, a.active) == (["tactical"], {"night_shift_tolerance": 4}, True)
+    assert (b.special_qualifications, b.preferences, b.active) == (["first_aid"], DEFAULTS, False)
+    assert b.preferences is not DEFAULTS
+    assert names(directory.members(active_only=True)) == ["A"]
+
+
+def test_updates_are_visible_without_a_reload(client, inspector, constable, members):
+    member_id = members["VP12345"]["id"]
+    preferences = {"night_shift_tolerance": 7, "preferred_rest_days": ["sunday"], "welfare_notes": "updated"}
+
+    response = client.put(f"/api/members/{member_id}/preferences", headers=constable, json={})
+    assert response.status_code == 403
+    response = client.put(f"/api/members/{member_id}/preferences", headers=inspector, json=preferences)
+    assert response.status_code == 200, response.text
+    response = client.put(f"/api/members/{member_id}/qualifications", headers=inspector,
+                          json=[{"qualification": "negotiator"}])
+    assert response.status_code == 200, response.text
+
+    record = client.get(f"/api/members/{member_id}", headers=inspector).json()
+    assert {key: record["preferences"][key] for key in preferences} == preferences
+    assert server.member_directory.get(member_id).special_qualifications == ["negotiator"]
+    listed = {m["id"]: m for m in client.get("/api/members", headers=inspector).json()}
+    assert listed[member_id]["preferences"]["night_shift_tolerance"] == 7
+
+
+def test_registered_members_join_the_directory(client, inspector):
+    response = client.post("/api/auth/register", json={
+        "vp_number": "VP99001", "name": "Aaron Newstart", "email": "new@example.com",
+        "role": "general_duties", "station": "corio", "password": "changeme",
+    })
+    assert response.status_code == 200, response.text
+
+    listed = client.get("/api/members", headers=inspector, params={"fields": "vp_number,name"}).json()
+    assert {"vp_number": "VP99001", "name": "Aaron Newstart"} in listed
+    assert [m["name"] for m in listed] == sorted(m["name"] for m in listed)
@@ -0,0 +1,148 @@
+import json
+import sqlite3
+
+import pytest
+
+from bulk_import import ensure_schema
+
+# The members table as it was before migration 1
+LEGACY_MEMBERS = """
+CREATE TABLE members (
+    id VARCHAR PRIMARY KEY, vp_number VARCHAR UNIQUE, name VARCHAR, email VARCHAR, station VARCHAR,
+    rank VARCHAR, seniority_years INTEGER, special_qualifications TEXT, ostt_qualification_date DATETIME,
+    ada_driver_authority BOOLEAN, preferences_json TEXT, active BOOLEAN, created_at DATETIME, updated_at DATETIME
+)
+"""
+
+
+def preferences(rest_days=(), **values):
+    return json.dumps({"recall_willingness": True, "night_shift_tolerance": 2,
+                       "preferred_rest_days": list(rest_days), **values})
+
+
+@pytest.fixture
+def legacy_database(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute(LEGACY_MEMBERS)
+        connection.executemany(
+            "INSERT INTO members (id, vp_number, name, special_qualifications, preferences_json) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                ("a", "VP1", "A", '["tactical", "first_aid"]', preferences(["Sunday", "monday"])),
+                ("b", "VP2", "B", "negotiator", preferences(recall_willingness=False, night_shift_tolerance=5)),
+                ("c", "VP3", "C", "", "not json"),
+                ("d", "VP4", "D", None, None),
+            ]
+        )
+    connection.close()
+    ensure_schema(path)
+    return path
+
+
+def query(path, sql, parameters=()):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(sql, parameters).fetchall()
+    finally:
+        connection.close()
+
+
+def execute(path, sql, parameters=()):
+    with sqlite3.connect(path) as connection:
+        connection.execute(sql, parameters)
+    connection.close()
+
+
+def rest_days(path):
+    return query(path, "SELECT member_id, day FROM member_rest_days ORDER BY member_id, day")
+
+
+def test_migrations_are_recorded_once(legacy_database):
+    ensure_schema(legacy_database)
+    assert query(legacy_database, "SELECT version, name FROM schema_migrations ORDER BY version") == [
+        (1, "promote_preferences"), (2, "normalise_qualifications"), (3, "add_roster_rules"),
+    ]
+
+
+def test_rest_days_are_backfilled(legacy_database):
+    assert rest_days(legacy_database) == [("a", "monday"), ("a", "sunday")]
+
+
+def test_preference_columns_are_generated(legacy_database):
+    rows = query(legacy_database, "SELECT id, recall_willingness, night_shift_tolerance FROM members ORDER BY id")
+    assert rows == [
+        ("a", 1, 2), ("b", 0, 5), ("c", None, None), ("d", None, None),
+    ]
+
+
+def test_rest_days_follow_member_changes(legacy_database):
+    execute(legacy_database, "INSERT INTO members (id, vp_number, preferences_json) VALUES (?, ?, ?)",
+            ("e", "VP5", preferences(["FRIDAY"])))
+    execute(legacy_database, "UPDATE members SET preferences_json = ? WHERE id = 'a'", (preferences(["tuesday"]),))
+    execute(legacy_database, "UPDATE members SET preferences_json = ? WHERE id = 'c'", (preferences(["monday"]),))
+    assert rest_days(legacy_database) == [("a", "tuesday"), ("c", "monday"), ("e", "friday")]
+
+    execute(legacy_database, "UPDATE members SET preferences_json = 'broken' WHERE id = 'a'")
+    execute(legacy_database, "DELETE FROM members WHERE id = 'e'")
+    assert rest_days(legacy_database) == [("c", "monday")]
+
+
+def test_backfill_replaces_stale_rest_days(tmp_path):
+    path = str(tmp_path / "stale.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute(LEGACY_MEMBERS)
+        connection.execute("CREATE TABLE member_rest_days (member_id VARCHAR, day VARCHAR, "
+                           "PRIMARY KEY (member_id, day))")
+        connection.execute("INSERT INTO member_rest_days VALUES ('gone', 'monday')")
+        connection.execute("INSERT INTO members (id, preferences_json) VALUES ('a', ?)", (preferences(["Saturday"]),))
+    connection.close()
+
+    ensure_schema(path)
+
+    assert rest_days(path) == [("a", "saturday")]
+
+
+def qualifications(path):
+    return query(path, "SELECT member_id, qualification, expires_at FROM member_qualifications "
+                       "ORDER BY member_id, qualification")
+
+
+def test_qualifications_are_backfilled(legacy_database):
+    assert qualifications(legacy_database) == [
+        ("a", "first_aid", None), ("a", "tactical", None), ("b", "negotiator", None),
+    ]
+
+
+def test_qualifications_follow_member_changes(legacy_database):
+    expiry = "2027-01-01 00:00:00.000000"
+    execute(legacy_database, "UPDATE member_qualifications SET expires_at = ? WHERE member_id = 'a'", (expiry,))
+
+    execute(legacy_database, "UPDATE members SET special_qualifications = ? WHERE id = 'a'",
+            (json.dumps(["tactical", "dog_handler"]),))
+    execute(legacy_database, "UPDATE members SET special_qualifications = 'first_aid' WHERE id = 'd'")
+    execute(legacy_database, "INSERT INTO members (id, vp_number, special_qualifications) VALUES ('e', 'VP5', ?)",
+            (json.dumps(["negotiator"]),))
+    execute(legacy_database, "DELETE FROM members WHERE id = 'b'")
+
+    # Expiry dates survive for qualifications the member keeps
+    assert qualifications(legacy_database) == [
+        ("a", "dog_handler", None), ("a", "tactical", expiry), ("d", "first_aid", None), ("e", "negotiator", None),
+    ]
+
+
+def test_qualification_backfill_keeps_existing_expiries(tmp_path):
+    path = str(tmp_path / "partial.db")
+    expiry = "2027-01-01 00:00:00.000000"
+    with sqlite3.connect(path) as connection:
+        connection.execute(LEGACY_MEMBERS)
+        connection.execute("CREATE TABLE member_qualifications (member_id VARCHAR NOT NULL, qualification VARCHAR "
+                           "NOT NULL, expires_at DATETIME, PRIMARY KEY (member_id, qualification))")
+        connection.execute("INSERT INTO member_qualifications VALUES ('a', 'tactical', ?)", (expiry,))
+        connection.execute("INSERT INTO members (id, special_qualifications) VALUES ('a', ?)",
+                           (json.dumps(["tactical", "first_aid"]),))
+    connection.close()
+
+    ensure_schema(path)
+
+    assert qualifications(path) == [("a", "first_aid", None), ("a", "tactical", expiry)]
@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import threading
+
+from roster_engine import AvailabilityMap, coverage_slots, shift_bounds, solve_station
+
+START = date(2026, 3, 2)
+
+
+def make_member(member_id, ada=True):
+    return {
+        "id": member_id,
+        "ada_driver_authority": ada,
+        "ostt_qualification_date": datetime(2026, 1, 1),
+        "special_qualifications": [],
+        "preferences": {},
+    }
+
+
+def availability():
+    return AvailabilityMap({}, threading.Lock())
+
+
+def claim(shared, station, day, shift=("06:00", "14:00"), member_id="shared"):
+    day = START + timedelta(days=day)
+    start, end = shift_bounds(day, *shift)
+    return shared.claim(member_id, station, day.toordinal(), start, end, 8.0)
+
+
+def test_a_day_goes_to_one_station():
+    shared = availability()
+    shared.register("shared", [])
+
+    assert claim(shared, "geelong", 0)
+    assert not claim(shared, "corio", 0)
+    assert claim(shared, "geelong", 0)
+
+    shared.release("shared", "corio", START.toordinal())
+    assert not claim(shared, "corio", 0)
+    shared.release("shared", "geelong", START.toordinal())
+    assert claim(shared, "corio", 0)
+
+
+def test_claims_keep_the_minimum_break():
+    shared = availability()
+    shared.register("shared", [])
+
+    assert claim(shared, "geelong", 0, ("22:00", "06:00"))
+    # 06:00 the next morning leaves no break after the night
+    assert not claim(shared, "corio", 1, ("06:00", "14:00"))
+    assert claim(shared, "corio", 1, ("22:00", "06:00"))
+    assert not claim(shared, "geelong", 2, ("06:00", "14:00"))
+
+
+def test_claims_keep_the_fortnight_limit():
+    shared = availability()
+    history = [(datetime.combine(START - timedelta(days=day), datetime.min.time()), 9.0) for day in range(1, 8)]
+    shared.register("shared", history)
+
+    assert claim(shared, "geelong", 0)
+    # 63h of history and 8h today; another 8h would reach 79h in one window
+    assert not claim(shared, "corio", 1)
+
+
+def test_unregistered_members_are_not_limited():
+    shared = availability()
+    assert claim(shared, "geelong", 0, member_id="local")
+    assert claim(shared, "corio", 0, member_id="local")
+
+
+def test_concurrent_stations_never_double_book():
+    shared = availability()
+    shared.register("shared", [])
+
+    def payload(station, local_id):
+        # Only the shared member can drive the van, so both stations want them every day
+        return {
+            "station": station,
+            "members": [make_member("shared"), make_member(local_id, ada=False)],
+            "start_date": START,
+            "total_days": 10,
+            "slots": coverage_slots(1, 0),
+            "shared_member_ids": ["shared"],
+        }
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(
+            lambda p: solve_station(p, shared), [payload("geelong", "g1"), payload("corio", "c1")]
+        ))
+
+    days = [
+        assignment["date"] for result in results
+        for assignment in result["assignments"] if assignment["member_id"] == "shared"
+    ]
+    assert len(days) == len(set(days)) > 0
+    claimed = shared.claims["shared"]["days"]
+    assert sorted(claimed) == sorted(day.toordinal() for day in days)
+    assert sum(len(result["unfilled_slots"]) for result in results) == 20 - len(days)
+
+
+def test_multi_station_endpoint(client, inspector, members):
+    sergeant = members["VP12346"]
+    other = "corio" if sergeant["station"] == "geelong" else "geelong"
+    response = client.put(f"/api/members/{sergeant['id']}/relief-stations", headers=inspector, json=[other])
+    assert response.status_code == 200, response.text
+
+    start = datetime.utcnow().date() + timedelta(days=400)
+    response = client.post("/api/roster/generate/multi-station", json={
+        "stations": ["geelong", "corio"], "start_date": start.isoformat(), "period_weeks": 1
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["shared_members"] == 1
+
+    days = []
+    for roster in body["rosters"].values():
+        assignments = client.get(f"/api/roster/{roster['roster_period_id']}/versions/1").json()["assignments"]
+        days += [a["date"] for a in assignments if a["member_id"] == sergeant["id"]]
+    assert len(days) == len(set(days))
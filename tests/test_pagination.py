@@ -0,0 +1,83 @@
+import pytest
+
+import server
+from pagination import InvalidCursor, decode_cursor, encode_cursor, parse_fields
+
+
+def pages(client, headers, path, **params):
+    """Every page of a listing, following X-Next-Cursor"""
+    pages = []
+    cursor = None
+    while True:
+        page_params = dict(params, cursor=cursor) if cursor else params
+        response = client.get(path, headers=headers, params=page_params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("Smith", "m1")
+    assert decode_cursor(cursor) == ("Smith", "m1")
+    assert "=" not in cursor
+
+
+def test_bad_cursor():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor")
+
+
+def test_parse_fields():
+    assert parse_fields(None, ("id", "name")) is None
+    assert parse_fields("name, id", ("id", "name", "rank")) == ["id", "name"]
+    with pytest.raises(ValueError):
+        parse_fields("id,password", ("id", "name"))
+
+
+@pytest.mark.parametrize("path", ["/api/members", "/api/shifts"])
+def test_unpaged_listing_returns_everything(client, inspector, path, monkeypatch):
+    monkeypatch.setattr(server, "DEFAULT_PAGE_SIZE", 1)
+    response = client.get(path, headers=inspector)
+    assert response.status_code == 200, response.text
+    assert "X-Next-Cursor" not in response.headers
+    assert len(response.json()) == sum(len(page) for page in pages(client, inspector, path, limit=2)) > 1
+
+    # A cursor without a limit pages at the default size
+    first = client.get(path, headers=inspector, params={"limit": 1})
+    second = client.get(path, headers=inspector, params={"cursor": first.headers["X-Next-Cursor"]})
+    assert len(second.json()) == 1
+    assert second.json()[0]["id"] == response.json()[1]["id"]
+
+
+@pytest.mark.parametrize("path", ["/api/members", "/api/shifts"])
+def test_pages_follow_the_cursor(client, inspector, path):
+    everything = client.get(path, headers=inspector).json()
+    paged = pages(client, inspector, path, limit=2)
+
+    assert len(paged) == (len(everything) + 1) // 2
+    assert all(len(page) == 2 for page in paged[:-1])
+    assert [row["id"] for page in paged for row in page] == [row["id"] for row in everything]
+
+
+@pytest.mark.parametrize("path", ["/api/members", "/api/shifts"])
+def test_invalid_paging_requests(client, inspector, path):
+    assert client.get(path, headers=inspector, params={"cursor": "not a cursor"}).status_code == 400
+    assert client.get(path, headers=inspector, params={"fields": "id,password"}).status_code == 400
+    assert client.get(path, headers=inspector, params={"limit": 0}).status_code == 422
+
+
+def test_member_fields(client, inspector):
+    response = client.get("/api/members", headers=inspector, params={"fields": "name,id", "limit": 1})
+    assert response.status_code == 200, response.text
+    assert [set(row) for row in response.json()] == [{"id", "name"}]
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_shift_fields(client, inspector):
+    everything = client.get("/api/shifts", headers=inspector).json()
+    paged = pages(client, inspector, "/api/shifts", fields="shift_type", limit=2)
+    projected = [row for page in paged for row in page]
+    assert [set(row) for row in projected] == [{"shift_type"}] * len(everything)
+    assert [row["shift_type"] for row in projected] == [row["shift_type"] for row in everything]
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from publication import DeadlineScheduler, alert_message
+
+NOW = datetime(2026, 3, 2, 9)
+
+
+def scheduler():
+    return DeadlineScheduler(notice_days=14, thresholds=(7, 3, 1, 0))
+
+
+def test_alerts_fire_in_order():
+    deadlines = scheduler()
+    deadlines.schedule("r1", "geelong", NOW + timedelta(days=24), now=NOW)
+
+    assert deadlines.due(NOW) == []
+    assert deadlines.next_due() == NOW + timedelta(days=3)
+    fired = [
+        alert[3]
+        for offset in range(11)
+        for alert in deadlines.due(NOW + timedelta(days=offset))
+    ]
+    assert fired == [7, 3, 1, 0]
+    assert "r1" not in deadlines.periods
+
+
+def test_restart_raises_only_the_most_urgent_crossed_threshold():
+    deadlines = scheduler()
+    created_at = NOW - timedelta(days=10)
+    # Deadline tomorrow: the 7 and 3 day alerts were missed, only the 1 day alert is raised
+    deadlines.schedule("r1", "geelong", NOW + timedelta(days=15), now=NOW, created_at=created_at)
+    assert [alert[3] for alert in deadlines.due(NOW)] == [1]
+
+    deadlines.schedule("r2", "corio", NOW + timedelta(days=15), alerted=1, now=NOW, created_at=created_at)
+    assert deadlines.due(NOW) == []
+    assert deadlines.periods["r2"][3] == (0,)
+
+
+def test_rosters_created_past_their_deadline_are_not_tracked():
+    deadlines = scheduler()
+    deadlines.schedule("r1", "geelong", NOW + timedelta(days=7), now=NOW)
+    deadlines.schedule("r2", "corio", NOW + timedelta(days=13), now=NOW, created_at=NOW - timedelta(hours=6))
+    # Created with notice to spare, so a missed deadline is still reported
+    deadlines.schedule("r3", "bacchus_marsh", NOW + timedelta(days=13), now=NOW, created_at=NOW - timedelta(days=3))
+
+    assert sorted(deadlines.periods) == ["r3"]
+    assert [(alert[0], alert[3]) for alert in deadlines.due(NOW)] == [("bacchus_marsh", 0)]
+
+
+def test_cancel():
+    deadlines = scheduler()
+    deadlines.schedule("r1", "geelong", NOW + timedelta(days=24), now=NOW)
+    deadlines.cancel("r1")
+    assert deadlines.due(NOW + timedelta(days=30)) == []
+
+
+def test_alert_message():
+    start = datetime(2026, 3, 30)
+    assert alert_message("geelong", start, start - timedelta(days=14), 3) == (
+        "geelong roster starting 2026-03-30 must be published by 2026-03-16 (3 days remaining)"
+    )
+    assert alert_message("geelong", start, start - timedelta(days=14), 0).startswith("Publication deadline missed")
+
+
+def test_generated_rosters_are_tracked_only_with_notice(client):
+    from publication import publication_scheduler
+
+    def generate(**config):
+        response = client.post("/api/roster/generate", json={"station": "geelong", **config})
+        assert response.status_code == 200, response.text
+        return response.json()["roster_period_id"]
+
+    # Starting today, the deadline passed before the roster existed
+    assert generate() not in publication_scheduler.periods
+
+    notice = timedelta(days=publication_scheduler.notice_days)
+    start = datetime.utcnow().date() + notice + timedelta(days=10)
+    roster_id = generate(start_date=start.isoformat())
+    station, start_date, deadline, pending, _ = publication_scheduler.periods[roster_id]
+    assert (station, start_date.date()) == ("geelong", start)
+    assert deadline == datetime.combine(start, datetime.min.time()) - notice
+    assert pending == publication_scheduler.thresholds
+
+    assignments = client.get(f"/api/roster/{roster_id}/versions/1").json()["assignments"]
+    assert min(assignment["date"] for assignment in assignments) >= start.isoformat()
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def day(offset):
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time()) + timedelta(days=offset)
+
+
+def generated_roster(client, **config):
+    response = client.post("/api/roster/generate", json={"station": "corio", **config})
+    assert response.status_code == 200, response.text
+    return response.json()["roster_period_id"]
+
+
+def add_run(client, roster_id, member, first_day, days):
+    """`days` consecutive early shifts for a member"""
+    response = client.patch(f"/api/roster/{roster_id}/assignments", json={"added": [
+        {
+            "member_id": member["id"], "date": day(first_day + offset).isoformat(),
+            "shift_type": "early", "start_time": "06:00", "end_time": "14:00"
+        }
+        for offset in range(days)
+    ]})
+    assert response.status_code == 200, response.text
+
+
+def consecutive_day_breaches(client, roster_id, member):
+    response = client.get(f"/api/roster/{roster_id}/validation")
+    assert response.status_code == 200, response.text
+    return [
+        violation for violation in response.json()["violations"]
+        if violation["rule"] == "consecutive_days" and violation["member_id"] == member["id"]
+    ]
+
+
+@pytest.mark.parametrize("max_consecutive_days, breached", [(None, True), (5, True), (7, False)])
+def test_validation_uses_the_generation_rules(client, members, max_consecutive_days, breached):
+    constable = members["VP12347"]
+    config = {} if max_consecutive_days is None else {"max_consecutive_days": max_consecutive_days}
+    roster_id = generated_roster(client, **config)
+    add_run(client, roster_id, constable, 320, 6)
+
+    assert bool(consecutive_day_breaches(client, roster_id, constable)) == breached
@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+
+import roster_versions
+from roster_versions import apply_diff, diff_snapshots, diff_is_empty, expand_snapshot
+
+
+def assignment(member, day, shift_type="early", start_time="06:00", end_time="14:00"):
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    return {
+        "member_id": member["id"],
+        "date": (today + timedelta(days=day)).isoformat(),
+        "shift_type": shift_type,
+        "start_time": start_time,
+        "end_time": end_time,
+    }
+
+
+def generate(client, station="geelong"):
+    response = client.post("/api/roster/generate", json={"station": station})
+    assert response.status_code == 200, response.text
+    return response.json()["roster_period_id"]
+
+
+def edit(client, roster_id, **changes):
+    response = client.patch(f"/api/roster/{roster_id}/assignments", json=changes)
+    assert response.status_code == 200, response.text
+    return response.json()["version"]
+
+
+def version_assignments(client, roster_id, version):
+    response = client.get(f"/api/roster/{roster_id}/versions/{version}")
+    assert response.status_code == 200, response.text
+    return {row["id"]: row for row in response.json()["assignments"]}
+
+
+def test_diff_round_trip():
+    old = {"a": ["m1", "2026-03-02", "early"], "b": ["m2", "2026-03-02", "late"], "c": ["m3", "2026-03-03", "night"]}
+    new = {"a": ["m1", "2026-03-02", "early"], "b": ["m4", "2026-03-02", "late"], "d": ["m3", "2026-03-04", "night"]}
+
+    diff = diff_snapshots(old, new)
+
+    assert diff == {"added": {"d": new["d"]}, "removed": ["c"], "changed": {"b": new["b"]}}
+    assert apply_diff(old, diff) == new
+    assert old["b"] == ["m2", "2026-03-02", "late"]
+    assert diff_is_empty(diff_snapshots(new, dict(new)))
+
+
+def test_expand_snapshot():
+    row = ["m1", "2026-03-02", "early", "06:00", "14:00", 8.0, False, "manual_edit"]
+    assert expand_snapshot({"a": row}) == [dict(zip(roster_versions.ASSIGNMENT_FIELDS, row), id="a")]
+
+
+def test_edits_are_versioned(client, members):
+    sergeant, constable = members["VP12346"], members["VP12347"]
+    roster_id = generate(client)
+    generated = version_assignments(client, roster_id, 1)
+
+    version = edit(client, roster_id, added=[assignment(sergeant, 1), assignment(constable, 2)], edited_by="tester")
+    assert version == 2
+    added = {
+        key: row for key, row in version_assignments(client, roster_id, 2).items() if key not in generated
+    }
+    assert sorted(row["member_id"] for row in added.values()) == sorted([sergeant["id"], constable["id"]])
+    sergeant_id = next(key for key, row in added.items() if row["member_id"] == sergeant["id"])
+    constable_id = next(key for key, row in added.items() if row["member_id"] == constable["id"])
+
+    version = edit(
+        client, roster_id, removed=[sergeant_id],
+        changed=[{"id": constable_id, "shift_type": "late", "start_time": "14:00", "end_time": "22:00"}]
+    )
+    assert version == 3
+
+    # Earlier versions are unchanged by later edits
+    assert version_assignments(client, roster_id, 1) == generated
+    assert sergeant_id in version_assignments(client, roster_id, 2)
+    latest = version_assignments(client, roster_id, 3)
+    assert sergeant_id not in latest
+    assert latest[constable_id]["shift_type"] == "late"
+    assert latest[constable_id]["assignment_reason"] == "manual_edit"
+
+    changes = client.get(f"/api/roster/{roster_id}/changes", params={"since": 1}).json()
+    assert changes["from_version"] == 1 and changes["to_version"] == 3
+    assert list(changes["added"]) == [constable_id]
+    assert changes["removed"] == [] and changes["changed"] == {}
+
+    changes = client.get(f"/api/roster/{roster_id}/changes", params={"since": 2, "to_version": 3}).json()
+    fields = changes["fields"]
+    assert changes["removed"] == [sergeant_id]
+    assert changes["changed"][constable_id][fields.index("start_time")] == "14:00"
+
+    versions = client.get(f"/api/roster/{roster_id}/versions").json()
+    assert [(v["version"], v["added"], v["removed"], v["changed"]) for v in versions][1:] == [
+        (2, 2, 0, 0), (3, 0, 1, 1)
+    ]
+    assert versions[1]["created_by"] == "tester"
+
+
+def test_empty_edit_keeps_version(client):
+    roster_id = generate(client)
+    assert edit(client, roster_id) == 1
+    assert len(client.get(f"/api/roster/{roster_id}/versions").json()) == 1
+
+
+def test_unknown_assignment(client):
+    roster_id = generate(client)
+    response = client.patch(f"/api/roster/{roster_id}/assignments", json={"removed": ["missing"]})
+    assert response.status_code == 404
+    assert len(client.get(f"/api/roster/{roster_id}/versions").json()) == 1
+
+
+def test_missing_version(client):
+    roster_id = generate(client)
+    assert client.get(f"/api/roster/{roster_id}/versions/5").status_code == 404
+    assert client.get(f"/api/roster/{roster_id}/changes", params={"since": 5}).status_code == 404
+
+
+def test_replay_across_checkpoints(client, members, monkeypatch):
+    """Versions rebuilt from the nearest checkpoint match the ones seen while editing"""
+    monkeypatch.setattr(roster_versions, "CHECKPOINT_INTERVAL", 3)
+    constable = members["VP12347"]
+    roster_id = generate(client)
+    seen = {1: version_assignments(client, roster_id, 1)}
+
+    for day in range(1, 8):
+        version = edit(client, roster_id, added=[assignment(constable, day)])
+        seen[version] = version_assignments(client, roster_id, version)
+    assert version == 8
+
+    for version, assignments in seen.items():
+        assert version_assignments(client, roster_id, version) == assignments
+        if version > 1:
+            assert len(assignments) == len(seen[version - 1]) + 1
+    changes = client.get(f"/api/roster/{roster_id}/changes", params={"since": 2, "to_version": 7}).json()
+    assert len(changes["added"]) == 5
+
+
+def test_roster_view_etag(client, inspector, members):
+    constable = members["VP12347"]
+    roster_id = generate(client)
+    etag = client.get(f"/api/roster/{roster_id}").headers["ETag"]
+
+    assert client.get(f"/api/roster/{roster_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/api/roster/{roster_id}", params={"format": "columnar"}).headers["ETag"] != etag
+
+    edit(client, roster_id, added=[assignment(constable, 1)])
+    response = client.get(f"/api/roster/{roster_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # Views embed member details, so a member edit invalidates them too
+    response = client.put(f"/api/members/{constable['id']}/preferences", headers=inspector, json={})
+    assert response.status_code == 200, response.text
+    response = client.get(f"/api/roster/{roster_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
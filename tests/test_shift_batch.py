@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+DAY = datetime(2031, 5, 5)
+
+
+def shift(member_id, day, start_time="06:00", end_time="14:00"):
+    return {
+        "member_id": member_id, "shift_type": "van", "date": (DAY + timedelta(days=day)).isoformat(),
+        "start_time": start_time, "end_time": end_time,
+    }
+
+
+def shift_dates(client, headers, member_id):
+    response = client.get("/api/shifts", headers=headers, params={
+        "member_id": member_id, "start_date": DAY.isoformat(), "end_date": (DAY + timedelta(days=30)).isoformat()
+    })
+    assert response.status_code == 200, response.text
+    return sorted(s["date"][:10] for s in response.json())
+
+
+def test_batch_inserts_every_shift(client, inspector, members):
+    member_id = members["VP12346"]["id"]
+    response = client.post("/api/shifts/batch", headers=inspector, json={
+        "shifts": [shift(member_id, 0), shift(member_id, 1)]
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 2
+    assert shift_dates(client, inspector, member_id) == ["2031-05-05", "2031-05-06"]
+
+
+def test_one_bad_row_rejects_the_batch(client, inspector, members):
+    member_id = members["VP12347"]["id"]
+    bad_rows = {
+        2: shift("no-such-member", 2),
+        3: shift(member_id, 3, end_time="25:00"),
+    }
+    shifts = [shift(member_id, day) for day in range(2)] + list(bad_rows.values()) + [shift(member_id, 4)]
+
+    response = client.post("/api/shifts/batch", headers=inspector, json={"shifts": shifts})
+
+    assert response.status_code == 400
+    errors = response.json()["detail"]["errors"]
+    assert sorted(error["index"] for error in errors) == sorted(bad_rows)
+    assert shift_dates(client, inspector, member_id) == []
+
+
+def test_constables_cannot_import(client, constable, members):
+    member_id = members["VP12347"]["id"]
+    response = client.post("/api/shifts/batch", headers=constable, json={"shifts": [shift(member_id, 9)]})
+    assert response.status_code == 403
+    assert shift_dates(client, constable, member_id) == []
@@ -0,0 +1,60 @@
+from datetime import date
+import io
+import sqlite3
+
+import pytest
+
+from synthetic_data import generate_dataset, station_names
+
+END_DATE = date(2026, 3, 1)
+TABLES = ("users", "members", "shifts", "leave_requests", "rotation_templates", "rotation_assignments")
+
+
+def generate(path, seed=3, **kwargs):
+    options = dict(members=25, years=0.2, end_date=END_DATE, progress=io.StringIO())
+    options.update(kwargs)
+    return generate_dataset(str(path), seed=seed, **options)
+
+
+def dump(path):
+    connection = sqlite3.connect(str(path))
+    try:
+        return {table: sorted(connection.execute(f"SELECT * FROM {table}").fetchall()) for table in TABLES}
+    finally:
+        connection.close()
+
+
+def test_same_seed_and_end_date_give_the_same_rows(tmp_path):
+    first = generate(tmp_path / "first.db")
+    second = generate(tmp_path / "second.db")
+
+    assert first == second
+    assert first["shifts"] > 0 and first["members"] == 25
+    assert dump(tmp_path / "first.db") == dump(tmp_path / "second.db")
+
+
+def test_seed_and_end_date_change_the_rows(tmp_path):
+    for name, options in {"base": {}, "seed": {"seed": 4}, "later": {"end_date": date(2026, 4, 1)}}.items():
+        generate(tmp_path / f"{name}.db", **options)
+    base, seed, later = (dump(tmp_path / f"{name}.db") for name in ("base", "seed", "later"))
+
+    assert seed["shifts"] != base["shifts"]
+    # Same people, with their history moved to the new end date
+    assert [row[1:3] for row in later["members"]] == [row[1:3] for row in base["members"]]
+    assert later["shifts"] != base["shifts"]
+
+
+def test_generate_into_populated_database(tmp_path):
+    generate(tmp_path / "twice.db")
+    with pytest.raises(ValueError):
+        generate(tmp_path / "twice.db")
+
+
+def test_station_names():
+    assert station_names(3) == ["geelong", "corio", "station_03"]
+
+
+def test_init_sample_data_refuses_unserved_stations(client):
+    response = client.post("/api/init-sample-data", params={"synthetic": True, "stations": 3})
+    assert response.status_code == 400
+    assert "geelong, corio" in response.json()["detail"]